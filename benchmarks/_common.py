@@ -0,0 +1,47 @@
+"""
+    Utilitários compartilhados pelos benchmarks do projeto.
+
+    Os benchmarks são scripts independentes, executados a partir da raiz do repositório, por exemplo:
+    `python benchmarks/bench_coalesce.py`.
+"""
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DATA_PATH = os.path.join(REPO_ROOT, "data")
+BRONZE_PATH = os.path.join(DATA_PATH, "bronze")
+SAMPLE_DATE = "2025-01-22"
+
+sys.path.append(os.path.join(REPO_ROOT, 'src'))
+
+
+def best_of(function, repeat=5):
+    """
+        Executa a função várias vezes e retorna o menor tempo (em segundos) e o último resultado.
+
+        Args:
+            function (Callable): Função sem argumentos a ser medida.
+            repeat (int): Quantidade de execuções.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(title, rows):
+    """
+        Imprime uma tabela simples com os resultados de um benchmark.
+
+        Args:
+            title (str): Título do benchmark.
+            rows (list): Lista de tuplas (descrição, valor).
+    """
+    print(f"\n== {title} ==")
+    width = max(len(str(label)) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {str(label).ljust(width)}  {value}")
@@ -0,0 +1,134 @@
+"""
+    Mede o arquivo de páginas (PageArchive) e a conversão das páginas guardadas em tabelas bronze, sem
+    acessar a internet (DataExtractor.replay_archive).
+
+    As páginas de Santos e Paranaguá são montadas a partir de dias sintéticos (ver synthetic.py). Cada dia
+    simula várias consultas ao longo do dia (--captures), das quais apenas algumas trazem uma página nova
+    (--changes); as demais repetem a última página, como nas consultas sem mudanças. As versões de um mesmo
+    dia diferem apenas por um comentário no final da página.
+
+    Para gzip e lzma, mostra o tempo para guardar as páginas e o espaço ocupado, comparado com o tamanho
+    das respostas. Em seguida, converte a última página de cada dia com 1 processo e com vários processos.
+
+    Uso: python benchmarks/bench_archive.py [--days 20] [--rows 2000] [--captures 24] [--changes 4] [--workers 1 2 4]
+"""
+import argparse
+import filecmp
+import logging
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import pandas as pd
+from _common import SAMPLE_DATE, report
+from stub_server import render_page
+from synthetic import generate_history
+from etl.archive import PageArchive
+from etl.extract import DataExtractor
+
+
+def build_pages(directory, days, rows, changes):
+    """
+        Monta as versões da página de cada cidade em cada dia sintético.
+
+        Returns:
+            dict: Lista de versões (bytes) indexada por (cidade, data).
+    """
+    bronze_path = os.path.join(directory, "synthetic")
+    dates = generate_history(bronze_path, SAMPLE_DATE, days, rows)
+    pages = {}
+    for date in dates:
+        for city in ("santos", "paranagua"):
+            html = render_page(city, bronze_path, date)
+            pages[(city, date)] = [f"{html}<!-- atualização {change} -->".encode("utf-8") for change in range(changes)]
+    shutil.rmtree(bronze_path)
+    return pages
+
+
+def fill_archive(archive, pages, captures):
+    """
+        Guarda as capturas de todos os dias, distribuindo as versões de cada dia ao longo das capturas.
+
+        Returns:
+            int: Tamanho total das respostas, em bytes.
+    """
+    received = 0
+    for (city, date), versions in pages.items():
+        start = pd.Timestamp(date)
+        for capture in range(captures):
+            content = versions[capture * len(versions) // captures]
+            captured_at = start + pd.Timedelta(hours=24 * capture / captures)
+            archive.save(city, content, "utf-8", url=f"https://{city}/", captured_at=captured_at)
+            received += len(content)
+    return received
+
+
+def same_files(left, right):
+    """
+        Verifica se duas pastas têm os mesmos arquivos, com o mesmo conteúdo.
+    """
+    def files(path):
+        return sorted(os.path.relpath(os.path.join(folder, file), path)
+                      for folder, _, names in os.walk(path) for file in names)
+    return files(left) == files(right) and all(
+        filecmp.cmp(os.path.join(left, file), os.path.join(right, file), shallow=False) for file in files(left)
+    )
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(folder, file)) for folder, _, files in os.walk(path) for file in files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=20, help="Quantidade de dias sintéticos.")
+    parser.add_argument("--rows", type=int, default=2000, help="Quantidade aproximada de linhas por dia.")
+    parser.add_argument("--captures", type=int, default=24, help="Consultas a cada página por dia.")
+    parser.add_argument("--changes", type=int, default=4, help="Páginas diferentes por dia.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Quantidades de processos da conversão.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.INFO)
+
+    directory = tempfile.mkdtemp()
+    try:
+        pages = build_pages(directory, args.days, args.rows, args.changes)
+        rows = [("CPUs", os.cpu_count()),
+                ("cidades x dias / consultas por dia", f"{len(pages)} / {args.captures}")]
+
+        for compression in ("gzip", "lzma"):
+            archive = PageArchive(os.path.join(directory, compression), compression=compression)
+            start = time.perf_counter()
+            received = fill_archive(archive, pages, args.captures)
+            elapsed = time.perf_counter() - start
+            stored = directory_size(os.path.join(archive.path, "objects"))
+            objects = sum(len(files) for _, _, files in os.walk(os.path.join(archive.path, "objects")))
+            rows.extend([
+                (f"{compression}: respostas recebidas (MB)", f"{received / 1024 ** 2:.1f}"),
+                (f"{compression}: páginas guardadas / tamanho (MB)", f"{objects} / {stored / 1024 ** 2:.2f}"),
+                (f"{compression}: redução", f"{received / stored:.0f}x"),
+                (f"{compression}: tempo para guardar (s)", f"{elapsed:.2f}"),
+            ])
+
+        archive = PageArchive(os.path.join(directory, "gzip"))
+        reference = None
+        for workers in args.workers:
+            extractor = DataExtractor()
+            extractor.bronze_path = os.path.join(directory, f"bronze_{workers}")
+            start = time.perf_counter()
+            failures = extractor.replay_archive(archive, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            reference = reference or extractor.bronze_path
+            same = same_files(reference, extractor.bronze_path)
+            rows.append((f"conversão sem internet, {workers} processos (páginas/s)",
+                         f"{len(pages) / elapsed:.1f} ({elapsed:.2f}s, {len(failures)} falhas"
+                         f"{'' if same else ', resultado diferente!'})"))
+    finally:
+        shutil.rmtree(directory)
+
+    report("Arquivo de páginas", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+    Compara a conversão das datas de chegada com pd.to_datetime(format='mixed'), que detecta o formato
+    valor a valor, com o conversor parse_arrival, que testa os formatos de cada porto uma única vez por
+    valor distinto. As datas vêm de um dia sintético (ver synthetic.py), nos formatos de Santos
+    ("07/01/2025 08:00:00" e "22/01/2025") e de Paranaguá ("22/03/2027 06:00"). Como o dia sintético
+    repete poucas datas, também é medida uma coluna em que quase todas as datas são distintas.
+
+    Mede também o cálculo das tabelas gold por dia e por semana de chegada a partir da camada silver.
+
+    Uso: python benchmarks/bench_arrival.py [--rows 1000000] [--distinct 100000]
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from _common import SAMPLE_DATE, best_of, report
+from synthetic import load_templates, synthetic_day
+from etl.load import ARRIVAL_BUCKETS, aggregate_arrivals
+from etl.parsers import arrival_formats, parse_arrival
+
+# Coluna de chegada de cada tabela bronze, na ordem de prioridade da camada silver
+ARRIVAL_COLUMNS = ['Chegada', 'Cheg/Arrival d/m/y', 'ETA']
+
+
+def arrival_column(rows):
+    """
+        Monta uma coluna de datas de chegada em texto e o local de cada linha a partir de um dia sintético.
+    """
+    frames = []
+    for (local, _), df in synthetic_day(load_templates(), SAMPLE_DATE, rows).items():
+        column = next((column for column in ARRIVAL_COLUMNS if column in df.columns), None)
+        if column is not None:
+            frames.append(pd.DataFrame({'Chegada': df[column], 'local': local}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def distinct_column(rows, seed=0):
+    """
+        Monta uma coluna de datas de chegada de Paranaguá com horários espalhados ao longo de um ano.
+    """
+    rng = np.random.default_rng(seed)
+    minutes = pd.to_timedelta(rng.integers(0, 365 * 24 * 60, rows), unit="min")
+    arrivals = (pd.Timestamp(SAMPLE_DATE) + minutes).strftime("%d/%m/%Y %H:%M")
+    return pd.DataFrame({'Chegada': arrivals, 'local': "paranagua"})
+
+
+def parse_by_source(df):
+    result = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    for local in df['local'].unique():
+        mask = (df['local'] == local).to_numpy()
+        result[mask] = parse_arrival(df.loc[mask, 'Chegada'], arrival_formats(local)).to_numpy()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Quantidade aproximada de linhas do dia sintético.")
+    parser.add_argument("--distinct", type=int, default=100_000, help="Linhas da coluna com datas distintas.")
+    args = parser.parse_args()
+
+    df = arrival_column(args.rows)
+    mixed_time, mixed = best_of(
+        lambda: pd.to_datetime(df['Chegada'], dayfirst=True, format='mixed', errors='coerce'), repeat=3
+    )
+    parsed_time, parsed = best_of(lambda: parse_by_source(df), repeat=3)
+
+    distinct = distinct_column(args.distinct)
+    mixed_distinct_time, mixed_distinct = best_of(
+        lambda: pd.to_datetime(distinct['Chegada'], dayfirst=True, format='mixed', errors='coerce'), repeat=1
+    )
+    parsed_distinct_time, parsed_distinct = best_of(lambda: parse_by_source(distinct), repeat=1)
+
+    silver = df.assign(Chegada=parsed, Peso=1.0)
+    bucket_times = {
+        name: best_of(lambda: aggregate_arrivals(silver, frequency), repeat=3)[0]
+        for name, frequency in ARRIVAL_BUCKETS.items()
+    }
+
+    report("Datas de chegada", [
+        ("linhas", len(df)),
+        ("valores distintos", df['Chegada'].nunique()),
+        ("format='mixed' (s)", f"{mixed_time:.3f}"),
+        ("parse_arrival por porto (s)", f"{parsed_time:.3f}"),
+        ("ganho", f"{mixed_time / parsed_time:.1f}x"),
+        ("mesmo resultado", mixed.equals(parsed)),
+        ("linhas com datas distintas", len(distinct)),
+        ("format='mixed', datas distintas (s)", f"{mixed_distinct_time:.3f}"),
+        ("parse_arrival, datas distintas (s)", f"{parsed_distinct_time:.3f}"),
+        ("ganho, datas distintas", f"{mixed_distinct_time / parsed_distinct_time:.1f}x"),
+        ("mesmo resultado, datas distintas", mixed_distinct.equals(parsed_distinct)),
+        *((f"tabela gold {name} (s)", f"{elapsed:.3f}") for name, elapsed in bucket_times.items()),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+    Mede a vazão do backfill (datas processadas por segundo) de acordo com a quantidade de processos,
+    sobre uma camada bronze com várias datas geradas a partir do dia de exemplo.
+
+    Uso: python benchmarks/bench_backfill.py [--days 24] [--repeat 50] [--workers 1 2 4 8]
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import pandas as pd
+from _common import BRONZE_PATH, SAMPLE_DATE, report
+from etl.backfill import DataBackfill
+from etl.storage import get_storage, list_tables, read_table
+
+
+def build_bronze(directory, dates, repeat):
+    """
+        Copia as tabelas do dia de exemplo para cada data, repetindo as linhas de cada tabela.
+    """
+    storage = get_storage()
+    for local in os.listdir(BRONZE_PATH):
+        for table in list_tables(os.path.join(BRONZE_PATH, local, SAMPLE_DATE)):
+            df = read_table(table)
+            # Variação por cópia para que as linhas repetidas não sejam descartadas como duplicadas
+            df = pd.concat([df.assign(IMO=f"{copy}") for copy in range(repeat)], ignore_index=True)
+            for date in dates:
+                target = os.path.join(directory, "bronze", local, date)
+                os.makedirs(target, exist_ok=True)
+                storage.write(df, os.path.join(target, os.path.basename(table)))
+
+
+def timed_backfill(directory, dates, workers):
+    """
+        Executa o backfill completo do intervalo em uma cópia limpa das camadas silver e gold.
+    """
+    for folder in ("silver", "gold", "state"):
+        shutil.rmtree(os.path.join(directory, folder), ignore_errors=True)
+
+    backfill = DataBackfill(dates[0], dates[-1], max_workers=workers)
+    backfill.data_path = directory
+    backfill.state_path = os.path.join(directory, "state", "backfill_state.json")
+    start = time.perf_counter()
+    failures = backfill.execute_backfill_process()
+    return time.perf_counter() - start, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=24, help="Quantidade de datas geradas.")
+    parser.add_argument("--repeat", type=int, default=50, help="Quantas vezes repetir as linhas de cada tabela.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Quantidades de processos medidas.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.WARNING)
+
+    dates = list(pd.date_range(end=SAMPLE_DATE, periods=args.days).strftime("%Y-%m-%d"))
+    directory = tempfile.mkdtemp()
+    rows = [("CPUs disponíveis", os.cpu_count()), ("datas", len(dates))]
+    try:
+        build_bronze(directory, dates, args.repeat)
+        baseline = None
+        for workers in args.workers:
+            elapsed, failures = timed_backfill(directory, dates, workers)
+            baseline = baseline or elapsed
+            rows.append((
+                f"{workers} processo(s)",
+                f"{elapsed:.2f}s, {len(dates) / elapsed:.2f} datas/s, speedup {baseline / elapsed:.1f}x"
+                + (f", {len(failures)} falhas" if failures else "")
+            ))
+    finally:
+        shutil.rmtree(directory)
+
+    report("Backfill paralelo", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+    Compara o caminho antigo (df.apply linha a linha, copiado da versão inicial do projeto) com o motor
+    de coalescência vetorizado da camada silver, usando os mesmos dados da pasta bronze.
+
+    O caminho antigo não convertia as datas de chegada nem usava a coluna 'ETA', e convertia os pesos
+    sem o separador decimal de cada porto; por isso apenas 'Sentido' e 'Mercadoria' são comparadas
+    diretamente, e as datas e os pesos são contados linha a linha.
+
+    Uso: python benchmarks/bench_coalesce.py [--scale N]
+"""
+import argparse
+import pandas as pd
+from _common import BRONZE_PATH, SAMPLE_DATE, best_of, report
+from etl.parsers import parse_arrival
+from etl.transform import DataTransform
+
+
+class LegacyTransform:
+    """
+        Cópia literal das transformações linha a linha (df.apply) da versão inicial do projeto, antes do
+        motor de coalescência. Elas não convertem as datas de chegada, não usam a coluna 'ETA' de Paranaguá
+        e convertem os pesos sem considerar o separador decimal de cada porto.
+    """
+
+    def process_operat_column(self, df):
+        """
+            Processa a coluna 'Operaç Operat', criando ou ajustando a coluna 'Sentido'.
+
+            Args:
+                df (pd.DataFrame): DataFrame com a coluna 'Operaç Operat'.
+
+            Returns:
+                pd.DataFrame: DataFrame com a coluna 'Sentido' ajustada.
+        """
+        if 'Operaç Operat' in df.columns:
+            if 'Sentido' not in df.columns:
+                df['Sentido'] = None
+
+            df['Sentido'] = df.apply(
+                lambda row: (
+                    'Imp' if row['Operaç Operat'] == 'EMB' else 
+                    'Exp' if row['Operaç Operat'] == 'DESC' else 
+                    'Imp/Exp' if pd.isna(row['Sentido']) else row['Sentido']
+                ), axis=1
+            )
+            df = df.drop(columns=['Operaç Operat'])
+        return df
+
+    def process_mercadoria_column(self, df):
+        """
+            Transfere os dados de 'Mercadoria Goods' para a coluna 'Mercadoria'.
+
+            Args:
+                df (pd.DataFrame): DataFrame com os dados de 'Mercadoria Goods'.
+        """
+        if 'Mercadoria Goods' in df.columns:
+            df['Mercadoria'] = df.apply(
+                lambda row: row['Mercadoria Goods'] if pd.isna(row['Mercadoria']) else row['Mercadoria'], axis=1
+            )
+            df = df.drop(columns=['Mercadoria Goods'])
+        return df
+
+    
+
+    def process_chegada_column(self, df):
+        """
+            Transfere os dados de 'Cheg/Arrival d/m/y' para a coluna 'Chegada'.
+
+            Args:
+                df (pd.DataFrame): DataFrame a ser processado.
+        """
+        if 'Cheg/Arrival d/m/y' in df.columns:
+            df['Chegada'] = df.apply(
+                lambda row: row['Cheg/Arrival d/m/y'] if pd.isna(row['Chegada']) else row['Chegada'], axis=1
+            )
+            df = df.drop(columns=['Cheg/Arrival d/m/y'])
+        return df
+
+    def clean_and_covert_weight_column(self, value):
+        """
+            Limpa e converte o valor da coluna 'Peso Weight' para float.
+        
+            Args:
+                value (str): Valor da coluna 'Peso Weight'.
+
+            Returns:
+                float: Valor da coluna 'Peso Weight' convertido para float.
+        """
+        if isinstance(value, str):
+            value = value.replace(' Tons.', '').replace(',', '')
+            try:
+                if len(value.split()) > 1:
+                    return float(sum(map(float, value.split())))/len(value.split())
+                return float(value)
+            except ValueError:
+                return None
+        
+
+
+
+    def process_saldo_column(self, df):
+        """
+            Transfere os dados de 'Peso Weight' para a coluna 'Saldo Total'.
+
+            Args:
+                df (pd.DataFrame): DataFrame a ser processado.
+
+            Returns:
+                pd.DataFrame: DataFrame processado.
+        """
+        if 'Peso Weight' in df.columns:
+            df['Previsto'] = df.apply(
+                lambda row: self.clean_and_covert_weight_column(row['Peso Weight']) if pd.isna(row['Previsto']) else self.clean_and_covert_weight_column(row['Previsto']), axis=1
+            )
+        return df
+
+    def reorder_columns(self, df):
+        """
+            Reordena as colunas do DataFrame para manter somente as desejadas.
+
+            Args:
+                df (pd.DataFrame): DataFrame a ser reordenado.
+        """
+        df = df[['Chegada', 'Sentido', 'local', 'Mercadoria', 'Previsto']]
+
+        df = df.rename(columns={'Previsto': 'Peso'})
+        return df
+
+
+def legacy_process(transform, df):
+    """
+        Executa as transformações da versão inicial, na mesma ordem de execute_silver_process.
+    """
+    df = df.copy()
+    df = transform.process_operat_column(df)
+    df = transform.process_mercadoria_column(df)
+    df = transform.process_chegada_column(df)
+    df = transform.process_saldo_column(df)
+    return transform.reorder_columns(df)
+
+
+def vectorized_process(transform, df):
+    """
+        Executa as mesmas etapas utilizando o motor de coalescência.
+    """
+    df = df.copy()
+    df = transform.process_operat_column(df)
+    df = transform.process_mercadoria_column(df)
+    df = transform.process_chegada_column(df)
+    df = transform.process_saldo_column(df)
+    return transform.reorder_columns(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=200, help="Quantas vezes replicar os dados bronze.")
+    args = parser.parse_args()
+
+    transform = DataTransform(SAMPLE_DATE)
+    transform.root_path = BRONZE_PATH
+    bronze = transform.remove_duplicates(transform.join_data())
+
+    # Sentido e mercadoria devem ser iguais; datas e pesos só nas linhas que o caminho antigo já tratava
+    legacy = legacy_process(LegacyTransform(), bronze).reset_index(drop=True)
+    vectorized = vectorized_process(transform, bronze).reset_index(drop=True)
+    same_columns = all(
+        legacy[column].astype(object).equals(vectorized[column].astype(object)) for column in ('Sentido', 'Mercadoria')
+    )
+    same_arrivals = (parse_arrival(legacy['Chegada']) == vectorized['Chegada']).sum()
+    same_weights = (legacy['Peso'] == vectorized['Peso']).sum()
+
+    scaled = pd.concat([bronze] * args.scale, ignore_index=True)
+    legacy_time, _ = best_of(lambda: legacy_process(LegacyTransform(), scaled), repeat=3)
+    vectorized_time, _ = best_of(lambda: vectorized_process(transform, scaled), repeat=3)
+
+    report("Coalescência da camada silver", [
+        ("linhas bronze", len(bronze)),
+        ("Sentido e Mercadoria idênticas", same_columns),
+        ("datas de chegada iguais", f"{same_arrivals} de {len(bronze)}"),
+        ("pesos iguais", f"{same_weights} de {len(bronze)}"),
+        ("linhas no benchmark", len(scaled)),
+        ("df.apply (s)", f"{legacy_time:.3f}"),
+        ("vetorizado (s)", f"{vectorized_time:.3f}"),
+        ("ganho", f"{legacy_time / vectorized_time:.1f}x"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
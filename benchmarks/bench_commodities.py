@@ -0,0 +1,79 @@
+"""
+    Compara a normalização dos nomes de mercadoria linha a linha com o CommodityCanonicalizer, que
+    normaliza cada nome distinto uma única vez (com a tabela de nomes vazia e já preenchida), e mostra
+    quantos grupos da camada gold (local, Sentido e Mercadoria) existem antes e depois da normalização.
+    Os nomes vêm de um dia sintético (ver synthetic.py).
+
+    Uso: python benchmarks/bench_commodities.py [--rows 1000000]
+"""
+import argparse
+import os
+import tempfile
+import pandas as pd
+from _common import SAMPLE_DATE, best_of, report
+from synthetic import load_templates, synthetic_day
+from etl.commodities import CommodityCanonicalizer, clean_name, comparison_key
+from etl.transform import DataTransform
+
+
+def commodity_rows(rows):
+    """
+        Monta as colunas local, Sentido e Mercadoria de um dia sintético, como na camada silver, mas ainda
+        com os nomes de mercadoria originais.
+    """
+    transform = DataTransform(SAMPLE_DATE)
+    frames = []
+    for (local, _), df in synthetic_day(load_templates(), SAMPLE_DATE, rows).items():
+        df = transform.coalescer.apply(df.assign(local=local), force=True)
+        frames.append(df[['local', 'Sentido', 'Mercadoria']])
+    return pd.concat(frames, ignore_index=True).dropna(subset=['Mercadoria'])
+
+
+def per_row_canonicalize(values):
+    """
+        Mesma normalização de CommodityCanonicalizer, feita linha a linha e sem a tabela de nomes.
+    """
+    names = {}
+
+    def canonical(value):
+        name = clean_name(value)
+        return names.setdefault(comparison_key(name), name)
+    return values.map(canonical)
+
+
+def groups(df):
+    return df.groupby(['local', 'Sentido', 'Mercadoria'], observed=True).ngroups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Quantidade aproximada de linhas do dia sintético.")
+    args = parser.parse_args()
+
+    df = commodity_rows(args.rows)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "commodity_aliases.json")
+        per_row_time, per_row = best_of(lambda: per_row_canonicalize(df['Mercadoria']), repeat=1)
+        cold_time, canonical = best_of(lambda: CommodityCanonicalizer(path).canonicalize(df['Mercadoria']), repeat=3)
+
+        canonicalizer = CommodityCanonicalizer(path)
+        canonicalizer.canonicalize(df['Mercadoria'])
+        canonicalizer.save()
+        warm_time, _ = best_of(lambda: CommodityCanonicalizer(path).canonicalize(df['Mercadoria']), repeat=3)
+
+    report("Nomes de mercadoria", [
+        ("linhas", len(df)),
+        ("nomes distintos", df['Mercadoria'].nunique()),
+        ("nomes canônicos", canonical.nunique()),
+        ("linha a linha (s)", f"{per_row_time:.3f}"),
+        ("por nome distinto, tabela vazia (s)", f"{cold_time:.3f}"),
+        ("por nome distinto, tabela salva (s)", f"{warm_time:.3f}"),
+        ("ganho", f"{per_row_time / warm_time:.1f}x"),
+        ("mesmo resultado da linha a linha", bool((per_row == canonical).all())),
+        ("grupos da camada gold antes", groups(df)),
+        ("grupos da camada gold depois", groups(df.assign(Mercadoria=canonical))),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+    Mede a gravação das camadas silver e gold no banco SQLite (SqliteSink) em milhões de linhas: inserção
+    linha a linha com uma transação por linha, DataFrame.to_sql do pandas e o SqliteSink (lotes com
+    executemany em uma transação por data, substituindo a data na camada silver e com upsert na gold),
+    além da regravação de todas as datas. Em seguida,
+    compara o tempo das consultas mais comuns usando os índices e sem eles (NOT INDEXED).
+
+    As datas são geradas a partir do dia de exemplo, deslocando as datas de chegada.
+
+    Uso: python benchmarks/bench_database.py [--days 365] [--repeat 20] [--row-by-row 20000]
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+import warnings
+import pandas as pd
+from _common import DATA_PATH, SAMPLE_DATE, best_of, report
+from etl.database import SqliteSink
+from etl.load import AGGREGATE_KEYS, aggregate_day
+from etl.parsers import parse_arrival
+from etl.storage import read_table
+
+# Consultas medidas: (descrição, tabela, filtros em SQL, parâmetros)
+QUERIES = [
+    ("silver: importações de Paranaguá chegando em 10 dias", "silver",
+     '"local" = ? AND "Sentido" = ? AND "Chegada" BETWEEN ? AND ?', ("paranagua", "Imp", "2024-12-01", "2024-12-10 23:59:59")),
+    ("silver: soja chegando em 30 dias", "silver",
+     '"Mercadoria" = ? AND "Chegada" BETWEEN ? AND ?', ("SOJA", "2024-11-01", "2024-11-30 23:59:59")),
+    ("gold: histórico de uma mercadoria", "gold",
+     '"local" = ? AND "Sentido" = ? AND "Mercadoria" = ?', ("paranagua", "Exp", "SOJA")),
+]
+
+
+def build_days(days, repeat):
+    """
+        Gera as camadas silver e gold de vários dias em memória, a partir do dia de exemplo.
+
+        Returns:
+            dict: Tupla (silver, gold) de cada data.
+    """
+    sample = read_table(os.path.join(DATA_PATH, "silver", SAMPLE_DATE))
+    sample = pd.concat([sample] * repeat, ignore_index=True)
+    arrivals = parse_arrival(sample['Chegada'])
+    tables = {}
+    for date in pd.date_range(end=SAMPLE_DATE, periods=days):
+        df = sample.assign(Chegada=arrivals + (date - pd.Timestamp(SAMPLE_DATE)))
+        gold = aggregate_day(df.dropna(subset=['Chegada']))[AGGREGATE_KEYS + ['Peso', 'Total']]
+        tables[date.strftime("%Y-%m-%d")] = (df, gold)
+    return tables
+
+
+def write_row_by_row(path, tables, limit):
+    """
+        Insere as linhas silver uma a uma, com uma transação por linha, até o limite de linhas.
+
+        Returns:
+            int: Quantidade de linhas inseridas.
+    """
+    SqliteSink(path).connect().close()
+    connection = sqlite3.connect(path, isolation_level=None)
+    connection.execute("PRAGMA synchronous=NORMAL")
+    written = 0
+    for date, (df, _) in tables.items():
+        for row in df.itertuples(index=False):
+            chegada = None if pd.isna(row.Chegada) else str(row.Chegada)
+            connection.execute(
+                'INSERT INTO silver VALUES (?, ?, ?, ?, ?, ?)',
+                (date, row.local, chegada, row.Sentido, row.Mercadoria, row.Peso)
+            )
+            written += 1
+            if written == limit:
+                connection.close()
+                return written
+    connection.close()
+    return written
+
+
+def write_to_sql(path, tables):
+    """
+        Grava as camadas com DataFrame.to_sql (executemany, apenas inserindo) nas mesmas tabelas e índices.
+    """
+    SqliteSink(path).connect().close()
+    connection = sqlite3.connect(path)
+    for date, (df, gold) in tables.items():
+        silver = df.assign(Data=date, Chegada=df['Chegada'].dt.strftime("%Y-%m-%d %H:%M:%S"))
+        silver[['Data', 'local', 'Chegada', 'Sentido', 'Mercadoria', 'Peso']].to_sql(
+            "silver", connection, if_exists="append", index=False, chunksize=50_000)
+        gold.assign(Data=date).to_sql("gold", connection, if_exists="append", index=False)
+        connection.commit()
+    connection.close()
+
+
+def write_sink(sink, tables):
+    for date, (df, gold) in tables.items():
+        sink.write_silver(date, df)
+        sink.write_gold(date, gold)
+
+
+def query_times(sink, repeat):
+    """
+        Mede cada consulta usando os índices e sem eles, verificando se os resultados são iguais.
+    """
+    rows = []
+    for title, table, conditions, params in QUERIES:
+        indexed_time, indexed = best_of(
+            lambda: sink.query(f'SELECT * FROM {table} WHERE {conditions}', params), repeat=repeat)
+        scan_time, scan = best_of(
+            lambda: sink.query(f'SELECT * FROM {table} NOT INDEXED WHERE {conditions}', params), repeat=repeat)
+        same = indexed.sort_values(list(indexed.columns)).reset_index(drop=True).equals(
+            scan.sort_values(list(scan.columns)).reset_index(drop=True))
+        rows.extend([
+            (f"{title}: linhas", f"{len(indexed):,}{'' if same else ' (resultado diferente!)'}"),
+            (f"{title}: sem índice (ms)", f"{scan_time * 1000:.2f}"),
+            (f"{title}: com índice (ms)", f"{indexed_time * 1000:.2f}"),
+        ])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365, help="Quantidade de dias gravados.")
+    parser.add_argument("--repeat", type=int, default=20, help="Quantas vezes repetir as linhas do dia de exemplo.")
+    parser.add_argument("--row-by-row", type=int, default=20_000,
+                        help="Quantidade de linhas da inserção linha a linha (mais lenta).")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.INFO)
+
+    tables = build_days(args.days, args.repeat)
+    silver_rows = sum(len(df) for df, _ in tables.values())
+    gold_rows = sum(len(gold) for _, gold in tables.values())
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        written = write_row_by_row(os.path.join(directory, "row_by_row.db"), tables, args.row_by_row)
+        row_by_row_rate = written / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        write_to_sql(os.path.join(directory, "to_sql.db"), tables)
+        to_sql_time = time.perf_counter() - start
+
+        with SqliteSink(os.path.join(directory, "lineup.db")) as sink:
+            start = time.perf_counter()
+            write_sink(sink, tables)
+            sink_time = time.perf_counter() - start
+
+            # Regravar todas as datas não pode duplicar linhas
+            start = time.perf_counter()
+            write_sink(sink, tables)
+            rewrite_time = time.perf_counter() - start
+            counts = sink.query('SELECT (SELECT COUNT(*) FROM silver) AS silver, (SELECT COUNT(*) FROM gold) AS gold')
+
+            rows = [
+                ("datas", args.days),
+                ("linhas silver / gold", f"{silver_rows:,} / {gold_rows:,}"),
+                ("linha a linha, uma transação por linha (linhas/s)", f"{row_by_row_rate:,.0f}"),
+                ("DataFrame.to_sql (linhas/s)", f"{(silver_rows + gold_rows) / to_sql_time:,.0f}"),
+                ("SqliteSink (linhas/s)", f"{(silver_rows + gold_rows) / sink_time:,.0f}"),
+                ("SqliteSink, regravando todas as datas (linhas/s)", f"{(silver_rows + gold_rows) / rewrite_time:,.0f}"),
+                ("linhas no banco após a regravação", f"{counts['silver'][0]:,} / {counts['gold'][0]:,}"),
+                ("tamanho do banco (MB)", f"{os.path.getsize(os.path.join(directory, 'lineup.db')) / 1024 ** 2:.1f}"),
+            ]
+            rows.extend(query_times(sink, repeat=5))
+
+    report(f"Banco SQLite com {silver_rows:,} linhas silver", rows)
+
+
+if __name__ == "__main__":
+    main()
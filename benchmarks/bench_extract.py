@@ -0,0 +1,74 @@
+"""
+    Compara a extração sequencial com a extração concorrente contra o servidor local
+    (stub_server.py), simulando latência das páginas e falhas temporárias.
+
+    Uso: python benchmarks/bench_extract.py [--delay 1.0]
+"""
+import argparse
+import time
+import warnings
+from _common import report
+from stub_server import StubPortServer
+from etl.extract import DataExtractor
+
+
+def run(stub, concurrent, **extractor_options):
+    extractor = DataExtractor(urls=stub.urls, **extractor_options)
+    start = time.perf_counter()
+    results = extractor.extract_all(concurrent=concurrent)
+    return time.perf_counter() - start, results
+
+
+def run_polling(extractor):
+    start = time.perf_counter()
+    results = extractor.extract_all(today="2025-01-22")
+    return time.perf_counter() - start, results
+
+
+def describe(results):
+    return ", ".join(
+        f"{city}={len(result.data)} tabelas" if result.ok else f"{city}=falhou ({type(result.error).__name__})"
+        for city, result in results.items()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay", type=float, default=1.0, help="Latência simulada de cada página, em segundos.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    delays = {"santos": args.delay, "paranagua": args.delay}
+    rows = []
+    with StubPortServer(delays=delays) as stub:
+        sequential_time, results = run(stub, concurrent=False)
+        rows.append(("sequencial (s)", f"{sequential_time:.2f} [{describe(results)}]"))
+        concurrent_time, results = run(stub, concurrent=True)
+        rows.append(("concorrente (s)", f"{concurrent_time:.2f} [{describe(results)}]"))
+
+    # Santos responde 503 duas vezes antes de funcionar: as novas tentativas recuperam a página
+    with StubPortServer(failures={"santos": 2}) as stub:
+        elapsed, results = run(stub, concurrent=True, backoff_factor=0.1)
+        rows.append(("503 temporário (s)", f"{elapsed:.2f} [{describe(results)}], requisições={stub.requests}"))
+
+    # Paranaguá demora mais que o timeout: Santos é extraída mesmo assim
+    with StubPortServer(delays={"paranagua": 3}) as stub:
+        elapsed, results = run(stub, concurrent=True, retries=0, timeouts={"paranagua": (1, 1)})
+        rows.append(("timeout em uma fonte (s)", f"{elapsed:.2f} [{describe(results)}]"))
+
+    # Consultas repetidas no mesmo dia: com ETag (304) ou apenas com o hash do conteúdo
+    for conditional in (True, False):
+        with StubPortServer(conditional=conditional) as stub:
+            extractor = DataExtractor(urls=stub.urls)
+            first_time, results = run_polling(extractor)
+            extractor.state = {city: result.validators for city, result in results.items()}
+            second_time, results = run_polling(extractor)
+            unchanged = [city for city, result in results.items() if not result.changed]
+            label = "ETag" if conditional else "hash do conteúdo"
+            rows.append((f"nova consulta, {label} (s)", f"{first_time:.3f} -> {second_time:.3f}, inalteradas={unchanged}"))
+
+    report("Extração das páginas de line-up", rows)
+
+
+if __name__ == "__main__":
+    main()
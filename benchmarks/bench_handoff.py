@@ -0,0 +1,149 @@
+"""
+    Compara a execução das camadas bronze, silver e gold passando pelo disco (cada etapa relê os arquivos
+    da anterior) com a passagem das tabelas em memória (TableHandoff), em que os arquivos são gravados em
+    segundo plano. As tabelas extraídas são simuladas com um dia sintético (ver synthetic.py), e os
+    arquivos gravados pelos dois modos são comparados byte a byte.
+
+    Com --write-latency, cada tabela gravada espera o tempo informado antes da gravação, simulando um
+    disco lento (ex.: volume de rede), em que a gravação em segundo plano se sobrepõe às transformações.
+
+    Uso: python benchmarks/bench_handoff.py [--rows 100000] [--repeat 3] [--format numpy] [--write-latency 0]
+"""
+import argparse
+import filecmp
+import logging
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import pandas as pd
+from _common import SAMPLE_DATE, report
+from synthetic import load_templates, synthetic_day
+from etl.load import DataLoader
+from etl.storage import TableHandoff, get_storage
+from etl.transform import DataTransform
+
+
+def as_extracted(df):
+    """
+        Converte para número as colunas em que todos os valores preenchidos são numéricos, como na extração.
+    """
+    return df.apply(lambda values: pd.to_numeric(values, errors="ignore"))
+
+
+def with_latency(storage, latency):
+    """
+        Simula um disco lento, esperando latency segundos antes de gravar cada tabela.
+    """
+    write_encoded = storage.write_encoded
+
+    def slow_write_encoded(files, stem):
+        time.sleep(latency)
+        return write_encoded(files, stem)
+    storage.write_encoded = slow_write_encoded
+    return storage
+
+
+def run_pipeline(directory, tables, storage, handoff=None):
+    data_path = os.path.join(directory, "data")
+    bronze_path = os.path.join(data_path, "bronze")
+    for (local, name), df in tables.items():
+        table_path = os.path.join(bronze_path, local, SAMPLE_DATE, name)
+        os.makedirs(os.path.dirname(table_path), exist_ok=True)
+        if handoff is not None:
+            handoff.write(storage, df, table_path)
+        else:
+            storage.write(df, table_path)
+
+    transform = DataTransform(SAMPLE_DATE, storage=storage, handoff=handoff)
+    transform.root_path = bronze_path
+    transform.output_path = os.path.join(data_path, "silver")
+    transform.manifest_path = os.path.join(data_path, "state", "bronze_manifest.json")
+    transform.cache_path = os.path.join(data_path, "state", "silver_cache")
+    transform.aliases_path = os.path.join(data_path, "state", "commodity_aliases.json")
+    transform.execute_silver_process()
+
+    loader = DataLoader(SAMPLE_DATE, storage=storage, handoff=handoff)
+    loader.root_path = transform.output_path
+    loader.output_path = os.path.join(data_path, "gold")
+    loader.aggregates_path = os.path.join(data_path, "gold", "aggregates")
+    loader.rolling_path = os.path.join(data_path, "gold", "rolling")
+    loader.buckets_path = os.path.join(data_path, "gold", "buckets")
+    loader.execute_gold_process()
+
+
+def timed_run(tables, storage, pipeline):
+    directory = tempfile.mkdtemp()
+    start = time.perf_counter()
+    if pipeline:
+        with TableHandoff() as handoff:
+            run_pipeline(directory, tables, storage, handoff)
+    else:
+        run_pipeline(directory, tables, storage)
+    return time.perf_counter() - start, directory
+
+
+def same_files(left, right):
+    """
+        Compara byte a byte os arquivos gravados, exceto o manifesto (que guarda datas de modificação).
+    """
+    comparison = filecmp.dircmp(left, right, ignore=["bronze_manifest.json"])
+    pending = [comparison]
+    while pending:
+        current = pending.pop()
+        if current.left_only or current.right_only:
+            return False
+        _, mismatch, errors = filecmp.cmpfiles(current.left, current.right, current.common_files, shallow=False)
+        if mismatch or errors:
+            return False
+        pending.extend(current.subdirs.values())
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000, help="Quantidade aproximada de linhas bronze do dia.")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções de cada modo (vale o menor tempo).")
+    parser.add_argument("--format", default=None, help="Formato das tabelas (csv, numpy ou parquet).")
+    parser.add_argument("--write-latency", type=float, default=0,
+                        help="Espera, em milissegundos, antes da gravação de cada tabela (simula um disco lento).")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.INFO)
+
+    storage = get_storage(args.format)
+    if args.write_latency:
+        storage = with_latency(storage, args.write_latency / 1000)
+    tables = {key: as_extracted(df) for key, df in synthetic_day(load_templates(), SAMPLE_DATE, args.rows).items()}
+
+    results = {}
+    directories = {}
+    for pipeline in (False, True):
+        best = float("inf")
+        for _ in range(args.repeat):
+            elapsed, directory = timed_run(tables, storage, pipeline)
+            best = min(best, elapsed)
+            if pipeline in directories:
+                shutil.rmtree(directory)
+            else:
+                directories[pipeline] = directory
+        results[pipeline] = best
+
+    try:
+        identical = same_files(directories[False], directories[True])
+    finally:
+        for directory in directories.values():
+            shutil.rmtree(directory)
+
+    latency = f", {args.write_latency:g} ms por gravação" if args.write_latency else ""
+    report(f"Bronze, silver e gold com {args.rows} linhas ({storage.name}{latency})", [
+        ("passando pelo disco (s)", f"{results[False]:.3f}"),
+        ("em memória, gravação em segundo plano (s)", f"{results[True]:.3f}"),
+        ("ganho", f"{results[False] / results[True]:.2f}x"),
+        ("arquivos idênticos", identical),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+    Compara o tempo de parsing e o pico de memória da extração das tabelas de line-up:
+    pd.read_html em todas as tabelas (caminho antigo) contra a extração direcionada com lxml.
+
+    As páginas são montadas a partir dos CSVs de data/bronze (ver stub_server.py).
+
+    Uso: python benchmarks/bench_html_tables.py [--repeat 20]
+"""
+import argparse
+import tracemalloc
+import warnings
+from io import StringIO
+import pandas as pd
+from _common import best_of, report
+from stub_server import render_page
+from etl.extract import DataExtractor
+
+
+def legacy_santos(page):
+    return pd.read_html(StringIO(page))
+
+
+def legacy_paranagua(page):
+    data = pd.read_html(StringIO(page), header=None, index_col=0)
+    return [
+        df for df in data
+        if not (df.empty or len(df) < 2) and df.columns[0][1].upper() == "PROGRAMAÇÃO"
+    ]
+
+
+def flatten_legacy(data):
+    """
+        Aplica o achatamento do cabeçalho feito antes em execute_bronze_process.
+    """
+    tables = {}
+    for df in data:
+        title = df.columns[0][0]
+        df = df.copy()
+        df.columns = df.columns.get_level_values(1)
+        tables[title] = df.reset_index(drop=True)
+    return tables
+
+
+def measure(function, page):
+    """
+        Retorna o tempo (s), o pico de memória alocada (MB) e o resultado da função.
+
+        O tempo é medido sem o tracemalloc, que deixa as alocações bem mais lentas.
+    """
+    elapsed, result = best_of(lambda: function(page), repeat=3)
+
+    tracemalloc.start()
+    function(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 ** 2, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20, help="Quantas vezes repetir as linhas de cada tabela.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    extractor = DataExtractor()
+    cases = {
+        "santos": (legacy_santos, extractor._extract_santos),
+        "paranagua": (legacy_paranagua, extractor._extract_paranagua),
+    }
+
+    rows = []
+    for city, (legacy, targeted) in cases.items():
+        page = render_page(city, repeat=args.repeat)
+        legacy_time, legacy_peak, legacy_data = measure(legacy, page)
+        targeted_time, targeted_peak, targeted_data = measure(targeted, page)
+
+        legacy_tables = flatten_legacy(legacy_data)
+        identical = legacy_tables.keys() == targeted_data.keys() and all(
+            legacy_tables[title].to_csv(index=False) == targeted_data[title].to_csv(index=False)
+            for title in legacy_tables
+        )
+        rows += [
+            (f"{city}: página (MB)", f"{len(page.encode('utf-8')) / 1024 ** 2:.1f}"),
+            (f"{city}: pd.read_html", f"{legacy_time:.3f}s, pico {legacy_peak:.1f} MB"),
+            (f"{city}: lxml direcionado", f"{targeted_time:.3f}s, pico {targeted_peak:.1f} MB"),
+            (f"{city}: tabelas idênticas", identical),
+        ]
+
+    report("Extração das tabelas HTML", rows)
+
+
+if __name__ == "__main__":
+    main()
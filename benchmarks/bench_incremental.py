@@ -0,0 +1,89 @@
+"""
+    Mede a camada silver completa contra a incremental (manifesto + cache por arquivo bronze)
+    em execuções repetidas no mesmo dia.
+
+    Uso: python benchmarks/bench_incremental.py [--repeat 200]
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import pandas as pd
+from _common import BRONZE_PATH, SAMPLE_DATE, report
+from etl.storage import get_storage, list_tables, read_table
+from etl.transform import DataTransform
+
+
+def build_bronze(directory, repeat):
+    """
+        Copia o dia de exemplo para uma pasta temporária, repetindo as linhas de cada tabela.
+    """
+    storage = get_storage()
+    for local in os.listdir(BRONZE_PATH):
+        source = os.path.join(BRONZE_PATH, local, SAMPLE_DATE)
+        target = os.path.join(directory, "bronze", local, SAMPLE_DATE)
+        os.makedirs(target)
+        for table in list_tables(source):
+            df = read_table(table)
+            # Variação por cópia para que as linhas repetidas não sejam descartadas como duplicadas
+            copies = [df.assign(IMO=f"{copy}") for copy in range(repeat)]
+            storage.write(pd.concat(copies, ignore_index=True), os.path.join(target, os.path.basename(table)))
+
+
+def build_transform(directory, incremental):
+    transform = DataTransform(SAMPLE_DATE, incremental=incremental)
+    transform.root_path = os.path.join(directory, "bronze")
+    transform.output_path = os.path.join(directory, "silver")
+    transform.manifest_path = os.path.join(directory, "state", "bronze_manifest.json")
+    transform.cache_path = os.path.join(directory, "state", "silver_cache")
+    transform.aliases_path = os.path.join(directory, "state", "commodity_aliases.json")
+    return transform
+
+
+def timed_run(transform):
+    start = time.perf_counter()
+    transform.execute_silver_process()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200, help="Quantas vezes repetir as linhas de cada tabela.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.INFO)
+
+    directory = tempfile.mkdtemp()
+    try:
+        build_bronze(directory, args.repeat)
+        silver = os.path.join(directory, "silver", SAMPLE_DATE)
+
+        full_time = timed_run(build_transform(directory, incremental=False))
+        full = read_table(silver)
+        cold_time = timed_run(build_transform(directory, incremental=True))
+        warm_time = timed_run(build_transform(directory, incremental=True))
+
+        # Regrava uma das tabelas com uma linha a mais
+        table = list_tables(os.path.join(directory, "bronze", "santos", SAMPLE_DATE))[0]
+        df = read_table(table)
+        get_storage().write(pd.concat([df, df.tail(1).assign(IMO="nova")], ignore_index=True), table)
+        changed_time = timed_run(build_transform(directory, incremental=True))
+        incremental = read_table(silver)
+    finally:
+        shutil.rmtree(directory)
+
+    report("Camada silver incremental", [
+        ("linhas silver", len(full)),
+        ("completa (s)", f"{full_time:.3f}"),
+        ("incremental, sem cache (s)", f"{cold_time:.3f}"),
+        ("incremental, nada mudou (s)", f"{warm_time:.3f}"),
+        ("incremental, 1 arquivo mudou (s)", f"{changed_time:.3f}"),
+        ("linhas após a mudança", len(incremental)),
+    ])
+
+
+if __name__ == "__main__":
+    main()
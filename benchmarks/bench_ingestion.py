@@ -0,0 +1,103 @@
+"""
+    Mede a leitura das tabelas bronze de um dia sintético (ver synthetic.py) em sequência e em threads
+    (DataTransform.join_data com read_workers), e a camada silver incremental sem cache, com as tabelas
+    transformadas na própria execução e em processos separados (clean_workers). Também compara o
+    pd.concat único com o alinhamento prévio das colunas de cada tabela (reindex) antes do pd.concat.
+
+    O ganho depende da quantidade de núcleos: em uma máquina com um único núcleo, a leitura em threads
+    e os processos separados não são mais rápidos.
+
+    Uso: python benchmarks/bench_ingestion.py [--rows 500000] [--workers 1 2 4 8] [--format csv]
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import warnings
+import pandas as pd
+from _common import SAMPLE_DATE, best_of, report
+from synthetic import load_templates, synthetic_day, write_day
+from etl.storage import get_storage
+from etl.transform import DataTransform
+
+
+def build_transform(directory, **kwargs):
+    transform = DataTransform(SAMPLE_DATE, **kwargs)
+    transform.root_path = os.path.join(directory, "bronze")
+    transform.output_path = os.path.join(directory, "silver")
+    transform.aliases_path = os.path.join(directory, "state", "commodity_aliases.json")
+    return transform
+
+
+def cold_incremental(directory, **kwargs):
+    """
+        Monta a camada silver incremental com o manifesto e o cache vazios, transformando todas as tabelas.
+    """
+    state_path = os.path.join(directory, "state")
+    shutil.rmtree(state_path, ignore_errors=True)
+    transform = build_transform(directory, **kwargs)
+    transform.manifest_path = os.path.join(state_path, "bronze_manifest.json")
+    transform.cache_path = os.path.join(state_path, "silver_cache")
+    return transform.join_transformed_data()
+
+
+def concat_reindexed(frames):
+    """
+        Alinha as colunas de todas as tabelas antes do pd.concat.
+    """
+    columns = list(dict.fromkeys(column for df in frames for column in df.columns))
+    return pd.concat([df.reindex(columns=columns) for df in frames], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000, help="Quantidade aproximada de linhas bronze do dia.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Quantidades de threads e processos.")
+    parser.add_argument("--format", default="csv", help="Formato das tabelas bronze (csv, numpy ou parquet).")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções de cada medida (vale o menor tempo).")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.INFO)
+
+    directory = tempfile.mkdtemp()
+    try:
+        tables = synthetic_day(load_templates(), SAMPLE_DATE, args.rows)
+        rows = write_day(tables, os.path.join(directory, "bronze"), SAMPLE_DATE, get_storage(args.format))
+        results = [
+            ("CPUs", os.cpu_count()),
+            ("tabelas bronze / linhas", f"{len(tables)} / {rows:,}"),
+        ]
+
+        reference = None
+        for workers in args.workers:
+            transform = build_transform(directory, incremental=False, read_workers=workers)
+            elapsed, df = best_of(transform.join_data, repeat=args.repeat)
+            reference = df if reference is None else reference
+            results.append((f"join_data, {workers} threads (s)",
+                            f"{elapsed:.3f}{'' if df.equals(reference) else ' (resultado diferente!)'}"))
+
+        frames = [transform._read_bronze_table(table_path, local) for local, table_path in transform._bronze_tables()]
+        concat_time, _ = best_of(lambda: pd.concat(frames, ignore_index=True), repeat=args.repeat)
+        reindex_time, aligned = best_of(lambda: concat_reindexed(frames), repeat=args.repeat)
+        results.extend([
+            ("pd.concat único (s)", f"{concat_time:.3f}"),
+            ("colunas alinhadas antes do pd.concat (s)",
+             f"{reindex_time:.3f}{'' if aligned.equals(reference) else ' (resultado diferente!)'}"),
+        ])
+
+        reference = None
+        for workers in [0] + [workers for workers in args.workers if workers > 1]:
+            elapsed, df = best_of(lambda: cold_incremental(directory, clean_workers=workers), repeat=args.repeat)
+            reference = df if reference is None else reference
+            label = "na própria execução" if workers == 0 else f"{workers} processos"
+            results.append((f"silver incremental sem cache, {label} (s)",
+                            f"{elapsed:.3f}{'' if df.equals(reference) else ' (resultado diferente!)'}"))
+    finally:
+        shutil.rmtree(directory)
+
+    report(f"Leitura da camada bronze ({args.format})", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+    Mede o custo da instrumentação das etapas nas camadas silver e gold: sem execução ativa,
+    com tempo e linhas por etapa e com o pico de memória (tracemalloc).
+
+    Uso: python benchmarks/bench_instrumentation.py [--repeat 10]
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import warnings
+from _common import BRONZE_PATH, SAMPLE_DATE, best_of, report
+from etl.instrumentation import RunInstrumentation, stage
+from etl.load import DataLoader
+from etl.transform import DataTransform
+
+
+def build_pipeline(directory):
+    transform = DataTransform(SAMPLE_DATE, incremental=False)
+    transform.root_path = BRONZE_PATH
+    transform.output_path = os.path.join(directory, "silver")
+    transform.aliases_path = os.path.join(directory, "state", "commodity_aliases.json")
+    loader = DataLoader(SAMPLE_DATE, export_csv=False)
+    loader.root_path = transform.output_path
+    loader.output_path = os.path.join(directory, "gold")
+    loader.aggregates_path = os.path.join(directory, "gold", "aggregates")
+    loader.rolling_path = os.path.join(directory, "gold", "rolling")
+    loader.buckets_path = os.path.join(directory, "gold", "buckets")
+
+    def run():
+        with stage("transform"):
+            transform.execute_silver_process()
+        with stage("load"):
+            loader.execute_gold_process()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10, help="Quantidade de execuções de cada modo.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.INFO)
+
+    directory = tempfile.mkdtemp()
+    try:
+        pipeline = build_pipeline(directory)
+
+        def instrumented(track_memory):
+            def run():
+                with RunInstrumentation(report_path=None, track_memory=track_memory) as instrumentation:
+                    pipeline()
+                return instrumentation
+            return run
+
+        baseline, _ = best_of(pipeline, repeat=args.repeat)
+        timed, _ = best_of(instrumented(False), repeat=args.repeat)
+        traced, instrumentation = best_of(instrumented(True), repeat=args.repeat)
+    finally:
+        shutil.rmtree(directory)
+
+    stages = 0
+    pending = [instrumentation.root.metrics]
+    while pending:
+        metrics = pending.pop()
+        stages += len(metrics.stages)
+        pending.extend(metrics.stages)
+
+    report("Instrumentação das camadas silver e gold", [
+        ("etapas registradas", stages),
+        ("sem instrumentação (s)", f"{baseline:.3f}"),
+        ("tempo e linhas (s)", f"{timed:.3f} ({timed / baseline - 1:+.1%})"),
+        ("tempo, linhas e memória (s)", f"{traced:.3f} ({traced / baseline - 1:+.1%})"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
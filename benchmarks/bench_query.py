@@ -0,0 +1,116 @@
+"""
+    Compara uma consulta ao histórico da camada silver lendo todas as tabelas com a mesma consulta
+    pelo índice particionado por data e local (SilverIndex), em tempo e pico de memória.
+
+    Uso: python benchmarks/bench_query.py [--days 90] [--repeat 20]
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import warnings
+import pandas as pd
+from _common import DATA_PATH, SAMPLE_DATE, best_of, report
+from etl.query import SilverIndex, parse_arrival
+from etl.storage import get_storage, list_tables, read_table
+
+
+def build_history(directory, days, repeat):
+    """
+        Gera uma camada silver com vários dias, deslocando as datas de chegada do dia de exemplo.
+    """
+    storage = get_storage()
+    sample = read_table(os.path.join(DATA_PATH, "silver", SAMPLE_DATE))
+    sample = pd.concat([sample] * repeat, ignore_index=True)
+    arrivals = parse_arrival(sample['Chegada'])
+    dates = pd.date_range(end=SAMPLE_DATE, periods=days)
+    os.makedirs(directory)
+    for date in dates:
+        shift = date - pd.Timestamp(SAMPLE_DATE)
+        df = sample.assign(Chegada=(arrivals + shift).dt.strftime("%d/%m/%Y %H:%M"))
+        storage.write(df, os.path.join(directory, date.strftime("%Y-%m-%d")))
+
+
+def full_scan(silver_path, filters):
+    """
+        Lê todas as tabelas silver e aplica os filtros, como seria feito sem o índice.
+    """
+    frames = []
+    for silver_table in list_tables(silver_path):
+        df = read_table(silver_table)
+        df.insert(0, 'Data', os.path.basename(silver_table))
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    df['Chegada'] = parse_arrival(df['Chegada'])
+    mask = (
+        (df['local'] == filters["local"])
+        & df['Mercadoria'].astype(str).str.upper().str.contains(filters["mercadoria"], regex=False)
+        & (df['Sentido'] == filters["sentido"])
+        & (df['Chegada'] >= pd.Timestamp(filters["chegada_from"]))
+        & (df['Chegada'] <= pd.Timestamp(filters["chegada_to"]))
+    )
+    return df[mask].reset_index(drop=True)
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=90, help="Quantidade de dias do histórico silver.")
+    parser.add_argument("--repeat", type=int, default=20, help="Quantas vezes repetir as linhas do dia de exemplo.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.INFO)
+
+    # Importações de sulfato de amônio em Paranaguá chegando nos últimos 10 dias do histórico
+    filters = {"local": "paranagua", "mercadoria": "SULFATO", "sentido": "Imp",
+               "chegada_from": pd.Timestamp(SAMPLE_DATE) - pd.Timedelta(days=10), "chegada_to": SAMPLE_DATE}
+
+    directory = tempfile.mkdtemp()
+    try:
+        silver_path = os.path.join(directory, "silver")
+        build_history(silver_path, args.days, args.repeat)
+        index = SilverIndex(silver_path, os.path.join(directory, "index"))
+
+        start = time.perf_counter()
+        index.refresh()
+        build_time = time.perf_counter() - start
+        refresh_time, _ = best_of(index.refresh, repeat=3)
+
+        scan_time, scanned = best_of(lambda: full_scan(silver_path, filters), repeat=3)
+        query_time, queried = best_of(lambda: index.query(**filters), repeat=3)
+        scan_memory = peak_memory(lambda: full_scan(silver_path, filters))
+        query_memory = peak_memory(lambda: index.query(**filters))
+        partitions = len(index.partitions(**filters))
+        same = scanned[queried.columns].sort_values(list(queried.columns)).reset_index(drop=True).equals(
+            queried.sort_values(list(queried.columns)).reset_index(drop=True)
+        )
+    finally:
+        shutil.rmtree(directory)
+
+    report("Consulta ao histórico silver", [
+        ("tabelas silver", args.days),
+        ("partições lidas pelo índice", f"{partitions} de {len(index.catalog)}"),
+        ("linhas no resultado", len(queried)),
+        ("criação do índice (s)", f"{build_time:.3f}"),
+        ("atualização sem mudanças (s)", f"{refresh_time:.4f}"),
+        ("leitura de todas as tabelas (s)", f"{scan_time:.3f}"),
+        ("consulta pelo índice (s)", f"{query_time:.3f}"),
+        ("speedup", f"{scan_time / query_time:.1f}x"),
+        ("pico de memória, todas as tabelas (MB)", f"{scan_memory / 1e6:.1f}"),
+        ("pico de memória, índice (MB)", f"{query_memory / 1e6:.1f}"),
+        ("mesmo resultado", same),
+    ])
+
+
+if __name__ == "__main__":
+    main()
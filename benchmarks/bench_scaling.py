@@ -0,0 +1,143 @@
+"""
+    Mede a vazão (linhas por segundo) e o pico de memória das etapas do ETL em dias sintéticos de
+    tamanhos crescentes, gerados a partir das tabelas bronze reais (ver synthetic.py):
+
+    - extração: conversão das páginas HTML de Santos e Paranaguá em tabelas;
+    - silver: DataTransform completo sobre as tabelas bronze do dia;
+    - gold: DataLoader sobre a camada silver do dia, incluindo as janelas móveis.
+
+    Os resultados podem ser salvos em JSON (--save) e comparados com uma execução anterior (--compare),
+    indicando as etapas que ficaram mais lentas ou usaram mais memória além da tolerância.
+
+    Uso: python benchmarks/bench_scaling.py [--sizes 1000 10000 100000] [--save base.json] [--compare base.json]
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import tracemalloc
+import warnings
+from _common import SAMPLE_DATE, best_of, report
+from stub_server import render_page
+from synthetic import load_templates, synthetic_day, write_day
+from etl.extract import DataExtractor
+from etl.load import DataLoader
+from etl.transform import DataTransform
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def build_stages(directory, parse):
+    """
+        Monta as funções de cada etapa sobre o dia sintético salvo em directory.
+    """
+    bronze_path = os.path.join(directory, "bronze")
+    silver_path = os.path.join(directory, "silver")
+    gold_path = os.path.join(directory, "gold")
+    stages = {}
+
+    if parse:
+        extractor = DataExtractor()
+        pages = {city: render_page(city, bronze_path, SAMPLE_DATE) for city in ("santos", "paranagua")}
+        stages["extração"] = lambda: [extractor.extract(city, html=html) for city, html in pages.items()]
+
+    def silver():
+        transform = DataTransform(SAMPLE_DATE, incremental=False)
+        transform.root_path = bronze_path
+        transform.output_path = silver_path
+        transform.aliases_path = os.path.join(directory, "state", "commodity_aliases.json")
+        transform.execute_silver_process()
+    stages["silver"] = silver
+
+    def gold():
+        loader = DataLoader(SAMPLE_DATE, export_csv=False)
+        loader.root_path = silver_path
+        loader.output_path = gold_path
+        loader.aggregates_path = os.path.join(gold_path, "aggregates")
+        loader.rolling_path = os.path.join(gold_path, "rolling")
+        loader.buckets_path = os.path.join(gold_path, "buckets")
+        loader.execute_gold_process()
+    stages["gold"] = gold
+    return stages
+
+
+def measure_size(templates, size, repeat, parse_max_rows):
+    directory = tempfile.mkdtemp()
+    try:
+        rows = write_day(synthetic_day(templates, SAMPLE_DATE, size), os.path.join(directory, "bronze"), SAMPLE_DATE)
+        results = {}
+        for name, function in build_stages(directory, parse=rows <= parse_max_rows).items():
+            elapsed, _ = best_of(function, repeat=repeat)
+            results[name] = {"rows": rows, "seconds": elapsed, "rows_per_second": rows / elapsed,
+                             "peak_memory": peak_memory(function)}
+        return results
+    finally:
+        shutil.rmtree(directory)
+
+
+def compare(results, baseline, tolerance):
+    """
+        Compara os resultados com uma execução anterior.
+
+        Returns:
+            list: Tuplas (descrição, valor) com a variação de cada etapa e tamanho medidos nas duas execuções.
+    """
+    rows = []
+    for size, stages in results.items():
+        for name, current in stages.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            time_change = current["seconds"] / previous["seconds"] - 1
+            memory_change = current["peak_memory"] / max(previous["peak_memory"], 1) - 1
+            regression = time_change > tolerance or memory_change > tolerance
+            rows.append((f"{name}, {size} linhas",
+                         f"tempo {time_change:+.1%}, memória {memory_change:+.1%}"
+                         + ("  <- regressão" if regression else "")))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Quantidades aproximadas de linhas bronze do dia sintético.")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções de cada etapa (vale o menor tempo).")
+    parser.add_argument("--parse-max-rows", type=int, default=100_000,
+                        help="Maior dia medido na etapa de extração (a montagem das páginas grandes é lenta).")
+    parser.add_argument("--save", help="Arquivo JSON onde os resultados são salvos.")
+    parser.add_argument("--compare", help="Arquivo JSON de uma execução anterior para comparação.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Aumento de tempo ou memória considerado regressão.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.INFO)
+
+    templates = load_templates()
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = measure_size(templates, size, args.repeat, args.parse_max_rows)
+        report(f"Dia sintético com {size} linhas", [
+            (name, f"{stage['rows_per_second']:>12,.0f} linhas/s  {stage['seconds']:8.3f}s  "
+                   f"pico de {stage['peak_memory'] / 1e6:8.1f} MB")
+            for name, stage in results[str(size)].items()
+        ])
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        report(f"Comparação com {args.compare}", compare(results, baseline, args.tolerance) or [("sem medidas em comum", "")])
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+    Compara a leitura das tabelas bronze com todas as colunas (tipos inferidos e descarte das colunas
+    sem nome) com a leitura pelo registro de esquemas (apenas as colunas usadas, com categorias),
+    em tempo e pico de memória, na leitura (join_data) e na camada silver completa.
+
+    Uso: python benchmarks/bench_schema.py [--repeat 200] [--format csv numpy]
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import tracemalloc
+import warnings
+import pandas as pd
+from _common import BRONZE_PATH, SAMPLE_DATE, best_of, report
+from etl.storage import get_storage, list_tables, read_table
+from etl.transform import DataTransform
+
+
+def legacy_read_bronze_table(table_path, local):
+    """
+        Reproduz a leitura anterior ao registro de esquemas.
+    """
+    df = read_table(table_path)
+    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+    df["local"] = local
+    return df
+
+
+def build_bronze(directory, storage, repeat):
+    """
+        Copia o dia de exemplo para uma pasta temporária, repetindo as linhas de cada tabela.
+    """
+    for local in os.listdir(BRONZE_PATH):
+        target = os.path.join(directory, "bronze", local, SAMPLE_DATE)
+        os.makedirs(target)
+        for table in list_tables(os.path.join(BRONZE_PATH, local, SAMPLE_DATE)):
+            df = read_table(table)
+            # Variação por cópia para que as linhas repetidas não sejam descartadas como duplicadas
+            copies = [df.assign(IMO=df['IMO'] + copy) for copy in range(repeat)]
+            storage.write(pd.concat(copies, ignore_index=True), os.path.join(target, os.path.basename(table)))
+
+
+def build_transform(directory, storage, legacy):
+    transform = DataTransform(SAMPLE_DATE, storage=storage, incremental=False)
+    transform.root_path = os.path.join(directory, "bronze")
+    transform.output_path = os.path.join(directory, "silver")
+    transform.aliases_path = os.path.join(directory, "state", "commodity_aliases.json")
+    if legacy:
+        transform._read_bronze_table = legacy_read_bronze_table
+    return transform
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def measure(directory, storage, legacy):
+    transform = build_transform(directory, storage, legacy)
+    read_time, df = best_of(transform.join_data, repeat=3)
+    silver_time, _ = best_of(transform.execute_silver_process, repeat=3)
+    read_memory = peak_memory(transform.join_data)
+    silver_memory = peak_memory(transform.execute_silver_process)
+    silver = read_table(os.path.join(directory, "silver", SAMPLE_DATE))
+    return {
+        "columns": df.shape[1],
+        "memory": df.memory_usage(deep=True).sum(),
+        "read_time": read_time,
+        "read_peak": read_memory,
+        "silver_time": silver_time,
+        "silver_peak": silver_memory,
+        "silver": silver.astype(str).sort_values(list(silver.columns)).reset_index(drop=True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200, help="Quantas vezes repetir as linhas de cada tabela.")
+    parser.add_argument("--format", nargs="+", default=["csv", "numpy"], help="Formatos da camada bronze medidos.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.INFO)
+
+    for format in args.format:
+        storage = get_storage(format)
+        directory = tempfile.mkdtemp()
+        try:
+            build_bronze(directory, storage, args.repeat)
+            legacy = measure(directory, storage, legacy=True)
+            typed = measure(directory, storage, legacy=False)
+        finally:
+            shutil.rmtree(directory)
+
+        report(f"Leitura da camada bronze ({format})", [
+            ("colunas lidas", f"{legacy['columns']} -> {typed['columns']}"),
+            ("memória do DataFrame combinado (MB)", f"{legacy['memory'] / 1e6:.1f} -> {typed['memory'] / 1e6:.1f}"),
+            ("leitura (s)", f"{legacy['read_time']:.3f} -> {typed['read_time']:.3f}"),
+            ("pico de memória da leitura (MB)", f"{legacy['read_peak'] / 1e6:.1f} -> {typed['read_peak'] / 1e6:.1f}"),
+            ("camada silver (s)", f"{legacy['silver_time']:.3f} -> {typed['silver_time']:.3f}"),
+            ("pico de memória da camada silver (MB)",
+             f"{legacy['silver_peak'] / 1e6:.1f} -> {typed['silver_peak'] / 1e6:.1f}"),
+            ("mesmo resultado", legacy["silver"].equals(typed["silver"])),
+        ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+    Teste de carga do servidor de consultas (src/serve.py): requisições por segundo e latência (p50 e p99)
+    do LineupService com cache, comparado com a leitura dos CSVs a cada requisição, como fazem hoje
+    os consumidores da camada gold. As camadas silver e gold são salvas em CSV a partir do dia de
+    exemplo, deslocado para vários dias.
+
+    As consultas misturam a tabela gold mais recente filtrada por local, sentido e mercadoria,
+    intervalos de datas gold e chegadas na camada silver. Ao final, uma tabela gold nova é gravada
+    para medir o tempo até o servidor com cache passar a respondê-la.
+
+    Uso: python benchmarks/bench_service.py [--days 30] [--requests 2000] [--clients 8]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from urllib.parse import urlencode
+from _common import SAMPLE_DATE, report
+from bench_query import build_history
+from etl.load import DataLoader
+from etl.parsers import parse_arrival
+from etl.query import SilverIndex
+from etl.service import LineupService, QueryServer
+from etl.storage import get_storage, list_tables
+
+
+class CsvPerRequestService(LineupService):
+    """
+        Serviço sem cache que lê os CSVs a cada requisição, como referência.
+    """
+    def _read_gold(self, date):
+        return pd.read_csv(os.path.join(self.gold_path, f"{date}.csv"))
+
+    def silver(self, local=None, sentido=None, mercadoria=None, chegada_from=None, chegada_to=None,
+               date_from=None, date_to=None, latest=False):
+        frames = []
+        tables = list_tables(self.silver_path)
+        for table in tables[-1:] if latest else tables:
+            date = os.path.basename(table)
+            if (date_from is not None and date < date_from) or (date_to is not None and date > date_to):
+                continue
+            df = pd.read_csv(f"{table}.csv")
+            df['Chegada'] = parse_arrival(df['Chegada'])
+            mask = pd.Series(True, index=df.index)
+            if local:
+                mask &= df['local'].isin(local)
+            if sentido is not None:
+                mask &= df['Sentido'] == sentido
+            if mercadoria is not None:
+                mask &= df['Mercadoria'].astype(str).str.upper().str.contains(mercadoria.upper(), regex=False)
+            if chegada_from is not None:
+                mask &= df['Chegada'] >= chegada_from
+            if chegada_to is not None:
+                mask &= df['Chegada'] <= chegada_to
+            df = df[mask]
+            df.insert(0, 'Data', date)
+            frames.append(df)
+        return pd.concat(frames, ignore_index=True)
+
+
+def build_layers(directory, days):
+    """
+        Salva as camadas silver e gold em CSV para os últimos dias até a data de exemplo.
+
+        Returns:
+            list: Datas geradas.
+    """
+    silver_path = os.path.join(directory, "silver")
+    build_history(silver_path, days, repeat=1)
+    # build_history usa o formato padrão; as tabelas são convertidas para CSV
+    storage = get_storage("csv")
+    for table in list_tables(silver_path):
+        df = get_storage().read(table)
+        shutil.rmtree(get_storage().path(table), ignore_errors=True)
+        storage.write(df, table)
+
+    dates = [os.path.basename(table) for table in list_tables(silver_path)]
+    for date in dates:
+        loader = DataLoader(date, storage=storage)
+        loader.root_path = silver_path
+        loader.output_path = os.path.join(directory, "gold")
+        loader.aggregates_path = os.path.join(directory, "gold", "aggregates")
+        loader.rolling_path = os.path.join(directory, "gold", "rolling")
+        loader.buckets_path = os.path.join(directory, "gold", "buckets")
+        loader.execute_gold_process(rolling=False)
+    return dates
+
+
+def build_requests(dates, count, seed=0):
+    """
+        Gera as consultas do teste, com as mais comuns repetidas com mais frequência (distribuição de Zipf).
+    """
+    end = pd.Timestamp(dates[-1])
+    queries = []
+    for local in ("santos", "paranagua"):
+        for sentido in ("Imp", "Exp"):
+            for mercadoria in ("SOJA", "MILHO", "CONTEINERES", "VEICULO", "ACUCAR"):
+                queries.append(("/gold", {"local": local, "sentido": sentido, "mercadoria": mercadoria}))
+        for days in (7, 30):
+            queries.append(("/gold", {"local": local, "data_de": (end - pd.Timedelta(days=days)).strftime("%Y-%m-%d")}))
+            queries.append(("/silver", {"local": local, "mais_recente": "1",
+                                        "chegada_de": (end - pd.Timedelta(days=days)).strftime("%Y-%m-%d"),
+                                        "chegada_ate": end.strftime("%Y-%m-%d")}))
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.5, count), len(queries)) - 1
+    order = rng.permutation(len(queries))
+    return [f"{queries[order[rank]][0]}?{urlencode(queries[order[rank]][1])}" for rank in ranks]
+
+
+def load_test(url, requests, clients):
+    """
+        Envia as requisições com vários clientes simultâneos, cada um com uma conexão persistente.
+
+        Returns:
+            tuple: Requisições por segundo e latências (em segundos) de cada requisição.
+    """
+    host, port = url.replace("http://", "").split(":")
+    latencies = []
+    errors = []
+
+    def client(paths):
+        connection = http.client.HTTPConnection(host, int(port))
+        for path in paths:
+            start = time.perf_counter()
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+            if response.status != 200:
+                errors.append(path)
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(requests[position::clients],)) for position in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise RuntimeError(f"{len(errors)} requisições com erro, por exemplo {errors[0]}.")
+    return len(requests) / elapsed, np.array(latencies)
+
+
+def time_to_new_gold(server, directory, dates):
+    """
+        Grava a tabela gold do dia seguinte e mede o tempo até o servidor respondê-la.
+    """
+    new_date = (pd.Timestamp(dates[-1]) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    gold_path = os.path.join(directory, "gold")
+    connection = http.client.HTTPConnection(*server.server.server_address[:2])
+    connection.request("GET", "/gold")
+    connection.getresponse().read()
+
+    start = time.perf_counter()
+    shutil.copy(os.path.join(gold_path, f"{dates[-1]}.csv"), os.path.join(gold_path, f"{new_date}.csv"))
+    while time.perf_counter() - start < 10:
+        connection.request("GET", "/gold")
+        rows = json.loads(connection.getresponse().read())
+        if rows and rows[0]["Data"] == new_date:
+            return time.perf_counter() - start
+        time.sleep(0.01)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30, help="Quantidade de dias das camadas silver e gold.")
+    parser.add_argument("--requests", type=int, default=2000, help="Quantidade de requisições de cada teste.")
+    parser.add_argument("--clients", type=int, default=8, help="Clientes simultâneos.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.INFO)
+
+    directory = tempfile.mkdtemp()
+    try:
+        dates = build_layers(directory, args.days)
+        requests = build_requests(dates, args.requests)
+        services = {
+            "CSV a cada requisição": CsvPerRequestService(
+                os.path.join(directory, "gold"), os.path.join(directory, "silver"), cache_entries=0,
+                index=SilverIndex(os.path.join(directory, "silver"), os.path.join(directory, "index"))
+            ),
+            "LineupService com cache": LineupService(
+                os.path.join(directory, "gold"), os.path.join(directory, "silver"),
+                index=SilverIndex(os.path.join(directory, "silver"), os.path.join(directory, "index"))
+            ),
+        }
+
+        rows = [("requisições", f"{args.requests} ({len(set(requests))} consultas distintas, {args.clients} clientes)")]
+        for name, service in services.items():
+            with QueryServer(service, port=0) as server:
+                throughput, latencies = load_test(server.url, requests, args.clients)
+                rows.extend([
+                    (f"{name}: requisições/s", f"{throughput:,.0f}"),
+                    (f"{name}: p50 (ms)", f"{np.percentile(latencies, 50) * 1000:.2f}"),
+                    (f"{name}: p99 (ms)", f"{np.percentile(latencies, 99) * 1000:.2f}"),
+                ])
+                if service.cache is not None:
+                    stats = service.cache.stats()
+                    rows.append((f"{name}: acertos no cache", f"{stats['hits'] / (stats['hits'] + stats['misses']):.1%}"))
+                    refresh = time_to_new_gold(server, directory, dates)
+                    rows.append(("tabela gold nova respondida após (s)",
+                                 "não respondida" if refresh is None else f"{refresh:.2f}"))
+    finally:
+        shutil.rmtree(directory)
+
+    report(f"Servidor de consultas com {args.days} dias", rows)
+
+
+if __name__ == "__main__":
+    main()
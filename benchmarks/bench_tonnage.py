@@ -0,0 +1,73 @@
+"""
+    Compara a conversão de pesos célula a célula (antiga clean_and_covert_weight_column)
+    com o conversor vetorizado parse_tonnage, em colunas com mais de um milhão de células.
+
+    Uso: python benchmarks/bench_tonnage.py [--cells N]
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from _common import best_of, report
+from etl.parsers import parse_tonnage
+
+# Amostras reais das colunas 'Peso Weight' (Santos) e 'Previsto' (Paranaguá)
+SAMPLES = [
+    "28100", "1800 18000", "9800 27200", "1", "69300",
+    "68.000,000 Tons.", "0,000 Tons.", "1.441,20", "36.104,000 Tons.", "800 Movs.",
+]
+
+
+def legacy_clean_and_convert(value):
+    """
+        Conversão linha a linha usada antes de parse_tonnage.
+    """
+    if isinstance(value, str):
+        value = value.replace(' Tons.', '').replace(',', '')
+        try:
+            if len(value.split()) > 1:
+                return float(sum(map(float, value.split())))/len(value.split())
+            return float(value)
+        except ValueError:
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cells", type=int, default=1_000_000, help="Quantidade de células da coluna.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    column = pd.Series(rng.choice(np.array(SAMPLES, dtype=object), size=args.cells))
+
+    legacy_time, legacy = best_of(lambda: column.map(legacy_clean_and_convert), repeat=3)
+    vectorized_time, parsed = best_of(lambda: parse_tonnage(column), repeat=3)
+
+    # Os valores sem separador decimal (Santos) precisam coincidir com o caminho antigo
+    plain = ~column.str.contains(r'[.,]')
+    assert np.allclose(legacy[plain].astype(float), parsed.values[plain], equal_nan=True)
+
+    # Pior caso: quase todas as células distintas, sem ganho da codificação em dicionário
+    tons = rng.integers(1, 100_000, size=args.cells)
+    distinct = pd.Series(tons.astype(str), dtype=object) + ",000 Tons."
+    legacy_distinct_time, _ = best_of(lambda: distinct.map(legacy_clean_and_convert), repeat=1)
+    vectorized_distinct_time, _ = best_of(lambda: parse_tonnage(distinct, decimal=","), repeat=1)
+
+    examples = pd.Series(SAMPLES)
+    converted = parse_tonnage(examples).values
+
+    report("Conversão de tonelagem", [
+        ("células", args.cells),
+        ("por célula (s)", f"{legacy_time:.3f}"),
+        ("vetorizado (s)", f"{vectorized_time:.3f}"),
+        ("ganho", f"{legacy_time / vectorized_time:.1f}x"),
+        ("células não convertidas", parsed.unparsed),
+        ("por célula, valores distintos (s)", f"{legacy_distinct_time:.3f}"),
+        ("vetorizado, valores distintos (s)", f"{vectorized_distinct_time:.3f}"),
+    ] + [
+        (f"'{raw}'", f"antigo={legacy_clean_and_convert(raw)} novo={new}")
+        for raw, new in zip(SAMPLES, converted)
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+    Compara o armazenamento de cópias diárias completas das tabelas bronze com o armazenamento de
+    escalas por captura de mudanças (VesselCallStore): espaço em disco, tempo de registro e tempo de
+    reconstrução das tabelas de um dia.
+
+    O histórico é simulado a partir do dia de exemplo: a cada dia algumas escalas mudam de previsão de
+    chegada, algumas passam de esperados para atracados e de atracados para despachados, algumas
+    deixam as páginas e novas escalas aparecem.
+
+    Uso: python benchmarks/bench_vessel_store.py [--days 60] [--change 0.05]
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from _common import BRONZE_PATH, SAMPLE_DATE, report
+from etl.manifest import file_stats
+from etl.storage import get_storage, list_tables, read_table
+from etl.vessel_store import CALL_KEYS, VesselCallStore
+
+# Coluna com a previsão de chegada de cada porto
+ARRIVAL_COLUMNS = {"santos": "Cheg/Arrival d/m/y", "paranagua": "ETA"}
+
+# Tabelas de Paranaguá pelas quais uma escala passa
+STATUS_FLOW = [("esperados", "atracados"), ("atracados", "despachados")]
+
+
+def read_day(local):
+    daily_path = os.path.join(BRONZE_PATH, local, SAMPLE_DATE)
+    tables = {}
+    for directory, _, _ in os.walk(daily_path):
+        for table in list_tables(directory):
+            tables[os.path.relpath(table, daily_path)] = read_table(table)
+    return tables
+
+
+def next_day(local, tables, date, rng, change, next_key):
+    """
+        Gera as tabelas do dia seguinte aplicando mudanças a uma fração das linhas.
+    """
+    tables = {name: df.copy() for name, df in tables.items()}
+    arrival = ARRIVAL_COLUMNS[local]
+    key_column = CALL_KEYS[local][-1]
+
+    for name, df in tables.items():
+        if df.empty:
+            continue
+        # Previsões de chegada alteradas
+        if arrival in df.columns:
+            moved = rng.random(len(df)) < change
+            df.loc[moved, arrival] = f"{date:%d/%m/%Y} {rng.integers(0, 24):02d}:00"
+        # Escalas que deixam a página e novas escalas
+        df = df[rng.random(len(df)) >= change]
+        new = df.sample(n=max(1, int(len(df) * change)), random_state=rng.integers(1 << 31), replace=True).copy() \
+            if len(df) else df
+        if key_column in new.columns and len(new):
+            new[key_column] = [f"{next_key + position}" for position in range(len(new))]
+            next_key += len(new)
+        tables[name] = pd.concat([df, new], ignore_index=True)
+
+    if local == "paranagua":
+        for source, target in reversed(STATUS_FLOW):
+            moved = rng.random(len(tables[source])) < change
+            rows = tables[source][moved].reindex(columns=tables[target].columns)
+            tables[source] = tables[source][~moved].reset_index(drop=True)
+            tables[target] = pd.concat([tables[target], rows], ignore_index=True)
+
+    # Como na extração, as colunas voltam a ser numéricas quando todos os valores preenchidos são números
+    tables = {name: df.apply(as_extracted) for name, df in tables.items()}
+    return tables, next_key
+
+
+def as_extracted(values):
+    text = values.astype(str).where(values.notna(), None)
+    try:
+        return pd.to_numeric(text)
+    except (ValueError, TypeError):
+        return text.astype(object)
+
+
+def directory_size(path):
+    return sum(file_stats(os.path.join(directory, file))[0] for directory, _, files in os.walk(path) for file in files)
+
+
+def sorted_frame(df):
+    df = df.astype(object).where(df.notna(), "").astype(str)
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=60, help="Quantidade de dias simulados.")
+    parser.add_argument("--change", type=float, default=0.05, help="Fração das linhas alterada a cada dia.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.INFO)
+
+    rng = np.random.default_rng(0)
+    storage = get_storage()
+    dates = pd.date_range(end=SAMPLE_DATE, periods=args.days)
+    directory = tempfile.mkdtemp()
+    snapshot_path = os.path.join(directory, "bronze")
+    store = VesselCallStore(os.path.join(directory, "vessel_calls"))
+
+    snapshot_write, upsert_time, snapshot_read, rebuild_time = 0.0, 0.0, 0.0, 0.0
+    # Tempo de CPU das escritas, menos sensível que o tempo decorrido à variação do disco
+    snapshot_cpu, upsert_cpu = 0.0, 0.0
+    mismatches, checked, days_checked = 0, 0, 0
+    # Tempo de registro dos primeiros e dos últimos dias, para mostrar se ele cresce com o histórico
+    first_days, last_days = [], []
+    try:
+        for local in ("santos", "paranagua"):
+            tables, next_key = read_day(local), 10 ** 9
+            history = {}
+            for position, date in enumerate(dates):
+                if position:
+                    tables, next_key = next_day(local, tables, date, rng, args.change, next_key)
+                day = f"{date:%Y-%m-%d}"
+                history[day] = tables
+
+                start, cpu_start = time.perf_counter(), time.process_time()
+                for name, df in tables.items():
+                    table_path = os.path.join(snapshot_path, local, day, name)
+                    os.makedirs(os.path.dirname(table_path), exist_ok=True)
+                    storage.write(df, table_path)
+                snapshot_write += time.perf_counter() - start
+                snapshot_cpu += time.process_time() - cpu_start
+
+                start, cpu_start = time.perf_counter(), time.process_time()
+                store.upsert(local, day, tables)
+                elapsed = time.perf_counter() - start
+                upsert_time += elapsed
+                upsert_cpu += time.process_time() - cpu_start
+                if position < 10:
+                    first_days.append(elapsed)
+                if position >= len(dates) - 10:
+                    last_days.append(elapsed)
+
+            # Reconstrução de alguns dias, comparada com a leitura da cópia diária
+            for day in list(history)[::max(1, args.days // 6)]:
+                start = time.perf_counter()
+                for name in history[day]:
+                    read_table(os.path.join(snapshot_path, local, day, name))
+                snapshot_read += time.perf_counter() - start
+
+                start = time.perf_counter()
+                rebuilt = store.snapshot(local, day)
+                rebuild_time += time.perf_counter() - start
+
+                for name, df in history[day].items():
+                    checked += 1
+                    if not sorted_frame(df).equals(sorted_frame(rebuilt.get(name, df.iloc[0:0]))):
+                        mismatches += 1
+                days_checked += 1
+
+        snapshot_size = directory_size(snapshot_path)
+        store_size = directory_size(store.path)
+        versions = sum(len(store.load_versions(local)) for local in ("santos", "paranagua"))
+    finally:
+        shutil.rmtree(directory)
+
+    report("Cópias diárias x captura de mudanças", [
+        ("dias simulados", args.days),
+        ("versões no armazenamento de escalas", versions),
+        ("cópias diárias em disco (MB)", f"{snapshot_size / 1e6:.2f}"),
+        ("armazenamento de escalas em disco (MB)", f"{store_size / 1e6:.2f}"),
+        ("redução de espaço", f"{snapshot_size / store_size:.1f}x"),
+        ("escrita das cópias diárias (s)", f"{snapshot_write:.2f}"),
+        ("registro das mudanças (s)", f"{upsert_time:.2f}"),
+        ("escrita das cópias diárias, CPU (s)", f"{snapshot_cpu:.2f}"),
+        ("registro das mudanças, CPU (s)", f"{upsert_cpu:.2f}"),
+        ("registro de um dia, 10 primeiros dias (ms)", f"{np.mean(first_days) * 1000:.1f}"),
+        ("registro de um dia, 10 últimos dias (ms)", f"{np.mean(last_days) * 1000:.1f}"),
+        ("leitura de um dia, cópia diária (ms)", f"{snapshot_read / days_checked * 1000:.1f}"),
+        ("reconstrução de um dia (ms)", f"{rebuild_time / days_checked * 1000:.1f}"),
+        ("tabelas reconstruídas com diferenças", f"{mismatches} de {checked}"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
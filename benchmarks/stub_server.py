@@ -0,0 +1,191 @@
+"""
+    Servidor HTTP local que simula as páginas de line-up de Santos e Paranaguá a partir
+    dos CSVs salvos em data/bronze, permitindo executar a extração sem acessar a internet.
+
+    Cada tabela é renderizada com o mesmo formato das páginas originais: uma linha de título
+    (primeiro nível do cabeçalho) e uma linha com o nome das colunas (segundo nível). As tabelas
+    de Paranaguá recebem ainda uma coluna de índice, descartada pela extração.
+
+    Uso: python benchmarks/stub_server.py [--port 8000] [--date 2025-01-22]
+"""
+import argparse
+import hashlib
+import html
+import os
+import threading
+import time
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from _common import BRONZE_PATH, SAMPLE_DATE
+
+
+def _render_table(title, df, index_column=False):
+    """
+        Renderiza um DataFrame bronze como uma tabela HTML com cabeçalho de dois níveis.
+
+        Args:
+            title (str): Título da tabela (primeiro nível do cabeçalho).
+            df (pd.DataFrame): Dados da tabela.
+            index_column (bool): Se deve incluir uma coluna de índice antes dos dados.
+    """
+    columns = ["" if column.startswith("Unnamed") else column for column in df.columns]
+    if index_column:
+        columns = [""] + columns
+
+    rows = []
+    for position, values in enumerate(df.itertuples(index=False), start=1):
+        cells = ["" if pd.isna(value) else str(value) for value in values]
+        if index_column:
+            cells = [str(position)] + cells
+        rows.append("<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in cells) + "</tr>")
+
+    header = "".join(f"<th>{html.escape(column)}</th>" for column in columns)
+    return (
+        "<table>"
+        f"<thead><tr><th colspan=\"{len(columns)}\">{html.escape(title)}</th></tr><tr>{header}</tr></thead>"
+        f"<tbody>{''.join(rows)}</tbody>"
+        "</table>"
+    )
+
+
+def render_page(city, bronze_path=BRONZE_PATH, date=SAMPLE_DATE, repeat=1):
+    """
+        Monta a página HTML de uma cidade a partir dos CSVs bronze de uma data.
+
+        Args:
+            city (str): santos ou paranagua.
+            bronze_path (str): Caminho da pasta bronze.
+            date (str): Data dos arquivos usados (AAAA-MM-DD).
+            repeat (int): Quantas vezes repetir as linhas de cada tabela (páginas maiores para benchmarks).
+
+        Returns:
+            str: Conteúdo HTML da página.
+    """
+    daily_path = os.path.join(bronze_path, city, date)
+    tables = []
+    for directory, _, files in sorted(os.walk(daily_path)):
+        for file in sorted(files):
+            if not file.endswith(".csv"):
+                continue
+            file_path = os.path.join(directory, file)
+            # O nome do arquivo foi gerado a partir do título da tabela (espaços viram underscores)
+            title = os.path.relpath(file_path, daily_path)[:-len(".csv")].replace("_", " ")
+            df = pd.read_csv(file_path, dtype=str)
+            if repeat > 1:
+                df = pd.concat([df] * repeat, ignore_index=True)
+            tables.append(_render_table(title, df, index_column=(city == "paranagua")))
+
+    if city == "paranagua":
+        # Tabela de resumo sem a coluna de programação, descartada pela validação do extrator
+        tables.insert(0, _render_table("RESUMO", pd.DataFrame({"Total": ["1", "2"]}), index_column=True))
+
+    return f"<html><body>{''.join(tables)}</body></html>"
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clientes que desistem por timeout fecham a conexão antes da resposta
+        pass
+
+
+class StubPortServer:
+    def __init__(self, port=0, bronze_path=BRONZE_PATH, date=SAMPLE_DATE, delays=None, failures=None,
+                 conditional=True):
+        """
+        Inicializa o servidor com as páginas renderizadas de cada cidade.
+
+        Args:
+            port (int): Porta HTTP (0 escolhe uma porta livre).
+            bronze_path (str): Caminho da pasta bronze usada para montar as páginas.
+            date (str): Data dos arquivos usados.
+            delays (dict): Atraso, em segundos, aplicado às respostas de cada cidade.
+            failures (dict): Quantidade de respostas 503 devolvidas antes de responder normalmente, por cidade.
+            conditional (bool): Se o servidor envia ETag/Last-Modified e responde 304 a requisições condicionais.
+        """
+        self.pages = {city: render_page(city, bronze_path, date).encode("utf-8") for city in ("santos", "paranagua")}
+        self.delays = delays or {}
+        self.failures = dict(failures or {})
+        self.conditional = conditional
+        self.last_modified = "Wed, 22 Jan 2025 06:00:00 GMT"
+        self.requests = {city: 0 for city in self.pages}
+        self.not_modified = {city: 0 for city in self.pages}
+        self.server = _QuietHTTPServer(("127.0.0.1", port), self._handler())
+        self.thread = None
+
+    @property
+    def urls(self):
+        """
+            URLs locais de cada cidade, no formato esperado por DataExtractor.
+        """
+        host, port = self.server.server_address
+        return {city: f"http://{host}:{port}/{city}" for city in self.pages}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                city = self.path.strip("/").split("?")[0]
+                if city not in stub.pages:
+                    self.send_error(404)
+                    return
+
+                stub.requests[city] += 1
+                time.sleep(stub.delays.get(city, 0))
+                if stub.failures.get(city, 0) > 0:
+                    stub.failures[city] -= 1
+                    self.send_error(503)
+                    return
+
+                body = stub.pages[city]
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                if stub.conditional and self.headers.get("If-None-Match") == etag:
+                    stub.not_modified[city] += 1
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                if stub.conditional:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", stub.last_modified)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--date", default=SAMPLE_DATE)
+    args = parser.parse_args()
+
+    stub = StubPortServer(port=args.port, date=args.date)
+    for city, url in stub.urls.items():
+        print(f"{city}: {url}")
+    stub.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+    Gerador de dias sintéticos de line-up a partir das tabelas bronze reais, usadas como modelo.
+
+    As linhas são sorteadas das tabelas do dia de exemplo, mantendo os nomes das colunas e o formato
+    dos valores (células com vários valores em Santos, como "EMB DESC" e "1800 18000", e números no
+    formato brasileiro em Paranaguá, como "36.104,000 Tons."). A cada linha sorteada, os identificadores
+    (IMO, DUV, programação) são trocados e as datas de chegada são deslocadas para a data gerada.
+
+    Uso: python benchmarks/synthetic.py --output /tmp/bronze --start 2025-01-01 --days 30 --rows 100000 [--format csv]
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from _common import BRONZE_PATH, SAMPLE_DATE
+from etl.storage import get_storage
+
+# Colunas com a data de chegada ou previsão de chegada, deslocadas para a data gerada
+DATE_COLUMNS = ['Cheg/Arrival d/m/y', 'Chegada', 'ETA']
+
+# Formato das datas de acordo com o tamanho do texto ("22/01/2025", "22/01/2025 06:00" ou "22/01/2025 06:00:00")
+DATE_FORMATS = {10: "%d/%m/%Y", 16: "%d/%m/%Y %H:%M", 19: "%d/%m/%Y %H:%M:%S"}
+
+# Colunas que identificam a escala e recebem um valor novo a cada linha gerada
+ID_COLUMNS = {'IMO': 7, 'DUV': 9}
+
+
+def load_templates(bronze_path=BRONZE_PATH, date=SAMPLE_DATE):
+    """
+        Lê as tabelas bronze usadas como modelo, com todos os valores em texto.
+
+        Args:
+            bronze_path (str): Pasta da camada bronze.
+            date (str): Data das tabelas usadas como modelo.
+
+        Returns:
+            dict: DataFrames indexados por (local, nome da tabela); o nome pode conter subpastas.
+    """
+    templates = {}
+    for local in sorted(os.listdir(bronze_path)):
+        daily_path = os.path.join(bronze_path, local, date)
+        for directory, _, files in sorted(os.walk(daily_path)):
+            for file in sorted(files):
+                if file.endswith(".csv"):
+                    name = os.path.relpath(os.path.join(directory, file), daily_path)[:-len(".csv")]
+                    templates[(local, name)] = pd.read_csv(os.path.join(directory, file), dtype=str)
+    return templates
+
+
+def _shift_dates(values, offset, rng):
+    """
+        Desloca as datas de uma coluna, mantendo o formato de cada valor.
+
+        Args:
+            values (pd.Series): Datas em texto no formato dia/mês/ano.
+            offset (pd.Timedelta): Deslocamento entre a data do modelo e a data gerada.
+            rng (np.random.Generator): Gerador de números aleatórios.
+    """
+    lengths = values.str.len()
+    dates = pd.to_datetime(values, dayfirst=True, format='mixed', errors='coerce')
+    # Chegadas espalhadas em torno da data gerada, como nas tabelas reais
+    dates = dates + offset + pd.to_timedelta(rng.integers(-10, 11, len(values)), unit="D")
+    shifted = values.copy()
+    for length, date_format in DATE_FORMATS.items():
+        mask = (lengths == length) & dates.notna()
+        shifted[mask] = dates[mask].dt.strftime(date_format)
+    return shifted
+
+
+def _random_ids(values, digits, rng):
+    ids = pd.Series(rng.integers(10 ** (digits - 1), 10 ** digits, len(values)).astype(str), index=values.index)
+    return ids.where(values.notna())
+
+
+def synthetic_table(template, rows, date, rng, template_date=SAMPLE_DATE, first_call=0):
+    """
+        Gera uma tabela sintética sorteando linhas de uma tabela modelo.
+
+        Args:
+            template (pd.DataFrame): Tabela modelo, com os valores em texto.
+            rows (int): Quantidade de linhas geradas.
+            date (str): Data gerada (AAAA-MM-DD).
+            rng (np.random.Generator): Gerador de números aleatórios.
+            template_date (str): Data da tabela modelo.
+            first_call (int): Primeiro número de programação usado nas tabelas de Paranaguá.
+
+        Returns:
+            pd.DataFrame: Tabela gerada, com as mesmas colunas do modelo.
+    """
+    if template.empty or rows <= 0:
+        return template.iloc[0:0].copy()
+
+    df = template.iloc[rng.integers(0, len(template), rows)].reset_index(drop=True)
+    offset = pd.Timestamp(date) - pd.Timestamp(template_date)
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = _shift_dates(df[column], offset, rng)
+    for column, digits in ID_COLUMNS.items():
+        if column in df.columns:
+            df[column] = _random_ids(df[column], digits, rng)
+    if 'Programação' in df.columns:
+        df['Programação'] = np.arange(first_call, first_call + rows).astype(str)
+    return df
+
+
+def synthetic_day(templates, date, rows, seed=0):
+    """
+        Gera todas as tabelas de um dia, distribuindo as linhas entre as tabelas na proporção das tabelas modelo.
+
+        Args:
+            templates (dict): Tabelas modelo retornadas por load_templates.
+            date (str): Data gerada (AAAA-MM-DD).
+            rows (int): Quantidade aproximada de linhas do dia, somando todas as tabelas.
+            seed (int): Semente do gerador de números aleatórios.
+
+        Returns:
+            dict: DataFrames indexados por (local, nome da tabela).
+    """
+    rng = np.random.default_rng([seed, pd.Timestamp(date).toordinal()])
+    template_rows = sum(len(template) for template in templates.values())
+    tables = {}
+    first_call = 0
+    for key, template in templates.items():
+        table_rows = round(rows * len(template) / template_rows)
+        tables[key] = synthetic_table(template, table_rows, date, rng, first_call=first_call)
+        first_call += table_rows
+    return tables
+
+
+def write_day(tables, bronze_path, date, storage=None):
+    """
+        Salva as tabelas de um dia na pasta bronze, na mesma estrutura da extração.
+
+        Returns:
+            int: Quantidade de linhas salvas.
+    """
+    storage = storage or get_storage("csv")
+    rows = 0
+    for (local, name), df in tables.items():
+        table_path = os.path.join(bronze_path, local, date, name)
+        os.makedirs(os.path.dirname(table_path), exist_ok=True)
+        storage.write(df, table_path)
+        rows += len(df)
+    return rows
+
+
+def generate_history(bronze_path, start, days, rows, seed=0, storage=None, templates=None):
+    """
+        Gera e salva vários dias sintéticos consecutivos na pasta bronze.
+
+        Args:
+            bronze_path (str): Pasta bronze de destino.
+            start (str): Primeira data gerada (AAAA-MM-DD).
+            days (int): Quantidade de dias.
+            rows (int): Quantidade aproximada de linhas por dia.
+            seed (int): Semente do gerador de números aleatórios.
+            storage (TableStorage): Formato das tabelas. Se não informado, usa CSV, como nas tabelas modelo.
+            templates (dict): Tabelas modelo. Se não informado, usa o dia de exemplo.
+
+        Returns:
+            list: Datas geradas.
+    """
+    templates = templates or load_templates()
+    dates = pd.date_range(start, periods=days).strftime("%Y-%m-%d").tolist()
+    for date in dates:
+        write_day(synthetic_day(templates, date, rows, seed), bronze_path, date, storage)
+    return dates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", required=True, help="Pasta bronze de destino.")
+    parser.add_argument("--start", default=SAMPLE_DATE, help="Primeira data gerada (AAAA-MM-DD).")
+    parser.add_argument("--days", type=int, default=1, help="Quantidade de dias gerados.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Quantidade aproximada de linhas por dia.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", default="csv", help="Formato das tabelas (csv, numpy ou parquet).")
+    args = parser.parse_args()
+
+    dates = generate_history(args.output, args.start, args.days, args.rows, args.seed, get_storage(args.format))
+    print(f"{len(dates)} dias gerados em {args.output} ({dates[0]} a {dates[-1]}).")
+
+
+if __name__ == "__main__":
+    main()
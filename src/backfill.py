@@ -0,0 +1,48 @@
+"""
+    Este arquivo gera novamente as camadas silver e gold para um intervalo de datas já extraídas na camada bronze.
+
+    Cada data é processada em um processo separado, com no máximo --workers datas ao mesmo tempo. As datas concluídas
+    são registradas em data/state/backfill_state.json, então uma execução interrompida pode ser retomada com o mesmo comando.
+
+    Uso: python src/backfill.py --start 2025-01-01 --end 2025-12-31 [--workers 4] [--force] [--sqlite]
+"""
+import argparse
+import logging
+import sys
+from etl.backfill import DataBackfill
+from etl.database import SqliteSink
+from etl.lock import LockBusyError
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", required=True, help="Primeira data do intervalo (AAAA-MM-DD).")
+    parser.add_argument("--end", required=True, help="Última data do intervalo (AAAA-MM-DD).")
+    parser.add_argument("--workers", type=int, default=None, help="Quantidade máxima de processos simultâneos.")
+    parser.add_argument("--force", action="store_true", help="Processa novamente as datas já concluídas.")
+    parser.add_argument("--sqlite", action="store_true",
+                        help="Grava também as camadas silver e gold das datas no banco SQLite (data/lineup.db).")
+    args = parser.parse_args()
+
+    database = SqliteSink() if args.sqlite else None
+    backfill = DataBackfill(args.start, args.end, max_workers=args.workers, force=args.force, database=database)
+    logging.info("Iniciando backfill.")
+    try:
+        failures = backfill.execute_backfill_process()
+    except LockBusyError as e:
+        logging.error(f"Backfill não iniciado: {e}")
+        sys.exit(1)
+    finally:
+        if database is not None:
+            database.close()
+    logging.info("Backfill concluído.")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
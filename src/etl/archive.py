@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import threading
+import pandas as pd
+
+# Extensão e módulo de cada compressão aceita pelo arquivo de páginas
+COMPRESSIONS = {"gzip": (".gz", gzip), "lzma": (".xz", lzma)}
+
+
+def page_hash(content):
+    """
+        Hash (SHA-256) do conteúdo de uma página, usado como endereço no arquivo de páginas.
+
+        Args:
+            content (bytes): Conteúdo da resposta, sem decodificar.
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+class PageArchive:
+    def __init__(self, path="../../data/raw/", compression="gzip"):
+        """
+        Inicializa o arquivo das páginas HTML recebidas pela extração.
+
+        Cada resposta é guardada comprimida e endereçada pelo hash do conteúdo
+        (objects/<2 primeiros caracteres do hash>/<hash>.html.gz), de modo que páginas idênticas, como as
+        consultas repetidas ao longo do dia sem mudanças, são guardadas uma única vez. Cada captura é
+        registrada em index/<cidade>/<data>.jsonl, na ordem em que foi feita, com o horário, o hash,
+        a codificação do texto e a URL; assim as páginas podem ser convertidas novamente em tabelas bronze
+        depois de uma correção na extração, sem acessar os portos.
+
+        Args:
+            path (str): Pasta do arquivo de páginas.
+            compression (str): Compressão das páginas novas ('gzip' ou 'lzma'). A leitura aceita as duas.
+
+        Raises:
+            ValueError: Se a compressão informada não for aceita.
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Compressão {compression} não aceita; use {' ou '.join(COMPRESSIONS)}.")
+        self.path = path
+        self.compression = compression
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest, compression):
+        extension = COMPRESSIONS[compression][0]
+        return os.path.join(self.path, "objects", digest[:2], f"{digest}.html{extension}")
+
+    def _index_path(self, city, date):
+        return os.path.join(self.path, "index", city, f"{date}.jsonl")
+
+    def find(self, digest):
+        """
+            Retorna o caminho da página com o hash informado, em qualquer compressão, ou None se ela não foi guardada.
+        """
+        for compression in COMPRESSIONS:
+            object_path = self._object_path(digest, compression)
+            if os.path.exists(object_path):
+                return object_path
+        return None
+
+    def save(self, city, content, encoding, url=None, captured_at=None):
+        """
+            Guarda uma página, se ela ainda não estiver no arquivo, e registra a captura.
+
+            Args:
+                city (str): Cidade da página.
+                content (bytes): Conteúdo da resposta, sem decodificar.
+                encoding (str): Codificação usada para converter o conteúdo em texto.
+                url (str): URL da página.
+                captured_at (pd.Timestamp): Horário da captura. Se não informado, usa o horário atual.
+
+            Returns:
+                str: Hash do conteúdo.
+        """
+        captured_at = pd.Timestamp.now() if captured_at is None else pd.Timestamp(captured_at)
+        digest = page_hash(content)
+        if self.find(digest) is None:
+            object_path = self._object_path(digest, self.compression)
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            # Arquivo temporário por processo e thread, pois as cidades são extraídas ao mesmo tempo
+            temporary_path = f"{object_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "wb") as file:
+                file.write(COMPRESSIONS[self.compression][1].compress(content))
+            os.replace(temporary_path, object_path)
+
+        entry = {
+            "captured_at": captured_at.strftime("%Y-%m-%dT%H:%M:%S"),
+            "hash": digest,
+            "size": len(content),
+            "encoding": encoding,
+            "url": url,
+        }
+        index_path = self._index_path(city, captured_at.strftime("%Y-%m-%d"))
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        with self._lock, open(index_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return digest
+
+    def save_response(self, city, response):
+        """
+            Guarda o conteúdo de uma resposta HTTP (requests.Response).
+
+            A codificação detectada é atribuída à resposta, para que response.text use a mesma
+            codificação (e não a detecte novamente) e o texto convertido do arquivo seja idêntico.
+
+            Returns:
+                str: Hash do conteúdo.
+        """
+        if response.encoding is None:
+            response.encoding = response.apparent_encoding
+        return self.save(city, response.content, response.encoding, url=response.url)
+
+    def cities(self):
+        """
+            Lista as cidades com páginas guardadas.
+        """
+        index_path = os.path.join(self.path, "index")
+        if not os.path.isdir(index_path):
+            return []
+        return sorted(city for city in os.listdir(index_path) if os.path.isdir(os.path.join(index_path, city)))
+
+    def dates(self, city):
+        """
+            Lista as datas com páginas guardadas de uma cidade, em ordem crescente.
+        """
+        city_path = os.path.join(self.path, "index", city)
+        if not os.path.isdir(city_path):
+            return []
+        return sorted(file[:-len(".jsonl")] for file in os.listdir(city_path) if file.endswith(".jsonl"))
+
+    def captures(self, city, date):
+        """
+            Lista as capturas de uma cidade em uma data, na ordem em que foram feitas.
+
+            Returns:
+                list: Registros das capturas (captured_at, hash, size, encoding e url).
+        """
+        index_path = self._index_path(city, date)
+        if not os.path.exists(index_path):
+            return []
+        with open(index_path, encoding="utf-8") as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    def read(self, digest):
+        """
+            Lê o conteúdo original de uma página guardada.
+
+            Raises:
+                FileNotFoundError: Se a página não estiver no arquivo.
+        """
+        object_path = self.find(digest)
+        if object_path is None:
+            raise FileNotFoundError(f"Página {digest} não encontrada em {self.path}.")
+        module = gzip if object_path.endswith(COMPRESSIONS["gzip"][0]) else lzma
+        with open(object_path, "rb") as file:
+            return module.decompress(file.read())
+
+    def read_html(self, capture):
+        """
+            Lê o texto de uma captura, convertido como response.text na extração.
+
+            Args:
+                capture (dict): Registro da captura, como retornado por captures.
+        """
+        return str(self.read(capture["hash"]), capture["encoding"] or "utf-8", errors="replace")
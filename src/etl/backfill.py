@@ -0,0 +1,281 @@
+import json
+import logging
+import os
+import time
+import pandas as pd
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from etl.commodities import CommodityCanonicalizer
+from etl.database import SqliteSink
+from etl.load import DataLoader
+from etl.lock import RunLock
+from etl.storage import get_storage, read_table
+from etl.transform import DataTransform
+
+
+def _backfill_date(date, data_path, storage_format):
+    """
+        Gera a camada silver de uma data, ainda sem os nomes canônicos das mercadorias. Executada em um processo separado.
+
+        Args:
+            date (str): Data a ser processada (AAAA-MM-DD).
+            data_path (str): Pasta com as camadas bronze, silver e gold.
+            storage_format (str): Formato de armazenamento das camadas.
+
+        Returns:
+            tuple: Data, tempo de processamento (segundos), mensagem de erro (None em caso de sucesso) e
+                nomes distintos das mercadorias, na ordem em que aparecem.
+    """
+    start = time.perf_counter()
+    try:
+        storage = get_storage(storage_format)
+        # O modo incremental compartilha o manifesto entre as datas, por isso cada data é processada por completo
+        # Os nomes canônicos dependem da ordem das datas e são substituídos depois, no processo principal
+        data_transform = DataTransform(date, storage=storage, incremental=False, canonical_names=False)
+        data_transform.root_path = os.path.join(data_path, "bronze", "")
+        data_transform.output_path = os.path.join(data_path, "silver", "")
+        data_transform.execute_silver_process()
+        return date, time.perf_counter() - start, None, data_transform.commodity_names
+    except Exception as e:
+        return date, time.perf_counter() - start, str(e), []
+
+
+class DataBackfill:
+    def __init__(self, start_date, end_date, max_workers=None, storage=None, force=False, database=None):
+        """
+        Inicializa o backfill das camadas silver e gold para um intervalo de datas.
+
+        Args:
+            start_date (str): Primeira data do intervalo (AAAA-MM-DD).
+            end_date (str): Última data do intervalo (AAAA-MM-DD).
+            max_workers (int): Quantidade máxima de processos simultâneos. Se não informado, usa a quantidade de CPUs.
+            storage (TableStorage): Formato usado para salvar as camadas. Se não informado, usa o formato padrão.
+            force (bool): Se deve processar novamente as datas já concluídas em execuções anteriores.
+            database (SqliteSink): Se informado, as camadas silver e gold das datas processadas também são gravadas no banco SQLite.
+        """
+        self.data_path = "../../data/"
+        self.state_path = "../../data/state/backfill_state.json"
+        self.start_date = pd.Timestamp(start_date).strftime("%Y-%m-%d")
+        self.end_date = pd.Timestamp(end_date).strftime("%Y-%m-%d")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.storage = storage or get_storage()
+        self.force = force
+        self.database = database
+        self.state = {}
+
+    def bronze_dates(self):
+        """
+            Lista as datas do intervalo que possuem dados na camada bronze.
+
+            Returns:
+                list: Datas (AAAA-MM-DD) em ordem crescente.
+        """
+        bronze_path = os.path.join(self.data_path, "bronze")
+        dates = set()
+        for local in os.listdir(bronze_path):
+            local_path = os.path.join(bronze_path, local)
+            if os.path.isdir(local_path):
+                dates.update(os.listdir(local_path))
+        return sorted(date for date in dates if self.start_date <= date <= self.end_date)
+
+    def _load_state(self):
+        """
+            Carrega as datas já concluídas pelas execuções anteriores.
+        """
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as file:
+                return json.load(file)
+        return {}
+
+    def _save_state(self):
+        """
+            Salva as datas concluídas, substituindo o arquivo de forma atômica.
+        """
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        temporary_path = f"{self.state_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self.state, file, indent=2, sort_keys=True)
+        os.replace(temporary_path, self.state_path)
+
+    def _prepare_folders(self):
+        # As pastas de saída são criadas antes, para que os processos não as criem ao mesmo tempo
+        for folder in ("silver", "gold", os.path.join("gold", "aggregates"), os.path.join("gold", "rolling"),
+                       os.path.join("gold", "buckets")):
+            os.makedirs(os.path.join(self.data_path, folder), exist_ok=True)
+
+    def finish_date(self, date, commodities, names):
+        """
+            Substitui os nomes das mercadorias da camada silver de uma data pelos nomes canônicos e gera a camada gold.
+
+            É executada no processo principal, uma data por vez e em ordem de data: a tabela de nomes
+            é atualizada por um único processo, e o nome canônico de cada mercadoria é o primeiro visto
+            em ordem de data, como no processamento sequencial.
+
+            Args:
+                date (str): Data com a camada silver já gerada (AAAA-MM-DD).
+                commodities (CommodityCanonicalizer): Tabela de nomes canônicos compartilhada pelas datas.
+                names (list): Nomes distintos das mercadorias da data, na ordem em que aparecem (ver _backfill_date).
+
+            Returns:
+                float: Tempo de processamento (segundos).
+        """
+        start = time.perf_counter()
+        silver_path = os.path.join(self.data_path, "silver", date)
+        df_silver = read_table(silver_path)
+        # Registra os nomes na mesma ordem do processamento sequencial, que define o nome canônico
+        commodities.lookup(names)
+        raw = df_silver['Mercadoria']
+        raw_names = raw.cat.categories if isinstance(raw.dtype, pd.CategoricalDtype) else raw.dropna().unique()
+        # Mesmas categorias de DataTransform.reorder_columns sobre os nomes já canônicos
+        categories = sorted(set(commodities.lookup([str(value) for value in raw_names])))
+        df_silver['Mercadoria'] = commodities.canonicalize(raw.astype(object)).astype(pd.CategoricalDtype(categories))
+        self.storage.write(df_silver, silver_path)
+        commodities.save()
+
+        loader = DataLoader(date, storage=self.storage)
+        loader.root_path = os.path.join(self.data_path, "silver", "")
+        loader.output_path = os.path.join(self.data_path, "gold", "")
+        loader.aggregates_path = os.path.join(self.data_path, "gold", "aggregates", "")
+        loader.rolling_path = os.path.join(self.data_path, "gold", "rolling", "")
+        loader.buckets_path = os.path.join(self.data_path, "gold", "buckets", "")
+        loader.execute_gold_process(rolling=False)
+        return time.perf_counter() - start
+
+    def process_dates(self, dates):
+        """
+            Gera as camadas silver e gold diárias das datas, com a camada silver em paralelo, uma data por processo.
+
+            No máximo max_workers datas ficam em processamento ao mesmo tempo. À medida que as datas
+            terminam, o processo principal conclui cada uma em ordem de data (finish_date), enquanto os
+            demais processos continuam. Cada data concluída é registrada no arquivo de estado assim que
+            termina, permitindo retomar o backfill após uma falha.
+
+            Args:
+                dates (list): Datas a serem processadas, em ordem crescente.
+
+            Returns:
+                dict: Mensagem de erro das datas que falharam, indexada pela data.
+        """
+        failures = {}
+        pending = iter(dates)
+        running = set()
+        completed = 0
+        start = time.perf_counter()
+        commodities = CommodityCanonicalizer(os.path.join(self.data_path, "state", "commodity_aliases.json"))
+        # Datas com a camada silver gerada, aguardando as anteriores para serem concluídas em ordem
+        finished = {}
+        position = 0
+        # Tempo gasto no processo principal (nomes canônicos e camada gold), que não é paralelizado
+        finish_time = 0.0
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            def submit_next():
+                date = next(pending, None)
+                if date is not None:
+                    running.add(executor.submit(_backfill_date, date, self.data_path, self.storage.name))
+
+            for _ in range(self.max_workers):
+                submit_next()
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.remove(future)
+                    date, elapsed, error, names = future.result()
+                    completed += 1
+                    finished[date] = (elapsed, error, names)
+
+                    rate = completed / (time.perf_counter() - start)
+                    logging.info(f"Backfill: {completed}/{len(dates)} datas ({date} em {elapsed:.2f}s, {rate:.2f} datas/s).")
+                    submit_next()
+
+                while position < len(dates) and dates[position] in finished:
+                    date = dates[position]
+                    position += 1
+                    elapsed, error, names = finished.pop(date)
+                    if error is None:
+                        try:
+                            finish_elapsed = self.finish_date(date, commodities, names)
+                            elapsed += finish_elapsed
+                            finish_time += finish_elapsed
+                        except Exception as e:
+                            error = str(e)
+                    if error is None:
+                        self.state[date] = {"elapsed": round(elapsed, 3)}
+                        self._save_state()
+                    else:
+                        failures[date] = error
+                        logging.error(f"Erro no backfill de {date}: {error}")
+        logging.info(f"Backfill: {finish_time:.2f}s de {time.perf_counter() - start:.2f}s no processo principal "
+                     f"(nomes canônicos e camada gold, em ordem de data).")
+        return failures
+
+    def build_rolling_tables(self, dates):
+        """
+            Gera as tabelas das janelas móveis e do acumulado no ano, em ordem de data.
+
+            As tabelas dependem dos agregados dos dias anteriores (o acumulado no ano reaproveita o do
+            dia anterior), por isso são geradas depois do processamento paralelo, combinando os agregados diários.
+
+            Args:
+                dates (list): Datas processadas com sucesso.
+        """
+        for date in sorted(dates):
+            loader = DataLoader(date, storage=self.storage)
+            loader.root_path = os.path.join(self.data_path, "silver", "")
+            loader.aggregates_path = os.path.join(self.data_path, "gold", "aggregates", "")
+            loader.rolling_path = os.path.join(self.data_path, "gold", "rolling", "")
+            df_day = loader.load_aggregates(date)
+            if df_day is not None:
+                loader.save_rolling_data(df_day)
+
+    def load_database(self, dates):
+        """
+            Grava as camadas silver e gold das datas no banco SQLite, uma data por transação.
+
+            A gravação é feita depois do processamento paralelo, em um único processo, pois o SQLite
+            aceita apenas uma escrita por vez.
+
+            Args:
+                dates (list): Datas processadas com sucesso.
+        """
+        for date in sorted(dates):
+            loader = DataLoader(date, storage=self.storage, database=self.database)
+            loader.root_path = os.path.join(self.data_path, "silver", "")
+            df_silver = loader.load_silver()
+            if df_silver is not None:
+                loader.save_database(df_silver, read_table(os.path.join(self.data_path, "gold", date)))
+
+    def execute_backfill_process(self):
+        """
+            Executa o backfill do intervalo de datas, com o mesmo bloqueio do ETL diário (RunLock).
+
+            1. Lista as datas do intervalo com dados na camada bronze.
+            2. Descarta as datas concluídas em execuções anteriores (a menos que force seja informado).
+            3. Gera as camadas silver diárias em paralelo e, em ordem de data, substitui os nomes das
+               mercadorias pelos nomes canônicos e gera as camadas gold diárias.
+            4. Gera as tabelas gold das janelas móveis de todas as datas do intervalo, em ordem.
+            5. Grava as camadas silver e gold das datas processadas no banco SQLite, se configurado.
+
+            Returns:
+                dict: Mensagem de erro das datas que falharam, indexada pela data.
+
+            Raises:
+                LockBusyError: Se outra execução do ETL ou do backfill estiver em andamento.
+        """
+        # Impede que o backfill e o ETL diário gravem as mesmas camadas ao mesmo tempo
+        with RunLock(os.path.join(self.data_path, "state", "etl.lock")):
+            dates = self.bronze_dates()
+            self.state = self._load_state()
+            pending = dates if self.force else [date for date in dates if date not in self.state]
+            logging.info(f"Backfill de {self.start_date} a {self.end_date}: {len(pending)} de {len(dates)} datas a processar "
+                         f"com até {self.max_workers} processos.")
+
+            self._prepare_folders()
+            failures = self.process_dates(pending) if pending else {}
+            self.build_rolling_tables([date for date in dates if date not in failures])
+            if self.database is not None:
+                self.load_database([date for date in pending if date not in failures])
+
+        if failures:
+            logging.warning(f"{len(failures)} datas falharam e serão processadas novamente na próxima execução.")
+        return failures
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+@dataclass(frozen=True)
+class CoalesceRule:
+    """
+        Regra declarativa de preenchimento de uma coluna de destino a partir de colunas de origem.
+
+        A coluna de destino recebe, linha a linha, o primeiro valor não nulo entre as colunas
+        de origem (na ordem informada). Antes da combinação, cada origem pode passar por um
+        mapeamento de valores (dict), e o resultado final pode passar por um conversor que
+        opera sobre a coluna inteira.
+
+        Args:
+            target (str): Nome da coluna de destino.
+            sources (tuple): Colunas de origem em ordem de prioridade (a própria coluna de destino pode aparecer).
+            mappings (dict): Mapeamento opcional de valores por coluna de origem. Valores sem correspondência viram nulos.
+            default (object): Valor usado quando nenhuma origem possui valor.
+            converter (Callable): Função opcional aplicada sobre a Series resultante, recebendo também o DataFrame de origem.
+            drop (tuple): Colunas removidas do DataFrame após a aplicação da regra.
+    """
+    target: str
+    sources: tuple
+    mappings: dict = field(default_factory=dict)
+    default: object = None
+    converter: Optional[Callable[[pd.Series, pd.DataFrame], pd.Series]] = None
+    drop: tuple = ()
+
+
+class ColumnCoalescer:
+    def __init__(self, rules):
+        """
+        Inicializa o ColumnCoalescer com a lista de regras que serão aplicadas.
+
+        Args:
+            rules (list): Lista de CoalesceRule, aplicadas na ordem em que foram informadas.
+        """
+        self.rules = {rule.target: rule for rule in rules}
+
+    def _resolve_source(self, df, column, mapping):
+        """
+            Retorna a coluna de origem já mapeada, ou None caso a coluna não exista no DataFrame.
+
+            Args:
+                df (pd.DataFrame): DataFrame de origem.
+                column (str): Nome da coluna de origem.
+                mapping (dict): Mapeamento opcional de valores.
+        """
+        if column not in df.columns:
+            return None
+
+        values = df[column]
+        if mapping is not None:
+            values = values.map(mapping)
+        return values
+
+    def coalesce(self, df, rule):
+        """
+            Calcula a coluna de destino de uma regra utilizando apenas operações sobre colunas inteiras.
+
+            Args:
+                df (pd.DataFrame): DataFrame a ser processado.
+                rule (CoalesceRule): Regra a ser avaliada.
+
+            Returns:
+                pd.Series: Coluna resultante, alinhada ao índice do DataFrame.
+        """
+        candidates = [
+            self._resolve_source(df, column, rule.mappings.get(column))
+            for column in rule.sources
+        ]
+        candidates = [values for values in candidates if values is not None]
+        default = np.nan if rule.default is None else rule.default
+
+        if not candidates:
+            result = pd.Series(default, index=df.index, dtype=object)
+        else:
+            # np.select escolhe, para cada linha, a primeira origem com valor preenchido
+            conditions = [values.notna().to_numpy() for values in candidates]
+            choices = [values.to_numpy(dtype=object) for values in candidates]
+            result = pd.Series(
+                np.select(conditions, choices, default=default),
+                index=df.index,
+                dtype=object
+            )
+
+        if rule.converter is not None:
+            result = rule.converter(result, df)
+        return result
+
+    def apply_rule(self, df, target, force=False):
+        """
+            Aplica a regra associada à coluna de destino informada.
+
+            A regra só é aplicada se ao menos uma das colunas de origem, além da própria coluna
+            de destino, existir no DataFrame.
+
+            Args:
+                df (pd.DataFrame): DataFrame a ser processado.
+                target (str): Coluna de destino da regra.
+                force (bool): Aplica a regra mesmo sem as colunas de origem (ex.: ao processar um arquivo
+                    isolado, que deve ter o mesmo resultado de quando é combinado aos demais).
+
+            Returns:
+                pd.DataFrame: DataFrame com a coluna de destino preenchida.
+        """
+        rule = self.rules[target]
+        triggers = [column for column in rule.sources if column != rule.target]
+        if not force and not any(column in df.columns for column in triggers):
+            return df
+
+        df[rule.target] = self.coalesce(df, rule)
+        return df.drop(columns=[column for column in rule.drop if column in df.columns])
+
+    def apply(self, df, force=False):
+        """
+            Aplica todas as regras, na ordem em que foram registradas.
+
+            Args:
+                df (pd.DataFrame): DataFrame a ser processado.
+                force (bool): Aplica as regras mesmo sem as colunas de origem.
+        """
+        for target in self.rules:
+            df = self.apply_rule(df, target, force=force)
+        return df
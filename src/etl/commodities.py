@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# Versão das regras de normalização; ao mudar, os nomes calculados são descartados (os manuais são mantidos)
+NORMALIZATION_VERSION = 1
+
+# Tamanho máximo dos nomes de mercadoria nas páginas de Paranaguá, que cortam o texto no meio
+TRUNCATED_LENGTH = 30
+
+# Espaços em volta de pontuação ("MISTURAS,C/ M" e "MISTURAS, C/M" são o mesmo nome)
+PUNCTUATION_SPACES = re.compile(r'\s*([,./()\-])\s*')
+
+
+def remove_repetition(text):
+    """
+        Remove a repetição de nomes das linhas de Santos com mais de uma operação
+        ("VEICULO VEICULO" -> "VEICULO"). Nomes diferentes ("CONTEINERES VAZIOS CONTEINERES CHEIOS") são mantidos.
+
+        Args:
+            text (str): Nome da mercadoria, com os espaços já normalizados.
+    """
+    tokens = text.split(" ")
+    for size in range(1, len(tokens) // 2 + 1):
+        if len(tokens) % size == 0 and tokens == tokens[:size] * (len(tokens) // size):
+            return " ".join(tokens[:size])
+    return text
+
+
+def clean_name(value):
+    """
+        Retorna o nome da mercadoria em maiúsculas, sem espaços repetidos e sem repetição do nome.
+    """
+    return remove_repetition(" ".join(str(value).upper().split()))
+
+
+def comparison_key(name):
+    """
+        Chave usada para comparar nomes: sem acentos e sem espaços em volta de pontuação.
+
+        Args:
+            name (str): Nome já limpo por clean_name.
+    """
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(character for character in text if not unicodedata.combining(character))
+    return PUNCTUATION_SPACES.sub(r'\1', text)
+
+
+class CommodityCanonicalizer:
+    def __init__(self, path="../../data/state/commodity_aliases.json"):
+        """
+        Inicializa a tabela de nomes canônicos das mercadorias, persistida entre as execuções.
+
+        Cada nome recebido das páginas é normalizado uma única vez e o resultado fica guardado na tabela
+        ('aliases'). Nomes iguais a menos de maiúsculas, acentos, espaços e repetição passam a ter o mesmo
+        nome canônico (o primeiro visto), e nomes cortados por Paranaguá são associados ao nome completo
+        quando ele é conhecido. A seção 'manual' do arquivo pode ser editada para unir nomes diferentes
+        (ex.: "CLORETOS DE POTASSIO" -> "CLORETO DE POTASSIO") e tem prioridade sobre a normalização.
+
+        Args:
+            path (str): Caminho do arquivo JSON da tabela.
+        """
+        self.path = path
+        self.manual = {}
+        self.aliases = {}
+        self.changed = False
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                content = json.load(file)
+            self.manual = content.get("manual", {})
+            if content.get("version") == NORMALIZATION_VERSION:
+                self.aliases = content.get("aliases", {})
+            else:
+                logging.info("Regras de normalização de mercadorias alteradas, nomes canônicos serão recalculados.")
+                self.changed = True
+        # Nome canônico de cada chave de comparação
+        self._names = {comparison_key(name): name for name in self.aliases.values()}
+
+    def _resolve_truncated(self, key):
+        """
+            Retorna a chave do nome completo de um nome cortado, se houver exatamente um nome conhecido que o continue.
+        """
+        candidates = [other for other in self._names if len(other) > len(key) and other.startswith(key)]
+        return candidates[0] if len(candidates) == 1 else key
+
+    def _canonical(self, value):
+        """
+            Calcula o nome canônico de um nome ainda não registrado.
+        """
+        name = clean_name(value)
+        key = comparison_key(name)
+        if len(name) >= TRUNCATED_LENGTH:
+            key = self._resolve_truncated(key)
+        return self._names.setdefault(key, name)
+
+    def _update_truncated(self):
+        """
+            Associa ao nome completo os nomes cortados registrados antes de o nome completo ser conhecido.
+        """
+        for raw, name in self.aliases.items():
+            if len(name) < TRUNCATED_LENGTH:
+                continue
+            key = self._resolve_truncated(comparison_key(name))
+            if self._names.get(key, name) != name:
+                self.aliases[raw] = self._names[key]
+
+    def lookup(self, values):
+        """
+            Retorna o nome canônico de cada valor distinto, normalizando apenas os que não estão na tabela.
+
+            Args:
+                values (list): Valores distintos, em texto.
+
+            Returns:
+                list: Nomes canônicos, na mesma ordem.
+        """
+        new = [value for value in values if value not in self.manual and value not in self.aliases]
+        for value in new:
+            self.aliases[value] = self._canonical(value)
+        if new:
+            self._update_truncated()
+            self.changed = True
+        return [self.manual.get(value, self.aliases.get(value)) for value in values]
+
+    def canonicalize(self, values):
+        """
+            Substitui os nomes de uma coluna inteira pelos nomes canônicos.
+
+            A coluna é codificada em dicionário: apenas os valores distintos passam pela tabela, e o
+            resultado é redistribuído para as linhas pelos códigos.
+
+            Args:
+                values (pd.Series): Nomes das mercadorias.
+
+            Returns:
+                pd.Series: Nomes canônicos, com os valores nulos mantidos.
+        """
+        codes, uniques = pd.factorize(values)
+        names = np.array(self.lookup([str(value) for value in uniques]) + [None], dtype=object)
+        # O código -1 (valor nulo) aponta para o None adicionado ao final
+        return pd.Series(names[codes], index=values.index, dtype=object)
+
+    def save(self):
+        """
+            Salva a tabela, se houver nomes novos, substituindo o arquivo de forma atômica.
+        """
+        if not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Um arquivo temporário por processo, pois o backfill salva a tabela em paralelo
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        content = {"version": NORMALIZATION_VERSION, "manual": self.manual, "aliases": self.aliases}
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(content, file, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temporary_path, self.path)
+        self.changed = False
@@ -0,0 +1,226 @@
+import logging
+import os
+import sqlite3
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from etl.parsers import parse_arrival
+
+# Colunas (com o tipo no SQLite) e chave primária de cada tabela. A camada silver não tem uma chave que
+# identifique cada linha (a posição da linha muda quando a página muda de ordem): cada data é substituída por inteiro
+TABLES = {
+    "silver": {
+        "columns": {"Data": "TEXT", "local": "TEXT", "Chegada": "TEXT",
+                    "Sentido": "TEXT", "Mercadoria": "TEXT", "Peso": "REAL"},
+        "key": None,
+    },
+    "gold": {
+        "columns": {"Data": "TEXT", "local": "TEXT", "Sentido": "TEXT", "Mercadoria": "TEXT",
+                    "Peso": "REAL", "Total": "INTEGER"},
+        "key": ["Data", "local", "Sentido", "Mercadoria"],
+    },
+}
+
+# Índices nas colunas mais usadas nos filtros das consultas (local, sentido, mercadoria e chegada)
+INDEXES = {
+    "silver_data": ("silver", ["Data"]),
+    "silver_local_chegada": ("silver", ["local", "Sentido", "Chegada"]),
+    "silver_mercadoria_chegada": ("silver", ["Mercadoria", "Chegada"]),
+    "gold_local_mercadoria": ("gold", ["local", "Sentido", "Mercadoria", "Data"]),
+}
+
+
+def _as_values(values):
+    """
+        Converte uma coluna para uma lista de valores aceitos pelo SQLite, com None nos valores nulos.
+
+        Datas são gravadas em texto no formato AAAA-MM-DD HH:MM:SS, que mantém a ordem cronológica
+        nas comparações e é aceito pelas funções de data do SQLite.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        text = np.datetime_as_string(values.to_numpy(dtype="datetime64[s]"), unit="s").astype(object)
+        text[values.isna().to_numpy()] = None
+        return [None if value is None else value.replace("T", " ") for value in text]
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+class SqliteSink:
+    def __init__(self, path="../../data/lineup.db", batch_size=50_000):
+        """
+        Inicializa o banco SQLite que recebe as camadas silver e gold, para consultas ao histórico sem ler os arquivos.
+
+        Cada data é gravada em uma única transação, com as linhas inseridas em lotes (executemany).
+        Na camada silver, as linhas da data são removidas e inseridas novamente; na camada gold, as
+        linhas são gravadas por upsert na chave primária (data, local, sentido e mercadoria) e as linhas
+        da data que não existem mais são removidas. Nos dois casos, gravar a mesma data novamente
+        substitui a gravação anterior.
+
+        Args:
+            path (str): Caminho do arquivo do banco.
+            batch_size (int): Quantidade de linhas convertidas e inseridas por lote.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = None
+
+    def connect(self):
+        """
+            Abre a conexão, criando as tabelas e os índices que ainda não existem.
+
+            Returns:
+                sqlite3.Connection: Conexão com o banco.
+        """
+        if self.connection is not None:
+            return self.connection
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Sem transações implícitas: cada gravação abre e confirma a sua
+        self.connection = sqlite3.connect(self.path, isolation_level=None, timeout=60, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        # Cache de 64 MB: os índices da camada silver são atualizados fora de ordem a cada lote
+        self.connection.execute("PRAGMA cache_size=-65536")
+        for table, definition in TABLES.items():
+            columns = ", ".join(f'"{column}" {kind}' for column, kind in definition["columns"].items())
+            if definition["key"]:
+                key = ", ".join(f'"{column}"' for column in definition["key"])
+                columns += f", PRIMARY KEY ({key})"
+            self.connection.execute(f'CREATE TABLE IF NOT EXISTS {table} ({columns})')
+        for name, (table, columns) in INDEXES.items():
+            columns = ", ".join(f'"{column}"' for column in columns)
+            self.connection.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})')
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @contextmanager
+    def _transaction(self):
+        connection = self.connect()
+        # IMMEDIATE reserva a escrita no início, para que gravações simultâneas esperem em vez de falhar no meio
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _rows(self, table, date, df):
+        """
+            Converte as linhas de uma data em lotes de tuplas, na ordem das colunas da tabela.
+        """
+        columns = list(TABLES[table]["columns"])
+        for start in range(0, len(df), self.batch_size):
+            batch = df.iloc[start:start + self.batch_size]
+            yield list(zip(*([date] * len(batch) if column == "Data" else _as_values(batch[column])
+                             for column in columns)))
+
+    def _replace(self, table, date, df):
+        """
+            Substitui as linhas de uma data em uma tabela: remove as linhas gravadas antes e insere as novas, em lotes.
+
+            Args:
+                table (str): Nome da tabela.
+                date (str): Data das linhas (AAAA-MM-DD).
+                df (pd.DataFrame): Linhas com todas as colunas da tabela, exceto Data.
+
+            Returns:
+                int: Quantidade de linhas removidas.
+        """
+        columns = list(TABLES[table]["columns"])
+        names = ", ".join(f'"{column}"' for column in columns)
+        insert = f'INSERT INTO {table} ({names}) VALUES ({", ".join("?" * len(columns))})'
+        with self._transaction() as connection:
+            removed = connection.execute(f'DELETE FROM {table} WHERE "Data" = ?', (date,)).rowcount
+            for rows in self._rows(table, date, df):
+                connection.executemany(insert, rows)
+        return removed
+
+    def _upsert(self, table, date, df):
+        """
+            Grava as linhas de uma data em uma tabela, em lotes, e remove as linhas da data que não foram regravadas.
+
+            Args:
+                table (str): Nome da tabela ('silver' ou 'gold').
+                date (str): Data das linhas (AAAA-MM-DD).
+                df (pd.DataFrame): Linhas com todas as colunas da tabela, exceto Data.
+
+            Returns:
+                int: Quantidade de linhas removidas.
+        """
+        columns = list(TABLES[table]["columns"])
+        key = TABLES[table]["key"]
+        names = ", ".join(f'"{column}"' for column in columns)
+        key_names = ", ".join(f'"{column}"' for column in key)
+        updates = ", ".join(f'"{column}" = excluded."{column}"' for column in columns if column not in key)
+        insert = (f'INSERT INTO {table} ({names}) VALUES ({", ".join("?" * len(columns))}) '
+                  f'ON CONFLICT ({key_names}) DO UPDATE SET {updates}')
+
+        with self._transaction() as connection:
+            existing = set(connection.execute(f'SELECT {key_names} FROM {table} WHERE "Data" = ?', (date,)))
+            written = set()
+            for rows in self._rows(table, date, df):
+                connection.executemany(insert, rows)
+                if existing:
+                    written.update(tuple(row[columns.index(column)] for column in key) for row in rows)
+            stale = existing - written
+            if stale:
+                conditions = " AND ".join(f'"{column}" IS ?' for column in key)
+                connection.executemany(f'DELETE FROM {table} WHERE {conditions}', stale)
+        return len(stale)
+
+    def write_silver(self, date, df):
+        """
+            Grava a camada silver de uma data, substituindo as linhas gravadas antes para a mesma data.
+
+            Args:
+                date (str): Data da camada silver (AAAA-MM-DD).
+                df (pd.DataFrame): Dados silver da data.
+
+            Returns:
+                int: Quantidade de linhas gravadas.
+        """
+        df = df[['Chegada', 'Sentido', 'local', 'Mercadoria', 'Peso']]
+        if not pd.api.types.is_datetime64_any_dtype(df['Chegada']):
+            # Tabelas silver salvas antes das datas de chegada tipadas
+            df = df.assign(Chegada=parse_arrival(df['Chegada']))
+        removed = self._replace("silver", date, df)
+        logging.info(f"Banco de dados: {len(df)} linhas silver de {date} gravadas ({removed} removidas).")
+        return len(df)
+
+    def write_gold(self, date, df):
+        """
+            Grava a tabela gold de uma data (peso total e quantidade de embarcações por local, sentido e mercadoria).
+
+            Args:
+                date (str): Data da tabela gold (AAAA-MM-DD).
+                df (pd.DataFrame): Tabela gold da data.
+
+            Returns:
+                int: Quantidade de linhas gravadas.
+        """
+        removed = self._upsert("gold", date, df[['local', 'Sentido', 'Mercadoria', 'Peso', 'Total']])
+        logging.info(f"Banco de dados: {len(df)} linhas gold de {date} gravadas ({removed} removidas).")
+        return len(df)
+
+    def query(self, sql, params=()):
+        """
+            Executa uma consulta no banco.
+
+            Args:
+                sql (str): Consulta SQL, com '?' no lugar dos parâmetros.
+                params (tuple): Valores dos parâmetros.
+
+            Returns:
+                pd.DataFrame: Resultado da consulta.
+        """
+        return pd.read_sql_query(sql, self.connect(), params=params)
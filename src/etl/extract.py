@@ -1,31 +1,252 @@
 import pandas as pd
 import requests
-from io import StringIO
 import os
+import time
+import json
+import hashlib
+import logging
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from etl.archive import PageArchive
+from etl.html_tables import extract_tables
+from etl.instrumentation import stage
+from etl.storage import STORAGE_FORMATS, get_storage, list_tables, remove_table
+
+
+def bronze_table_name(title):
+    """
+        Nome da tabela bronze (caminho relativo à pasta do dia, sem extensão) gerado a partir do título da tabela.
+
+        Args:
+            title (str): Título da tabela na página.
+    """
+    return title.replace(" ", "_").lower()
+
+
+def _replay_capture(extractor_class, archive_path, bronze_path, storage_format, city, date, capture):
+    """
+        Converte uma página guardada no arquivo de páginas em tabelas bronze. Executada em um processo separado.
+
+        Returns:
+            tuple: Cidade, data, linhas extraídas, tempo (segundos) e mensagem de erro (None em caso de sucesso).
+    """
+    start = time.perf_counter()
+    try:
+        extractor = extractor_class(storage=get_storage(storage_format))
+        extractor.bronze_path = bronze_path
+        data = extractor.extract(city, html=PageArchive(archive_path).read_html(capture))
+        extractor._save_bronze_data(city, data, date)
+        return city, date, sum(len(df) for df in data.values()), time.perf_counter() - start, None
+    except Exception as e:
+        return city, date, 0, time.perf_counter() - start, str(e)
+
+
+@dataclass
+class ExtractionResult:
+    """
+        Resultado da extração de uma cidade.
+
+        Args:
+            city (str): Nome da cidade.
+            data (dict): DataFrames extraídos, indexados pelo título da tabela, ou None em caso de falha.
+            error (Exception): Erro ocorrido durante a extração, se houver.
+            elapsed (float): Tempo gasto na extração, em segundos.
+            changed (bool): Se a página mudou desde a última extração do dia.
+            validators (dict): ETag, Last-Modified e hash do conteúdo da resposta.
+    """
+    city: str
+    data: Optional[dict] = None
+    error: Optional[Exception] = None
+    elapsed: float = 0.0
+    changed: bool = True
+    validators: Optional[dict] = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
 
 class DataExtractor:
-    def __init__(self):
+    def __init__(self, urls=None, timeouts=None, retries=3, backoff_factor=1.0, max_workers=None, storage=None,
+                 vessel_store=None, handoff=None, archive=None):
         """
         Inicializa o objeto DataExtractor com as URLs das páginas
         de onde os dados serão extraídos. Essas URLs estão associadas
         às cidades de Santos e Paranaguá.
+
+        Args:
+            urls (dict): URLs de cada cidade, substituindo as URLs padrão (ex.: servidor local de testes).
+            timeouts (dict): Timeout (conexão, leitura) em segundos de cada cidade.
+            retries (int): Quantidade de novas tentativas em erros de conexão ou respostas 429/5xx.
+            backoff_factor (float): Fator do intervalo exponencial entre tentativas (1s, 2s, 4s...).
+            max_workers (int): Quantidade de cidades extraídas ao mesmo tempo no modo concorrente.
+            storage (TableStorage): Formato dos arquivos da pasta bronze. Se não informado, usa o formato padrão.
+            vessel_store (VesselCallStore): Armazenamento de escalas por captura de mudanças, atualizado a cada página salva.
+            handoff (TableHandoff): Se informado, as tabelas bronze são salvas em segundo plano e mantidas em memória para a camada silver.
+            archive (PageArchive): Se informado, o conteúdo original de cada página recebida é guardado no arquivo de páginas.
         """
-        self.urls = {
+        self.urls = urls or {
             "santos": "https://www.portodesantos.com.br/informacoes-operacionais/operacoes-portuarias/navegacao-e-movimento-de-navios/navios-esperados-carga/",
             "paranagua": "https://www.appaweb.appa.pr.gov.br/appaweb/pesquisa.aspx?WCI=relLineUpRetroativo"
         }
+        self.default_timeout = (10, 60)
+        self.timeouts = dict(timeouts or {})
+        # A página de Santos é acessada sem verificação do certificado
+        self.verify = {"santos": False}
+        self.max_workers = max_workers or len(self.urls)
+        self.session = self._build_session(retries, backoff_factor)
+        self.storage = storage or get_storage()
+        self.vessel_store = vessel_store
+        self.handoff = handoff
+        self.archive = archive
+        self.bronze_path = "../../data/bronze/"
+        # Validadores (ETag, Last-Modified e hash) da última página salva de cada cidade
+        self.state_path = "../../data/state/extract_state.json"
+        self.state = {}
 
-    def extract(self, city):
+    def _build_session(self, retries, backoff_factor):
+        """
+            Cria uma sessão HTTP compartilhada, com pool de conexões e novas tentativas com intervalo exponencial.
+
+            Args:
+                retries (int): Quantidade de novas tentativas.
+                backoff_factor (float): Fator do intervalo exponencial entre tentativas.
+
+            Returns:
+                requests.Session: Sessão configurada.
+        """
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=len(self.urls), pool_maxsize=self.max_workers)
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _fetch(self, city, headers=None):
+        """
+            Faz a requisição HTTP da página de uma cidade utilizando a sessão compartilhada.
+
+            Args:
+                city (str): Nome da cidade.
+                headers (dict): Cabeçalhos adicionais da requisição.
+
+            Returns:
+                requests.Response: Resposta da página.
+
+            Raises:
+                requests.RequestException: Em caso de timeout, erro de conexão ou status de erro após as tentativas.
+        """
+        response = self.session.get(
+            self.urls[city],
+            headers=headers,
+            timeout=self.timeouts.get(city, self.default_timeout),
+            verify=self.verify.get(city, True)
+        )
+        response.raise_for_status()
+        if self.archive is not None and response.status_code == 200:
+            self._archive_response(city, response)
+        return response
+
+    def _archive_response(self, city, response):
+        """
+            Guarda a página recebida no arquivo de páginas. Uma falha é registrada no log sem interromper
+            a extração, pois a página ainda pode ser convertida e salva na pasta bronze.
+        """
+        try:
+            with stage(f"archive {city}"):
+                self.archive.save_response(city, response)
+        except Exception as e:
+            logging.error(f"Erro ao guardar a página de {city} no arquivo de páginas: {e}")
+
+    def _load_state(self):
+        """
+            Carrega os validadores das últimas páginas salvas.
+        """
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as file:
+                self.state = json.load(file)
+        return self.state
+
+    def _save_state(self):
+        """
+            Salva os validadores das páginas, substituindo o arquivo de forma atômica.
+        """
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        temporary_path = f"{self.state_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self.state, file, indent=2)
+        os.replace(temporary_path, self.state_path)
+
+    def commit_state(self):
+        """
+            Salva os validadores das páginas extraídas por execute_bronze_process.
+
+            Deve ser chamado apenas depois que as camadas silver e gold do dia foram geradas: se a
+            transformação ou o carregamento falhar, os validadores anteriores são mantidos e a próxima
+            extração processa as mesmas páginas novamente, em vez de considerá-las inalteradas.
+        """
+        self._save_state()
+
+    def _fetch_if_changed(self, city, today):
+        """
+            Faz uma requisição condicional da página de uma cidade.
+
+            Os validadores só são usados se a página já foi salva na data atual, pois cada dia
+            precisa da sua própria cópia na pasta bronze.
+
+            Args:
+                city (str): Nome da cidade.
+                today (str): Data atual (AAAA-MM-DD).
+
+            Returns:
+                tuple: Resposta (None se a página não mudou) e validadores da página.
+        """
+        previous = self.state.get(city, {})
+        saved_today = previous.get("date") == today
+        headers = {}
+        if saved_today:
+            if previous.get("etag"):
+                headers["If-None-Match"] = previous["etag"]
+            if previous.get("last_modified"):
+                headers["If-Modified-Since"] = previous["last_modified"]
+
+        response = self._fetch(city, headers=headers)
+        if response.status_code == 304:
+            return None, previous
+
+        validators = {
+            "date": today,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": hashlib.sha256(response.content).hexdigest()
+        }
+        # O servidor pode não suportar requisições condicionais: compara o conteúdo recebido
+        if saved_today and validators["content_hash"] == previous.get("content_hash"):
+            return None, validators
+        return response, validators
+
+    def extract(self, city, html=None):
         """
         Função responsável por decidir qual método de extração utilizar
         com base na cidade informada e retornar os dados extraídos.
 
         Args:
             city (str): Nome da cidade de onde os dados devem ser extraídos (santos ou paranagua).
+            html (str): Conteúdo da página já obtido. Se não informado, a página é requisitada.
 
         Returns:
-            pd.DataFrame: DataFrame contendo os dados extraídos da página correspondente
-            à cidade escolhida, ou gera um erro caso a cidade não seja válida.
+            dict: DataFrames contendo os dados extraídos da página correspondente
+            à cidade escolhida, indexados pelo título da tabela, ou gera um erro caso a cidade não seja válida.
         
         Raises:
             ValueError: Se a cidade informada não estiver entre as opções disponíveis.
@@ -35,97 +256,298 @@ class DataExtractor:
             if city not in self.urls:
                 raise ValueError(f"Cidade {city} não encontrada nas fontes de dados.")
             
+            if html is None:
+                with stage(f"fetch {city}"):
+                    html = self._fetch(city).text
+
             # Chama a função apropriada para extrair dados com base na cidade
-            if city == "santos":
-                return self._extract_santos()
-            elif city == "paranagua":
-                return self._extract_paranagua()
+            with stage(f"parse {city}") as step:
+                if city == "santos":
+                    data = self._extract_santos(html)
+                elif city == "paranagua":
+                    data = self._extract_paranagua(html)
+                step.rows_out = sum(len(df) for df in data.values())
+            return data
         except Exception as e:
             # Em caso de erro, a exceção é capturada e re-levantada
             raise e
         
-    def _extract_santos(self):
+    def _extract_santos(self, html):
         """
         Função privada responsável por extrair dados da página de Santos.
 
-        Esta função faz uma requisição HTTP para a página do Porto de Santos,
-        obtém o conteúdo HTML e converte as tabelas presentes na página
+        Esta função recebe o conteúdo HTML da página do Porto de Santos
+        e converte as tabelas de line-up (identificadas pela coluna 'Navio Ship')
         para DataFrames do pandas.
 
+        Args:
+            html (str): Conteúdo HTML da página de Santos.
+
         Returns:
-            list: Lista de DataFrames contendo os dados extraídos da página de Santos.
+            dict: DataFrames contendo os dados extraídos da página de Santos, indexados pelo título da tabela.
 
         Raises:
             Exception: Caso ocorra algum erro na requisição ou processamento dos dados.
         """
         try:
-            # Requisição HTTP para a página de Santos
-            response = requests.get(self.urls["santos"], verify=False)
-
-            # Io para tratar o conteúdo HTML como arquivo
-            str_response = StringIO(response.text)
-
-            # Converte o conteúdo HTML em tabelas de DataFrames
-            data = pd.read_html(str_response)
+            # Converte apenas as tabelas de line-up em DataFrames
+            data = extract_tables(html, predicate=self._is_santos_lineup_table)
             return data
         except Exception as e:
             # Captura qualquer erro que ocorra durante a extração
             raise e
     
-    def _extract_paranagua(self):
+    def _extract_paranagua(self, html):
         """
         Função privada responsável por extrair dados da página de Paranaguá.
 
-        Esta função faz uma requisição HTTP para a página de Paranaguá,
-        obtém o conteúdo HTML e converte as tabelas presentes na página
-        para DataFrames do pandas.
+        Esta função recebe o conteúdo HTML da página de Paranaguá
+        e converte as tabelas de line-up para DataFrames do pandas.
+        A primeira coluna das tabelas (índice) é descartada.
+
+        Args:
+            html (str): Conteúdo HTML da página de Paranaguá.
 
         Returns:
-            list: Lista de DataFrames contendo os dados extraídos da página de Paranaguá.
+            dict: DataFrames contendo os dados extraídos da página de Paranaguá, indexados pelo título da tabela.
 
         Raises:
             Exception: Caso ocorra algum erro na requisição ou processamento dos dados.
         """
         try:
-            # Requisição HTTP para a página de Paranaguá
-            response = requests.get(self.urls["paranagua"])
-            str_response = StringIO(response.text)
-
-            # Converte o conteúdo HTML em tabelas de DataFrames
-            data = pd.read_html(str_response, header=None, index_col=0)
-
-            # Valida antes de definir o cabeçalho
-            validated_data = self._validate_paranagua_data_frame(data)
-
-            return validated_data
+            # Valida o cabeçalho antes de converter as tabelas
+            data = extract_tables(
+                html,
+                predicate=self._is_paranagua_lineup_table,
+                skip_columns=1,
+                min_rows=2
+            )
+            return data
         except Exception as e:
             # Captura qualquer erro que ocorra durante a extração
             raise e
 
-    def _validate_paranagua_data_frame(self, data_frame_list: list):
+    def _is_santos_lineup_table(self, title, columns):
+        """
+        Essa função identifica as tabelas de line-up de Santos pelo cabeçalho.
+
+        Args:
+            title (str): Título da tabela.
+            columns (list): Nome das colunas da tabela.
+        """
+        return "Navio Ship" in columns
+
+    def _is_paranagua_lineup_table(self, title, columns):
         """
-        Essa função garante que apenas os dataframes não nulos e do modelo de dados esperado sejam retornados.
+        Essa função garante que apenas as tabelas do modelo de dados esperado sejam extraídas.
 
         Args:
-            data_frame_list (list): Lista de DataFrames extraídos da página de Paranaguá.
+            title (str): Título da tabela.
+            columns (list): Nome das colunas da tabela, sem a coluna de índice.
+        """
+        return columns[0].upper() == "PROGRAMAÇÃO"
+
+    def _extract_with_result(self, city, today=None):
+        """
+            Extrai os dados de uma cidade, registrando o tempo gasto e o erro em vez de propagá-lo.
+
+            Args:
+                city (str): Nome da cidade.
+                today (str): Data atual. Se informada, a página só é processada se mudou desde a última extração do dia.
+
+            Returns:
+                ExtractionResult: Resultado da extração.
         """
-        valid_data_frames = []
+        start = time.perf_counter()
+        try:
+            if today is None:
+                data = self.extract(city)
+                return ExtractionResult(city, data=data, elapsed=time.perf_counter() - start)
 
-        for data_frame in data_frame_list:
-            if data_frame.empty or len(data_frame) < 2:
+            with stage(f"fetch {city}"):
+                response, validators = self._fetch_if_changed(city, today)
+            if response is None:
+                # Página inalterada: não há conteúdo para processar
+                return ExtractionResult(
+                    city, changed=False, validators=validators, elapsed=time.perf_counter() - start
+                )
+
+            data = self.extract(city, html=response.text)
+            return ExtractionResult(city, data=data, validators=validators, elapsed=time.perf_counter() - start)
+        except Exception as e:
+            return ExtractionResult(city, error=e, elapsed=time.perf_counter() - start)
+
+    def extract_all(self, concurrent=True, today=None, cities=None):
+        """
+            Extrai os dados de todas as cidades, de forma concorrente ou sequencial.
+
+            A falha de uma cidade não interrompe a extração das demais.
+
+            Args:
+                concurrent (bool): Se as cidades devem ser extraídas ao mesmo tempo.
+                today (str): Data atual. Se informada, usa requisições condicionais e ignora páginas inalteradas.
+                cities (list): Cidades extraídas. Se não informado, extrai todas as cidades.
+
+            Returns:
+                dict: ExtractionResult de cada cidade.
+        """
+        cities = [city for city in self.urls if cities is None or city in cities]
+        if not concurrent:
+            return {city: self._extract_with_result(city, today) for city in cities}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {city: executor.submit(self._extract_with_result, city, today) for city in cities}
+            return {city: future.result() for city, future in futures.items()}
+
+    def _saved_bronze_tables(self, today_directory):
+        """
+            Lista as tabelas já salvas na pasta bronze do dia, inclusive nas subpastas.
+
+            Returns:
+                set: Nomes das tabelas (caminho relativo à pasta do dia, sem extensão).
+        """
+        extensions = tuple(storage.extension for storage in STORAGE_FORMATS.values())
+        tables = set()
+        for folder, subfolders, _ in os.walk(today_directory):
+            # Tabelas salvas em pastas (ex.: formato NumPy) não são percorridas
+            subfolders[:] = [subfolder for subfolder in subfolders if not subfolder.endswith(extensions)]
+            tables.update(os.path.relpath(stem, today_directory) for stem in list_tables(folder))
+        return tables
+
+    def _save_bronze_data(self, city, data, today):
+        """
+            Salva as tabelas extraídas de uma cidade na pasta bronze do dia, no formato de armazenamento
+            configurado (self.storage). Com o TableHandoff, as tabelas são gravadas em segundo plano e
+            mantidas em memória para a camada silver.
+
+            As tabelas salvas antes no mesmo dia, em qualquer formato, que não estão mais na página são
+            removidas, para que a camada silver não continue lendo tabelas que saíram da página.
+
+            Args:
+                city (str): Nome da cidade.
+                data (dict): DataFrames extraídos, indexados pelo título da tabela.
+                today (datetime.date): Data da extração.
+        """
+        # Cria a pasta do dia (data/bronze/<cidade>/<data>) se ela não existir
+        today_directory = os.path.join(self.bronze_path, city, str(today))
+        os.makedirs(today_directory, exist_ok=True)
+
+        # Remove as tabelas de uma extração anterior do dia que não vieram na página atual
+        current_tables = {os.path.normpath(bronze_table_name(title)) for title in data}
+        for table in sorted(self._saved_bronze_tables(today_directory) - current_tables):
+            remove_table(os.path.join(today_directory, table))
+            logging.info(f"Tabela {city}/{table} removida da pasta bronze de {today}: não está mais na página.")
+
+        # Salva cada tabela no formato de armazenamento configurado (ou na gravação em segundo plano, com o TableHandoff)
+        for title, df in data.items():
+            # Nome do arquivo: título da tabela com underscores no lugar dos espaços
+            filename = bronze_table_name(title)
+
+            # Caminho completo da tabela, sem a extensão do formato
+            file_path = f"{today_directory}/{filename}"
+
+            # Cria a pasta do arquivo se ela não existir
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+            # Salva o DataFrame no formato configurado
+            with stage(f"write {city}/{filename}", rows_in=len(df)):
+                if self.handoff is not None:
+                    self.handoff.write(self.storage, df, file_path)
+                else:
+                    self.storage.write(df, file_path)
+
+    def _update_vessel_store(self, city, data, today):
+        """
+            Registra as tabelas extraídas de uma cidade no armazenamento de escalas. Uma falha é registrada
+            no log sem interromper a extração, pois as tabelas do dia já foram salvas na pasta bronze.
+
+            Args:
+                city (str): Nome da cidade.
+                data (dict): DataFrames extraídos, indexados pelo título da tabela.
+                today (datetime.date): Data da extração.
+        """
+        try:
+            self.vessel_store.upsert(city, str(today), {bronze_table_name(title): df for title, df in data.items()})
+        except Exception as e:
+            logging.error(f"Erro ao atualizar o armazenamento de escalas de {city}: {e}")
+
+    def replay_archive(self, archive, start_date=None, end_date=None, cities=None, max_workers=None):
+        """
+            Converte novamente as páginas do arquivo de páginas em tabelas bronze, sem acessar a internet.
+
+            Para cada cidade e data do intervalo, a última página capturada na data (a que deu origem às
+            tabelas bronze do dia) é convertida por _extract_santos ou _extract_paranagua e salva na pasta
+            bronze da data. As páginas são convertidas em paralelo, uma por processo. O armazenamento de
+            escalas não é atualizado.
+
+            Args:
+                archive (PageArchive): Arquivo de páginas.
+                start_date (str): Primeira data (AAAA-MM-DD). Se não informada, começa na primeira data guardada.
+                end_date (str): Última data (AAAA-MM-DD). Se não informada, vai até a última data guardada.
+                cities (list): Cidades convertidas. Se não informado, converte todas as cidades do arquivo.
+                max_workers (int): Quantidade máxima de processos simultâneos. Se não informado, usa a quantidade de CPUs.
+
+            Returns:
+                dict: Mensagem de erro das páginas que falharam, indexada por (cidade, data).
+        """
+        pages = []
+        for city in archive.cities():
+            if cities is not None and city not in cities:
                 continue
-            # Verifica a estrutura ou condição específica
-            if data_frame.columns[0][1].upper() == "PROGRAMAÇÃO":
-                valid_data_frames.append(data_frame)
+            for date in archive.dates(city):
+                if (start_date is None or date >= start_date) and (end_date is None or date <= end_date):
+                    captures = archive.captures(city, date)
+                    if captures:
+                        pages.append((city, date, captures[-1]))
+
+        failures = {}
+        max_workers = max_workers or os.cpu_count() or 1
+        tasks = [(type(self), archive.path, self.bronze_path, self.storage.name, *page) for page in pages]
+        start = time.perf_counter()
 
-        return valid_data_frames
+        def record(result, completed):
+            city, date, rows, elapsed, error = result
+            if error is not None:
+                failures[(city, date)] = error
+                logging.error(f"Erro ao converter a página de {city} em {date}: {error}")
+            rate = completed / (time.perf_counter() - start)
+            logging.info(f"Páginas: {completed}/{len(tasks)} ({city} em {date}: {rows} linhas em {elapsed:.2f}s, "
+                         f"{rate:.2f} páginas/s).")
 
+        if max_workers == 1:
+            for completed, task in enumerate(tasks, start=1):
+                record(_replay_capture(*task), completed)
+            return failures
 
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            running = {executor.submit(_replay_capture, *task) for task in tasks}
+            completed = 0
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    completed += 1
+                    record(future.result(), completed)
+        return failures
 
-    def execute_bronze_process(self):
+    def execute_bronze_process(self, concurrent=True, force=False, cities=None):
         """
             Função responsável por executar o processo de extração de dados das cidades de Santos e Paranaguá, \
-            salvando os resultados em arquivos CSV, contendo a data e o tipo da planilha no diretório de saída (data/bronze).
+            salvando os resultados em arquivos (CSV ou formato colunar), contendo a data e o tipo da planilha no diretório de saída (data/bronze).
+
+            As cidades extraídas com sucesso são salvas mesmo que outra cidade falhe. Páginas que não mudaram
+            desde a última extração do dia não são processadas nem salvas novamente (ExtractionResult.changed).
+            Os validadores das páginas novas só são salvos em commit_state, depois das etapas seguintes.
+
+            Args:
+                concurrent (bool): Se as cidades devem ser extraídas ao mesmo tempo.
+                force (bool): Se deve processar e salvar as páginas mesmo que não tenham mudado.
+                cities (list): Cidades extraídas (ex.: apenas as que estão no horário de atualização). Se não informado, extrai todas.
+
+            Returns:
+                dict: ExtractionResult de cada cidade.
+
+            Raises:
+                RuntimeError: Se a extração falhar em todas as cidades.
         """
         try:
             # Pega o dia atual
@@ -135,42 +557,35 @@ class DataExtractor:
             if not os.path.exists("../../data"):
                 os.makedirs("../../data")
 
-            for city in self.urls:
-                data = self.extract(city)
-                
-                # Cria a pasta data/bronze se ela não existir
-                if not os.path.exists("../../data/bronze"):
-                    os.makedirs("../../data/bronze")
-                
-                # Cria as pastas data/bronze/santos e data/bronze/paranagua
-                if not os.path.exists(f"../../data/bronze/{city}"):
-                    os.makedirs(f"../../data/bronze/{city}")
-
-                # Cria a pasta para o dia atual se ela não existir
-                today_directory = f"../../data/bronze/{city}/{today}"
-                if not os.path.exists(today_directory):
-                    os.makedirs(today_directory)
-                    
-                # Salva os dados em arquivos CSV
-                for i, df in enumerate(data):
-                    # Nome do arquivo: substitui espaços por underscores e remove acentos
-                    filename = df.columns[0][0].replace(" ", "_").lower()
-                    
-                    # Configura para pegar apenas o segundo nível do MultiIndex (O primeiro é o titulo da coluna)
-                    df.columns = df.columns.get_level_values(1)
-                    df.reset_index(drop=True, inplace=True)
-
-                    # Caminho completo para o arquivo CSV
-                    file_path = f"{today_directory}/{filename}.csv"
-
-                    # Cria a pasta do arquivo CSV se ela não existir
-                    if not os.path.exists(os.path.dirname(file_path)):
-                        os.makedirs(os.path.dirname(file_path))
-
-                    # Salva o DataFrame no arquivo CSV
-                    df.to_csv(file_path, index=False)
+            saved_state = dict(self._load_state())
+            if force:
+                # Sem validadores, todas as páginas são baixadas e processadas por completo
+                self.state = {}
+
+            results = self.extract_all(concurrent=concurrent, today=str(today), cities=cities)
+            for city, result in results.items():
+                if not result.ok:
+                    logging.error(f"Erro na extração de {city}: {result.error}")
+                    continue
+                if not result.changed:
+                    logging.info(f"Página de {city} inalterada desde a última extração.")
+                    continue
+
+                self._save_bronze_data(city, result.data, today)
+                if self.vessel_store is not None:
+                    with stage(f"vessel store {city}"):
+                        self._update_vessel_store(city, result.data, today)
+                # Os validadores só são registrados depois que os arquivos do dia foram salvos
+                saved_state[city] = result.validators
+                logging.info(f"Extração de {city} concluída em {result.elapsed:.2f}s.")
+
+            # Os validadores ficam pendentes até commit_state, chamado depois das camadas silver e gold
+            self.state = saved_state
+
+            if not any(result.ok for result in results.values()):
+                raise RuntimeError("A extração falhou em todas as cidades.")
 
+            return results
         except Exception as e:
             # Em caso de erro, a exceção é capturada e re-levantada
             raise e
-        
\ No newline at end of file
@@ -0,0 +1,158 @@
+import logging
+import re
+import pandas as pd
+from lxml import etree
+
+# Mesma normalização de espaços usada por pd.read_html nas células
+WHITESPACE_PATTERN = re.compile(r"[\r\n\t\xa0]+")
+
+
+def _cell_text(cell):
+    return WHITESPACE_PATTERN.sub(" ", "".join(cell.itertext())).strip()
+
+
+def _expand_row(cells):
+    """
+        Lê o texto das células de uma linha, repetindo o valor das células com colspan.
+
+        Args:
+            cells (list): Elementos td/th da linha.
+    """
+    values = []
+    for cell in cells:
+        text = _cell_text(cell)
+        span = cell.get("colspan")
+        if span is None:
+            values.append(text)
+            continue
+        try:
+            span = max(int(span), 1)
+        except ValueError:
+            span = 1
+        values.extend([text] * span)
+    return values
+
+
+def _header_rows(table):
+    """
+        Retorna as linhas de cabeçalho de uma tabela: as linhas do thead ou, sem thead,
+        as primeiras linhas compostas apenas por células th.
+    """
+    rows = table.xpath("./thead/tr")
+    if rows:
+        return rows
+
+    rows = []
+    for row in table.xpath("./tr|./tbody/tr"):
+        cells = row.xpath("./td|./th")
+        if not cells or any(cell.tag != "th" for cell in cells):
+            break
+        rows.append(row)
+    return rows
+
+
+def read_table_header(table):
+    """
+        Lê o cabeçalho de dois níveis de uma tabela: o título (primeira linha) e o nome das colunas (última linha).
+
+        Colunas sem nome recebem o mesmo nome gerado por pd.read_html ("Unnamed: <posição>_level_1").
+
+        Args:
+            table (lxml.etree._Element): Elemento table.
+
+        Returns:
+            tuple: Título da tabela e lista com o nome das colunas.
+    """
+    rows = _header_rows(table)
+    if not rows:
+        return "", []
+
+    names = _expand_row(rows[-1].xpath("./td|./th"))
+    title = _cell_text(rows[0].xpath("./td|./th")[0]) if len(rows) > 1 else ""
+    names = [name or f"Unnamed: {position}_level_1" for position, name in enumerate(names)]
+    return title, names
+
+
+def _infer_column(values):
+    """
+        Converte uma coluna de textos para número quando todos os valores preenchidos são numéricos,
+        como faz o pd.read_html.
+    """
+    column = pd.Series(values, dtype=object).replace("", None)
+    try:
+        return pd.to_numeric(column)
+    except (ValueError, TypeError):
+        return column
+
+
+def _table_to_frame(table, names, skip_columns):
+    """
+        Converte o corpo de uma tabela selecionada em um DataFrame, coluna a coluna.
+
+        Args:
+            table (lxml.etree._Element): Elemento table.
+            names (list): Nome das colunas.
+            skip_columns (int): Quantidade de colunas iniciais descartadas (ex.: coluna de índice).
+    """
+    header = set(_header_rows(table))
+    columns = [[] for _ in names]
+
+    for row in table.xpath("./tbody/tr|./tr"):
+        if row in header:
+            continue
+        values = _expand_row([cell for cell in row if cell.tag in ("td", "th")])
+        if not values:
+            continue
+        # Linhas menores que o cabeçalho são completadas com vazio, como no pd.read_html
+        values = (values + [""] * len(names))[:len(names)]
+        for position, value in enumerate(values):
+            columns[position].append(value)
+
+    data = {name: _infer_column(values) for name, values in zip(names[skip_columns:], columns[skip_columns:])}
+    return pd.DataFrame(data, columns=names[skip_columns:])
+
+
+def extract_tables(page, predicate=None, skip_columns=0, min_rows=0):
+    """
+        Extrai as tabelas desejadas de uma página HTML utilizando o lxml.
+
+        O cabeçalho de cada tabela é lido primeiro, e apenas as tabelas aceitas pelo predicado
+        têm as células convertidas em colunas, evitando montar DataFrames que seriam descartados.
+
+        Args:
+            page (str): Conteúdo HTML da página.
+            predicate (Callable): Função que recebe o título e o nome das colunas (já sem as colunas ignoradas)
+                e indica se a tabela deve ser extraída. Sem predicado, todas as tabelas são extraídas.
+            skip_columns (int): Quantidade de colunas iniciais descartadas (ex.: coluna de índice).
+            min_rows (int): Quantidade mínima de linhas para a tabela ser mantida.
+
+        Returns:
+            dict: DataFrames com o nome das colunas (segundo nível do cabeçalho), indexados pelo título da tabela.
+                Títulos repetidos recebem um número ("Título 2", "Título 3"), e tabelas sem título são
+                indexadas pela posição na página ("tabela 4").
+    """
+    document = etree.fromstring(page, etree.HTMLParser())
+    tables = {}
+
+    for position, table in enumerate(document.iter("table"), start=1):
+        title, names = read_table_header(table)
+        if len(names) <= skip_columns:
+            continue
+        if predicate is not None and not predicate(title, names[skip_columns:]):
+            continue
+
+        df = _table_to_frame(table, names, skip_columns)
+        if len(df) < min_rows:
+            continue
+        name = title
+        if not title:
+            name = f"tabela {position}"
+            logging.warning(f"Tabela sem título na posição {position} da página, salva como '{name}'.")
+        # Tabelas com o mesmo título não substituem as anteriores
+        key, count = name, 2
+        while key in tables:
+            key = f"{name} {count}"
+            count += 1
+        tables[key] = df
+
+    return tables
@@ -0,0 +1,291 @@
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Execução ativa; as etapas abertas sem uma execução ativa não são medidas
+_active_run = None
+
+
+@dataclass
+class StageMetrics:
+    """
+        Medidas de uma etapa da execução do ETL.
+
+        Args:
+            name (str): Nome da etapa (ex.: "fetch santos").
+            wall_time (float): Tempo decorrido, em segundos.
+            cpu_time (float): Tempo de CPU do processo durante a etapa, em segundos.
+            rows_in (int): Linhas recebidas pela etapa, quando informado.
+            rows_out (int): Linhas produzidas pela etapa, quando informado.
+            peak_memory (int): Pico de memória alocada pelo Python durante a etapa, em bytes, acima da memória já em uso no início.
+            error (str): Erro que interrompeu a etapa, se houver.
+            stages (list): Subetapas, na ordem em que terminaram.
+    """
+    name: str
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    peak_memory: int = 0
+    error: Optional[str] = None
+    stages: list = field(default_factory=list)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "wall_time": round(self.wall_time, 6),
+            "cpu_time": round(self.cpu_time, 6),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "peak_memory_mb": round(self.peak_memory / 1e6, 3),
+            "error": self.error,
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+
+class _Stage:
+    """
+        Etapa em andamento: mede o tempo, a CPU e a memória entre a entrada e a saída do bloco with.
+    """
+    def __init__(self, run, name, rows_in):
+        self.run = run
+        self.metrics = StageMetrics(name, rows_in=rows_in)
+        self.parent = None
+        self.profile = None
+
+    @property
+    def rows_out(self):
+        return self.metrics.rows_out
+
+    @rows_out.setter
+    def rows_out(self, value):
+        self.metrics.rows_out = value
+
+    def __enter__(self):
+        self.parent = self.run._enter(self)
+        self._memory_start = tracemalloc.get_traced_memory()[0] if self.run.track_memory else 0
+        self._peak = self._memory_start
+        if self.run.track_memory:
+            # O pico da etapa mãe até aqui é guardado antes de reiniciar o pico para a subetapa
+            if self.parent is not None:
+                self.parent._peak = max(self.parent._peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        if self.run.profile and self.parent is self.run.root and self.run._stack() is self.run._main_stack:
+            # Apenas as etapas principais da thread principal, pois só um perfil pode estar ativo por vez
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+            self.run._profiled.append(self)
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.wall_time = time.perf_counter() - self._wall_start
+        self.metrics.cpu_time = time.process_time() - self._cpu_start
+        if self.profile is not None:
+            self.profile.disable()
+        if self.run.track_memory:
+            self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            self.metrics.peak_memory = max(self._peak - self._memory_start, 0)
+            if self.parent is not None:
+                self.parent._peak = max(self.parent._peak, self._peak)
+        if exc is not None:
+            self.metrics.error = f"{exc_type.__name__}: {exc}"
+        self.run._exit(self)
+        return False
+
+
+class _NullStage:
+    """
+        Etapa sem medição, usada quando não há uma execução ativa.
+    """
+    rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def stage(name, rows_in=None):
+    """
+        Abre uma etapa da execução ativa. Sem uma execução ativa, a etapa não é medida.
+
+        Exemplo:
+            with stage("join", rows_in=len(df)) as step:
+                df = join(df)
+                step.rows_out = len(df)
+
+        Args:
+            name (str): Nome da etapa.
+            rows_in (int): Linhas recebidas pela etapa.
+
+        Returns:
+            Gerenciador de contexto da etapa, com o atributo rows_out.
+    """
+    run = _active_run
+    if run is None:
+        return _NullStage()
+    return _Stage(run, name, rows_in)
+
+
+def measure(name, function, df, *args, **kwargs):
+    """
+        Executa uma função que recebe e retorna um DataFrame como uma etapa, registrando as linhas de entrada e saída.
+
+        Args:
+            name (str): Nome da etapa.
+            function (callable): Função executada como function(df, *args, **kwargs).
+            df (pd.DataFrame): DataFrame de entrada.
+
+        Returns:
+            Resultado da função.
+    """
+    with stage(name, rows_in=len(df)) as step:
+        result = function(df, *args, **kwargs)
+        step.rows_out = len(result) if result is not None else None
+    return result
+
+
+class RunInstrumentation:
+    def __init__(self, name="etl", report_path="../../data/state/runs/", track_memory=True, profile=False):
+        """
+        Inicializa a instrumentação de uma execução do ETL.
+
+        Dentro do bloco with, as etapas abertas com stage() registram tempo decorrido, tempo de CPU,
+        linhas de entrada e saída e pico de memória (tracemalloc). Ao final, um relatório JSON com a
+        árvore de etapas é salvo em report_path, mesmo que a execução termine com erro.
+
+        As etapas abertas em outras threads (ex.: extração concorrente) são registradas na etapa aberta
+        na thread principal. Como o tracemalloc mede o processo inteiro, o pico de memória de etapas
+        concorrentes inclui a memória das demais.
+
+        Args:
+            name (str): Nome da execução, usado no nome do relatório.
+            report_path (str): Pasta onde os relatórios são salvos. Se None, o relatório não é salvo.
+            track_memory (bool): Se deve medir o pico de memória (o tracemalloc deixa a execução mais lenta).
+            profile (bool): Se deve executar as etapas principais com o cProfile e salvar o perfil da mais lenta.
+        """
+        self.name = name
+        self.report_path = report_path
+        self.track_memory = track_memory
+        self.profile = profile
+        self.root = None
+        self.report = None
+        self._local = threading.local()
+        self._main_stack = []
+        self._profiled = []
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            # Threads auxiliares começam na etapa aberta na thread principal
+            self._local.stack = []
+        return self._local.stack
+
+    def _enter(self, current):
+        stack = self._stack()
+        if current is self.root:
+            parent = None
+        else:
+            parent = stack[-1] if stack else self._main_thread_stage()
+        stack.append(current)
+        return parent
+
+    def _exit(self, current):
+        stack = self._stack()
+        if stack and stack[-1] is current:
+            stack.pop()
+        if current.parent is not None:
+            with self._lock:
+                current.parent.metrics.stages.append(current.metrics)
+
+    def _main_thread_stage(self):
+        return self._main_stack[-1] if self._main_stack else self.root
+
+    def __enter__(self):
+        global _active_run
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._start_time = time.time()
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._start_time))
+        self.root = _Stage(self, self.name, None)
+        self._main_stack = self._stack()
+        self._profiled = []
+        self.root.__enter__()
+        _active_run = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active_run
+        _active_run = None
+        self.root.__exit__(exc_type, exc, tb)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        self.report = {
+            "name": self.name,
+            "started_at": self.started_at,
+            "status": "error" if exc is not None else "ok",
+            "traceback": "".join(traceback.format_exception(exc_type, exc, tb)) if exc is not None else None,
+            **self.root.metrics.to_dict(),
+        }
+        if self.report_path is not None:
+            self.save_report()
+        self.log_summary()
+        return False
+
+    def slowest_stage(self):
+        """
+            Retorna a etapa principal (primeiro nível) mais lenta da execução.
+        """
+        return max(self.root.metrics.stages, key=lambda metrics: metrics.wall_time, default=None)
+
+    def save_report(self):
+        """
+            Salva o relatório da execução e, no modo de perfil, o perfil da etapa principal mais lenta.
+
+            Returns:
+                str: Caminho do relatório salvo.
+        """
+        os.makedirs(self.report_path, exist_ok=True)
+        # Microssegundos e pid no nome, para que execuções iniciadas no mesmo segundo não se sobrescrevam
+        microseconds = int(self._start_time * 1_000_000) % 1_000_000
+        run_id = f"{self.started_at.replace(':', '')}.{microseconds:06d}_{os.getpid()}_{self.name}"
+        report_file = os.path.join(self.report_path, f"{run_id}.json")
+
+        slowest = self.slowest_stage()
+        if self.profile and slowest is not None:
+            for current in self._profiled:
+                if current.metrics is slowest:
+                    profile_file = os.path.join(self.report_path, f"{run_id}_{slowest.name.replace(' ', '_')}.prof")
+                    current.profile.dump_stats(profile_file)
+                    self.report["profile"] = profile_file
+
+        with open(report_file, "w", encoding="utf-8") as file:
+            json.dump(self.report, file, ensure_ascii=False, indent=2)
+        self.report_file = report_file
+        return report_file
+
+    def log_summary(self):
+        """
+            Registra no log o tempo, a CPU, as linhas e o pico de memória das etapas principais.
+        """
+        for metrics in self.root.metrics.stages:
+            rows = f", {metrics.rows_out} linhas" if metrics.rows_out is not None else ""
+            memory = f", pico de {metrics.peak_memory / 1e6:.1f} MB" if self.track_memory else ""
+            logging.info(
+                f"Etapa {metrics.name}: {metrics.wall_time:.2f}s (CPU {metrics.cpu_time:.2f}s){rows}{memory}."
+            )
+        logging.info(f"Execução {self.name} concluída em {self.root.metrics.wall_time:.2f}s.")
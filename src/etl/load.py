@@ -1,61 +1,323 @@
 import pandas as pd
 import os
+import logging
+from functools import partial
+from etl.instrumentation import stage
+from etl.parsers import parse_arrival
+from etl.storage import CsvStorage, find_storage, get_storage
+
+# Colunas que identificam cada grupo da camada gold
+AGGREGATE_KEYS = ['local', 'Sentido', 'Mercadoria']
+
+# Janelas móveis (em dias) geradas a partir dos agregados diários
+ROLLING_WINDOWS = {"7d": 7, "30d": 30}
+
+# Períodos das tabelas por data de chegada; as semanas começam na segunda-feira
+ARRIVAL_BUCKETS = {"day": "D", "week": "W-SUN"}
+
+
+def aggregate_day(df):
+    """
+        Calcula os agregados parciais de um dia da camada silver em uma única passada pelo groupby.
+
+        Os agregados (soma, contagem, mínimo e máximo de Peso) podem ser combinados com os de outros
+        dias por merge_aggregates, sem precisar ler a camada silver novamente.
+
+        Args:
+            df (pd.DataFrame): Dados silver de um dia.
+
+        Returns:
+            pd.DataFrame: Agregados por local, Sentido e Mercadoria.
+    """
+    return df.groupby(AGGREGATE_KEYS, observed=True).agg(
+        Peso=('Peso', 'sum'),
+        Total=('Peso', 'size'),
+        Peso_min=('Peso', 'min'),
+        Peso_max=('Peso', 'max'),
+    ).reset_index()
+
+
+def merge_aggregates(frames):
+    """
+        Combina agregados parciais (de dias ou de períodos já combinados) em um único agregado.
+
+        Args:
+            frames (list): DataFrames no formato retornado por aggregate_day.
+
+        Returns:
+            pd.DataFrame: Agregados combinados, ou None se nenhum DataFrame for informado.
+    """
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True).groupby(AGGREGATE_KEYS, observed=True).agg(
+        Peso=('Peso', 'sum'),
+        Total=('Total', 'sum'),
+        Peso_min=('Peso_min', 'min'),
+        Peso_max=('Peso_max', 'max'),
+    ).reset_index()
+
+
+def aggregate_arrivals(df, frequency):
+    """
+        Calcula o peso total e a quantidade de embarcações por local e período de chegada.
+
+        Args:
+            df (pd.DataFrame): Dados silver de um dia.
+            frequency (str): Período do pandas ('D' para dias, 'W-SUN' para semanas de segunda a domingo).
+
+        Returns:
+            pd.DataFrame: Colunas local, Chegada (início do período), Peso e Total, em ordem de local e período.
+    """
+    arrivals = parse_arrival(df['Chegada'])
+    valid = arrivals.notna().to_numpy()
+    buckets = arrivals[valid].dt.to_period(frequency).dt.start_time
+    return df.loc[valid, ['local', 'Peso']].assign(Chegada=buckets).groupby(['local', 'Chegada'], observed=True).agg(
+        Peso=('Peso', 'sum'),
+        Total=('Peso', 'size'),
+    ).reset_index()
+
 
 class DataLoader:
-    def __init__(self, current_date):
+    def __init__(self, current_date, storage=None, export_csv=True, handoff=None, database=None):
+        """
+        Inicializa o DataLoader para a data informada.
+
+        Args:
+            current_date (str): Data dos dados a serem carregados (AAAA-MM-DD).
+            storage (TableStorage): Formato usado para salvar a camada gold. Se não informado, usa o formato padrão.
+            export_csv (bool): Se também deve exportar a camada gold em CSV, para os consumidores que leem o CSV.
+            handoff (TableHandoff): Se informado, a camada silver do dia é recebida em memória e a camada gold é salva em segundo plano.
+            database (SqliteSink): Se informado, as camadas silver e gold do dia também são gravadas no banco SQLite.
+        """
         self.root_path = "../../data/silver/"
+        self.current_date = current_date
         self.arquivo = f"{current_date}.csv"
         self.output_path = "../../data/gold/"
+        self.aggregates_path = "../../data/gold/aggregates/"
+        self.rolling_path = "../../data/gold/rolling/"
+        self.buckets_path = "../../data/gold/buckets/"
+        self.storage = storage or get_storage()
+        self.export_csv = export_csv
+        self.handoff = handoff
+        self.database = database
+
+    def _read_table(self, table_path):
+        """
+            Lê uma tabela mantida em memória pelo TableHandoff ou salva em disco, ou retorna None se ela não existir.
+        """
+        if self.handoff is not None and table_path in self.handoff:
+            return self.handoff.read(table_path)
+        storage = find_storage(table_path)
+        if storage is None:
+            return None
+        return storage.read(table_path)
+
+    def _write_table(self, df, table_path, keep=False):
+        """
+            Salva uma tabela no formato configurado, em segundo plano quando há um TableHandoff.
+        """
+        if self.handoff is not None:
+            self.handoff.write(self.storage, df, table_path, keep=keep)
+        else:
+            self.storage.write(df, table_path)
 
-    def load_data(self):
+    def _read_silver(self, date):
+        """
+            Lê a camada silver de uma data, ou retorna None se ela não existir.
         """
-            Carrega os dados da pasta silver em um DataFrame.
+        return self._read_table(os.path.join(self.root_path, date))
+
+    def load_silver(self):
+        """
+            Carrega os dados da pasta silver da data atual.
 
             Returns:
-                pd.DataFrame: DataFrame com os dados da pasta silver.
+                pd.DataFrame: Dados silver do dia, ou None se a tabela do dia não existir.
         """
         root_path = os.path.join(self.root_path)
         # Verifica se a pasta silver existe
         if not os.path.exists(root_path):
             raise FileNotFoundError(f"Folder {root_path} not found.")
-        else:
-            files = os.listdir(root_path)
-            if self.arquivo in files:
-                file_path = os.path.join(root_path, self.arquivo)
+        return self._read_silver(self.current_date)
+
+    def load_data(self, df=None):
+        """
+            Carrega os dados da pasta silver e calcula os agregados parciais do dia.
 
-                df = pd.read_csv(file_path)
-                df_cleaned = df.dropna(subset=['Chegada'])
+            Apenas as embarcações com data de chegada são agregadas.
 
-                
-                # Agregando os dados por local, 
-                df_agg = df.groupby(['local', 'Sentido', 'Mercadoria'])['Peso'].sum().reset_index()
-                
-                # COntando o número de veiculos que fizeram importação e exportação para tal local e mercadoria
-                df_count = df.groupby(['local', 'Sentido', 'Mercadoria']).size().reset_index(name='Total')
+            Args:
+                df (pd.DataFrame): Dados silver do dia já carregados. Se não informado, lê a pasta silver.
+
+            Returns:
+                pd.DataFrame: Agregados do dia por local, Sentido e Mercadoria.
+        """
+        df = self.load_silver() if df is None else df
+        if df is not None:
+            df_cleaned = df.dropna(subset=['Chegada'])
+            return aggregate_day(df_cleaned)
+
+    def load_aggregates(self, date):
+        """
+            Lê os agregados parciais de uma data. Datas anteriores ao uso dos agregados são
+            calculadas uma única vez a partir da camada silver e salvas.
+
+            Args:
+                date (str): Data dos agregados (AAAA-MM-DD).
+
+            Returns:
+                pd.DataFrame: Agregados do dia, ou None se não houver dados para a data.
+        """
+        df_aggregates = self._read_table(os.path.join(self.aggregates_path, date))
+        if df_aggregates is not None:
+            return df_aggregates
 
-                # Junta os DataFrames
-                df_final = pd.merge(df_agg, df_count, on=['local', 'Sentido', 'Mercadoria'], how='outer')
+        df = self._read_silver(date)
+        if df is None:
+            return None
+        df_aggregates = aggregate_day(df.dropna(subset=['Chegada']))
+        self.save_aggregates(df_aggregates, date)
+        return df_aggregates
+
+    def build_rolling(self, days):
+        """
+            Combina os agregados diários dos últimos dias, incluindo a data atual.
+
+            Args:
+                days (int): Tamanho da janela em dias.
+
+            Returns:
+                pd.DataFrame: Agregados do período, ou None se não houver dados.
+        """
+        dates = pd.date_range(end=self.current_date, periods=days).strftime("%Y-%m-%d")
+        return merge_aggregates(self.load_aggregates(date) for date in dates)
+
+    def build_year_to_date(self, df_day):
+        """
+            Calcula os agregados do início do ano até a data atual.
+
+            Quando o acumulado do dia anterior existe, ele é combinado com os agregados do dia;
+            caso contrário, os agregados diários do ano são combinados.
+
+            Args:
+                df_day (pd.DataFrame): Agregados da data atual.
+
+            Returns:
+                pd.DataFrame: Agregados acumulados no ano, ou None se não houver dados.
+        """
+        current_date = pd.Timestamp(self.current_date)
+        start_of_year = current_date.replace(month=1, day=1)
+        if current_date > start_of_year:
+            previous_date = (current_date - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+            df_previous = self._read_table(os.path.join(self.rolling_path, f"{previous_date}_ytd"))
+            if df_previous is not None:
+                return merge_aggregates([df_previous, df_day])
+
+        dates = pd.date_range(start_of_year, current_date - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        return merge_aggregates([*(self.load_aggregates(date) for date in dates), df_day])
+
+    def _save_table(self, df, directory, name):
+        """
+            Salva uma tabela da camada gold no formato configurado e, opcionalmente, em CSV.
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        # O CSV é exportado primeiro para que a cópia no formato configurado seja a mais recente
+        if self.export_csv and not isinstance(self.storage, CsvStorage):
+            csv_path = os.path.join(directory, f"{name}.csv")
+            if self.handoff is not None:
+                self.handoff.submit(partial(df.to_csv, csv_path, index=False, header=True))
+            else:
+                df.to_csv(csv_path, index=False, header=True)
+        self._write_table(df, os.path.join(directory, name))
+
+    def save_aggregates(self, df, date):
+        """
+            Salva os agregados parciais de uma data.
+
+            Args:
+                df (pd.DataFrame): Agregados do dia.
+                date (str): Data dos agregados (AAAA-MM-DD).
+        """
+        os.makedirs(self.aggregates_path, exist_ok=True)
+        # Os agregados do dia são lidos novamente pelas janelas móveis
+        self._write_table(df, os.path.join(self.aggregates_path, date), keep=True)
 
-                return df_final
-            
     def save_transformed_data(self, df):
         """
-            Salva os dados transformados em um arquivo CSV na pasta gold.
+            Salva os dados transformados na pasta gold, no formato configurado e, opcionalmente, em CSV.
 
             Args:
                 df (pd.DataFrame): DataFrame a ser salvo.
         """
-        if not os.path.exists(self.output_path):
-            os.makedirs(self.output_path)
-        
-        df.to_csv(os.path.join(self.output_path, self.arquivo), index=False, header=True)
-    
-    def execute_gold_process(self):
+        self._save_table(df, self.output_path, self.current_date)
+
+    def save_rolling_data(self, df_day):
+        """
+            Gera e salva as tabelas gold das janelas móveis e do acumulado no ano.
+
+            Args:
+                df_day (pd.DataFrame): Agregados da data atual, já salvos.
+        """
+        tables = {name: self.build_rolling(days) for name, days in ROLLING_WINDOWS.items()}
+        tables["ytd"] = self.build_year_to_date(df_day)
+        for name, df in tables.items():
+            if df is not None:
+                self._save_table(df, self.rolling_path, f"{self.current_date}_{name}")
+
+    def save_arrival_buckets(self, df):
+        """
+            Gera e salva as tabelas gold por dia e por semana de chegada (peso total e quantidade de
+            embarcações por local), usadas no planejamento da capacidade dos portos.
+
+            Args:
+                df (pd.DataFrame): Dados silver da data atual.
+        """
+        for name, frequency in ARRIVAL_BUCKETS.items():
+            self._save_table(aggregate_arrivals(df, frequency), self.buckets_path, f"{self.current_date}_{name}")
+
+    def save_database(self, df_silver, df_gold):
+        """
+            Grava as camadas silver e gold do dia no banco SQLite, substituindo a gravação anterior da mesma data.
+
+            Args:
+                df_silver (pd.DataFrame): Dados silver da data atual.
+                df_gold (pd.DataFrame): Tabela gold da data atual.
+        """
+        self.database.write_silver(self.current_date, df_silver)
+        self.database.write_gold(self.current_date, df_gold)
+
+    def execute_gold_process(self, rolling=True):
         """
             Realiza todas as transformações nos dados e os salva no diretório final.
 
-            1. Combina os dados da pasta bronze em um único DataFrame e adiciona o local de origem.
+            1. Calcula os agregados parciais do dia a partir da camada silver e os salva.
+            2. Salva a tabela gold do dia (peso total e quantidade de embarcações).
+            3. Salva as tabelas por dia e por semana de chegada.
+            4. Grava as camadas silver e gold do dia no banco SQLite, se configurado.
+            5. Combina os agregados diários nas tabelas dos últimos 7 e 30 dias e do acumulado no ano.
+
+            Args:
+                rolling (bool): Se deve gerar as tabelas do passo 5. O backfill as gera depois, em ordem de data.
         """
-        df = self.load_data()
-        self.save_transformed_data(df)
+        with stage("aggregate") as step:
+            df_silver = self.load_silver()
+            df_day = self.load_data(df_silver)
+            step.rows_out = len(df_day) if df_day is not None else None
+        if df_day is None:
+            logging.warning(f"Camada silver de {self.current_date} não encontrada, camada gold não será gerada.")
+            return
 
+        df_gold = df_day[AGGREGATE_KEYS + ['Peso', 'Total']]
+        with stage("save", rows_in=len(df_day)):
+            self.save_aggregates(df_day, self.current_date)
+            self.save_transformed_data(df_gold)
+        with stage("buckets", rows_in=len(df_silver)):
+            self.save_arrival_buckets(df_silver)
+        if self.database is not None:
+            with stage("database", rows_in=len(df_silver)):
+                self.save_database(df_silver, df_gold)
+        if rolling:
+            with stage("rolling"):
+                self.save_rolling_data(df_day)
@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import socket
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class LockBusyError(RuntimeError):
+    """
+        Outra execução do ETL já está em andamento.
+    """
+
+
+def _process_alive(pid):
+    """
+        Verifica se um processo local ainda existe. No Windows, sem essa verificação, o bloqueio
+        só é considerado abandonado pela idade.
+    """
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class RunLock:
+    def __init__(self, path="../../data/state/etl.lock", max_age=6 * 60 * 60):
+        """
+        Inicializa o arquivo de bloqueio que impede execuções simultâneas do ETL.
+
+        O arquivo é criado de forma exclusiva e guarda o processo, a máquina e o horário da execução.
+        Um bloqueio deixado por um processo que não existe mais, ou mais antigo que max_age, é
+        considerado abandonado e removido. A verificação e a remoção são feitas com um segundo
+        arquivo (<path>.guard) travado por fcntl.flock, para que dois processos não considerem o
+        mesmo bloqueio abandonado e removam um o bloqueio do outro. Sem fcntl (Windows), o bloqueio
+        só é removido se ainda for o mesmo lido na verificação.
+
+        Args:
+            path (str): Caminho do arquivo de bloqueio.
+            max_age (float): Idade, em segundos, a partir da qual o bloqueio é considerado abandonado.
+        """
+        self.path = path
+        self.max_age = max_age
+        self.acquired = False
+
+    def _read_owner(self):
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    @contextmanager
+    def _guard(self):
+        """
+            Impede que outro processo verifique, remova ou crie o bloqueio ao mesmo tempo.
+        """
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.guard", "a") as guard:
+            fcntl.flock(guard, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(guard, fcntl.LOCK_UN)
+
+    def _remove_stale(self, owner):
+        """
+            Remove o bloqueio abandonado, se ele ainda for o mesmo lido na verificação (processo e horário).
+        """
+        current = self._read_owner()
+        if current != owner:
+            return
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _is_stale(self, owner):
+        if owner is None:
+            # Arquivo vazio ou incompleto: considera a idade do próprio arquivo
+            try:
+                return time.time() - os.path.getmtime(self.path) > self.max_age
+            except OSError:
+                return True
+        if time.time() - owner.get("created_at", 0) > self.max_age:
+            return True
+        return owner.get("host") == socket.gethostname() and not _process_alive(owner.get("pid", -1))
+
+    def acquire(self):
+        """
+            Cria o arquivo de bloqueio.
+
+            Raises:
+                LockBusyError: Se outra execução estiver com o bloqueio.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        owner = {"pid": os.getpid(), "host": socket.gethostname(), "created_at": time.time()}
+        with self._guard():
+            for _ in range(2):
+                try:
+                    descriptor = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                except FileExistsError:
+                    current = self._read_owner()
+                    if not self._is_stale(current):
+                        raise LockBusyError(f"Outra execução do ETL está em andamento ({current}).")
+                    logging.warning(f"Removendo bloqueio abandonado: {current}.")
+                    self._remove_stale(current)
+                    continue
+                with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                    json.dump(owner, file)
+                self.acquired = True
+                return self
+        raise LockBusyError(f"Não foi possível criar o bloqueio {self.path}.")
+
+    def release(self):
+        """
+            Remove o arquivo de bloqueio, se ele ainda pertencer a este processo.
+        """
+        if not self.acquired:
+            return
+        with self._guard():
+            owner = self._read_owner()
+            if owner is not None and owner.get("pid") == os.getpid():
+                os.remove(self.path)
+        self.acquired = False
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
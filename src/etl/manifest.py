@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+
+
+def _table_files(path):
+    """
+        Lista os arquivos que compõem uma tabela: o próprio arquivo ou, nos formatos
+        salvos em pasta, todos os arquivos da pasta.
+    """
+    if os.path.isfile(path):
+        return [path]
+    return sorted(
+        os.path.join(directory, file)
+        for directory, _, files in os.walk(path)
+        for file in files
+    )
+
+
+def file_stats(path):
+    """
+        Retorna o tamanho total (bytes) e a data de modificação mais recente de uma tabela.
+
+        Args:
+            path (str): Caminho do arquivo ou da pasta da tabela.
+    """
+    files = _table_files(path)
+    return (
+        sum(os.path.getsize(file) for file in files),
+        max((os.path.getmtime(file) for file in files), default=0.0)
+    )
+
+
+def content_hash(path):
+    """
+        Calcula o hash SHA-256 do conteúdo de uma tabela.
+
+        Args:
+            path (str): Caminho do arquivo ou da pasta da tabela.
+    """
+    digest = hashlib.sha256()
+    for file in _table_files(path):
+        digest.update(os.path.relpath(file, path).encode("utf-8"))
+        with open(file, "rb") as handle:
+            for block in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def encoded_hash(files):
+    """
+        Calcula o hash de uma tabela ainda em memória, igual ao de content_hash após a gravação.
+
+        Args:
+            files (dict): Conteúdo de cada arquivo, como retornado por TableStorage.encode.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(name.encode("utf-8"))
+        digest.update(files[name])
+    return digest.hexdigest()
+
+
+class BronzeManifest:
+    def __init__(self, path):
+        """
+        Inicializa o manifesto dos arquivos bronze já processados pela camada silver.
+
+        Para cada arquivo o manifesto guarda o caminho, o tamanho, a data de modificação
+        e o hash do conteúdo.
+
+        Args:
+            path (str): Caminho do arquivo JSON do manifesto.
+        """
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.entries = json.load(file)
+
+    def is_unchanged(self, path):
+        """
+            Verifica se um arquivo bronze continua igual ao registrado no manifesto.
+
+            O tamanho e a data de modificação são comparados primeiro; o hash só é calculado
+            quando eles mudaram, para identificar arquivos regravados com o mesmo conteúdo.
+
+            Args:
+                path (str): Caminho do arquivo (ou pasta) da tabela bronze.
+
+            Returns:
+                bool: True se o arquivo não mudou desde o último registro.
+        """
+        entry = self.entries.get(path)
+        if entry is None:
+            return False
+
+        size, mtime = file_stats(path)
+        if entry["size"] == size and entry["mtime"] == mtime:
+            return True
+
+        if entry["size"] == size and entry["hash"] == content_hash(path):
+            # Mesmo conteúdo com outra data de modificação: atualiza o registro
+            entry["mtime"] = mtime
+            return True
+        return False
+
+    def is_unchanged_encoded(self, path, files):
+        """
+            Verifica se uma tabela bronze ainda em memória tem o mesmo conteúdo registrado no manifesto.
+
+            Args:
+                path (str): Caminho do arquivo (ou pasta) da tabela bronze.
+                files (dict): Conteúdo que será gravado na tabela, como retornado por TableStorage.encode.
+
+            Returns:
+                bool: True se o conteúdo não mudou desde o último registro.
+        """
+        entry = self.entries.get(path)
+        if entry is None:
+            return False
+        return entry["size"] == sum(len(content) for content in files.values()) and entry["hash"] == encoded_hash(files)
+
+    def register(self, path):
+        """
+            Registra o estado atual de um arquivo bronze no manifesto.
+
+            Args:
+                path (str): Caminho do arquivo (ou pasta) da tabela bronze.
+        """
+        size, mtime = file_stats(path)
+        self.entries[path] = {"size": size, "mtime": mtime, "hash": content_hash(path)}
+
+    def forget_missing(self, prefix, seen):
+        """
+            Remove do manifesto os arquivos de uma pasta que não existem mais.
+
+            Args:
+                prefix (str): Pasta cujos registros são verificados.
+                seen (set): Arquivos encontrados na execução atual.
+
+            Returns:
+                list: Arquivos removidos do manifesto.
+        """
+        missing = [path for path in self.entries if path.startswith(prefix) and path not in seen]
+        for path in missing:
+            del self.entries[path]
+        return missing
+
+    def save(self):
+        """
+            Salva o manifesto, substituindo o arquivo de forma atômica.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file, indent=2)
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+from typing import NamedTuple
+
+# Unidade de peso informada ao final dos valores de Paranaguá (ex.: "68.000,000 Tons.")
+TONNAGE_UNIT_PATTERN = r'\s*Tons?\.?\s*$'
+
+
+class TonnageParseResult(NamedTuple):
+    """
+        Resultado da conversão de uma coluna de tonelagem.
+
+        Args:
+            values (pd.Series): Valores convertidos para float (nulos quando não foi possível converter).
+            unparsed (int): Quantidade de células preenchidas que não puderam ser convertidas.
+    """
+    values: pd.Series
+    unparsed: int
+
+
+def _decimal_is_comma(text, decimal):
+    """
+        Indica, para cada célula, se a vírgula é o separador decimal.
+
+        Args:
+            text (pd.Series): Valores em texto, já sem a unidade.
+            decimal (str | None): ',' (pt-BR), '.' (en-US) ou None para detectar pelo último separador presente na célula.
+    """
+    if decimal is not None:
+        return np.full(len(text), decimal == ',')
+
+    # Quando há os dois separadores, o último é o decimal; uma vírgula isolada é tratada como decimal (pt-BR)
+    return text.str.contains(r',[^.]*$', regex=True).to_numpy()
+
+
+def _parse_distinct_values(uniques, decimal):
+    """
+        Converte valores distintos de peso para float.
+
+        Args:
+            uniques (pd.Series): Valores distintos da coluna (texto ou números).
+            decimal (str | None): Separador decimal, ou None para detecção automática.
+
+        Returns:
+            np.ndarray: Valores convertidos, com NaN nos que não puderam ser convertidos.
+    """
+    # Os valores distintos são poucos, então a separação entre textos e números pode ser feita um a um
+    is_text = pd.Series([isinstance(value, str) for value in uniques], index=uniques.index, dtype=bool)
+    result = pd.to_numeric(uniques.where(~is_text), errors='coerce').astype(float)
+
+    text = uniques[is_text].astype(str).str.replace(TONNAGE_UNIT_PATTERN, '', regex=True).str.strip()
+    comma_decimal = _decimal_is_comma(text, decimal)
+
+    # Normaliza os dois padrões para o formato aceito por pd.to_numeric
+    pt_br = text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    en_us = text.str.replace(',', '', regex=False)
+    normalized = pt_br.where(comma_decimal, en_us)
+
+    single = ~normalized.str.contains(' ', regex=False)
+    result.loc[single[single].index] = pd.to_numeric(normalized[single], errors='coerce')
+
+    # Células com vários valores são divididas em colunas e convertidas para a média
+    multiple = normalized[~single]
+    if not multiple.empty:
+        tokens = multiple.str.split(expand=True)
+        token_values = tokens.apply(pd.to_numeric, errors='coerce')
+        present = tokens.notna()
+        valid = (present == token_values.notna()).all(axis=1)
+        result.loc[multiple.index] = (token_values.sum(axis=1) / present.sum(axis=1)).where(valid)
+
+    return result.to_numpy(dtype=float)
+
+
+def _parse_encoded(values, decimal):
+    """
+        Converte uma coluna de pesos codificando-a em dicionário: cada valor distinto é convertido
+        uma única vez e o resultado é redistribuído para as linhas.
+
+        Args:
+            values (pd.Series): Valores da coluna de peso.
+            decimal (str | None): Separador decimal, ou None para detecção automática.
+    """
+    codes, uniques = pd.factorize(values)
+    parsed = _parse_distinct_values(pd.Series(uniques, dtype=object), decimal)
+    parsed = np.append(parsed, np.nan)
+    # O código -1 (valor nulo) aponta para o NaN adicionado ao final
+    return pd.Series(parsed[codes], index=values.index)
+
+
+def parse_tonnage(values, decimal=None):
+    """
+        Converte uma coluna inteira de pesos em texto para float, sem processar linha a linha.
+
+        Aceita números no padrão pt-BR ("1.441,20", "0,000 Tons.") e en-US ("1,441.20"),
+        além de células com vários valores separados por espaço ("1800 18000"), que são
+        convertidas para a média dos valores. Valores já numéricos são mantidos.
+
+        Args:
+            values (pd.Series): Valores da coluna de peso.
+            decimal (str | pd.Series | None): Separador decimal (',' ou '.'), uma Series com o separador
+                de cada linha ou None para detectar pelo último separador presente na célula.
+
+        Returns:
+            TonnageParseResult: Valores convertidos e quantidade de células não convertidas.
+    """
+    values = pd.Series(values).infer_objects()
+    if pd.api.types.is_numeric_dtype(values):
+        return TonnageParseResult(values.astype(float), 0)
+
+    values = values.astype(object)
+    if isinstance(decimal, pd.Series):
+        conventions = decimal.reindex(values.index).astype(object)
+        result = pd.Series(np.nan, index=values.index)
+        for separator in conventions.dropna().unique():
+            mask = (conventions == separator).to_numpy()
+            result[mask] = _parse_encoded(values[mask], separator).to_numpy()
+        # Linhas sem separador definido usam a detecção automática
+        mask = conventions.isna().to_numpy()
+        if mask.any():
+            result[mask] = _parse_encoded(values[mask], None).to_numpy()
+    else:
+        result = _parse_encoded(values, decimal)
+
+    unparsed = int((values.notna() & result.isna()).sum())
+    return TonnageParseResult(result, unparsed)
+
+
+# Formatos das datas de chegada de cada porto, na ordem em que são mais frequentes
+ARRIVAL_FORMATS = {
+    "santos": ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y"),
+    "paranagua": ("%d/%m/%Y %H:%M",),
+}
+
+# Formatos aceitos em qualquer origem: os dos portos e o ISO, usado pela camada silver salva em CSV
+DEFAULT_ARRIVAL_FORMATS = (
+    "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d",
+)
+
+
+def arrival_formats(local=None):
+    """
+        Retorna os formatos de data testados para um porto: primeiro os do próprio porto e depois os demais.
+
+        Args:
+            local (str): Local de origem (santos ou paranagua). Se não informado, usa a ordem padrão.
+    """
+    preferred = ARRIVAL_FORMATS.get(local, ())
+    return preferred + tuple(date_format for date_format in DEFAULT_ARRIVAL_FORMATS if date_format not in preferred)
+
+
+def parse_arrival(values, formats=DEFAULT_ARRIVAL_FORMATS):
+    """
+        Converte uma coluna de datas de chegada em texto, sempre com o dia antes do mês
+        ("22/01/2025", "22/03/2027 06:00" ou "07/01/2025 08:00:00"), para datetime.
+
+        Cada valor distinto é convertido uma única vez: os valores ainda não convertidos são
+        testados em cada formato, na ordem informada, e o resultado é redistribuído para as linhas.
+        Valores vazios ou em outros formatos viram NaT. Colunas já convertidas são mantidas.
+
+        Args:
+            values (pd.Series): Datas de chegada.
+            formats (tuple): Formatos testados (ver arrival_formats).
+
+        Returns:
+            pd.Series: Datas convertidas (datetime64[ns]).
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    codes, uniques = pd.factorize(values.astype(object))
+    uniques = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype="datetime64[ns]")
+    for date_format in formats:
+        pending = parsed.isna()
+        if not pending.any():
+            break
+        parsed[pending] = pd.to_datetime(uniques[pending], format=date_format, errors='coerce')
+
+    parsed = np.append(parsed.to_numpy(), np.datetime64("NaT", "ns"))
+    # O código -1 (valor nulo) aponta para o NaT adicionado ao final
+    return pd.Series(parsed[codes], index=values.index)
@@ -0,0 +1,231 @@
+import json
+import logging
+import os
+import pandas as pd
+from etl.manifest import file_stats
+from etl.parsers import parse_arrival
+from etl.storage import find_storage, get_storage, list_tables, read_table
+
+# Colunas das partições do índice (as mesmas da camada silver)
+INDEX_COLUMNS = ['Chegada', 'Sentido', 'local', 'Mercadoria', 'Peso']
+
+
+class SilverIndex:
+    def __init__(self, silver_path="../../data/silver/", index_path="../../data/state/silver_index/", storage=None):
+        """
+        Inicializa o índice de consultas sobre o histórico da camada silver.
+
+        O índice divide cada tabela silver em partições por data e local e guarda, para cada partição,
+        a quantidade de linhas, a menor e a maior data de chegada e o dicionário de mercadorias e sentidos.
+        As consultas usam essas estatísticas para descartar partições inteiras sem lê-las.
+
+        Args:
+            silver_path (str): Pasta da camada silver.
+            index_path (str): Pasta onde as partições e o catálogo são salvos.
+            storage (TableStorage): Formato usado para salvar as partições. Se não informado, usa o formato padrão.
+        """
+        self.silver_path = silver_path
+        self.index_path = index_path
+        self.catalog_path = os.path.join(index_path, "catalog.json")
+        self.storage = storage or get_storage()
+        self.catalog = {}
+        if os.path.exists(self.catalog_path):
+            with open(self.catalog_path, encoding="utf-8") as file:
+                self.catalog = json.load(file)
+
+    def _partition_table(self, date, local):
+        return os.path.join(self.index_path, date, local)
+
+    def _save_catalog(self):
+        """
+            Salva o catálogo das partições, substituindo o arquivo de forma atômica.
+        """
+        os.makedirs(self.index_path, exist_ok=True)
+        temporary_path = f"{self.catalog_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self.catalog, file, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temporary_path, self.catalog_path)
+
+    def _index_silver_table(self, date, silver_table, source):
+        """
+            Divide uma tabela silver em partições por local e registra as estatísticas de cada uma.
+
+            Args:
+                date (str): Data da tabela silver.
+                silver_table (str): Caminho da tabela silver sem extensão.
+                source (dict): Tamanho e data de modificação da tabela silver.
+        """
+        df = read_table(silver_table, columns=INDEX_COLUMNS)
+        df['Chegada'] = parse_arrival(df['Chegada'])
+
+        for key in [key for key, partition in self.catalog.items() if partition["date"] == date]:
+            del self.catalog[key]
+
+        os.makedirs(os.path.join(self.index_path, date), exist_ok=True)
+        for local, partition in df.groupby('local', sort=True, observed=True):
+            partition = partition.reset_index(drop=True)
+            self.storage.write(partition, self._partition_table(date, local))
+            arrivals = partition['Chegada'].dropna()
+            self.catalog[f"{date}/{local}"] = {
+                "date": date,
+                "local": local,
+                "rows": len(partition),
+                "chegada_min": None if arrivals.empty else arrivals.min().isoformat(),
+                "chegada_max": None if arrivals.empty else arrivals.max().isoformat(),
+                "mercadorias": sorted(partition['Mercadoria'].dropna().astype(str).unique().tolist()),
+                "sentidos": sorted(partition['Sentido'].dropna().astype(str).unique().tolist()),
+                "source": source,
+            }
+
+    def refresh(self):
+        """
+            Atualiza o índice com as tabelas silver novas ou alteradas desde a última atualização
+            e remove as partições das tabelas que não existem mais.
+
+            Returns:
+                int: Quantidade de tabelas silver indexadas novamente.
+        """
+        dates = {}
+        if os.path.exists(self.silver_path):
+            for silver_table in list_tables(self.silver_path):
+                dates[os.path.basename(silver_table)] = silver_table
+
+        indexed = {partition["date"]: partition["source"] for partition in self.catalog.values()}
+        refreshed = 0
+        for date, silver_table in dates.items():
+            silver_file = find_storage(silver_table).path(silver_table)
+            size, mtime = file_stats(silver_file)
+            source = {"size": size, "mtime": mtime}
+            if indexed.get(date) == source:
+                continue
+            self._index_silver_table(date, silver_table, source)
+            refreshed += 1
+
+        for key in [key for key, partition in self.catalog.items() if partition["date"] not in dates]:
+            del self.catalog[key]
+
+        self._save_catalog()
+        if refreshed:
+            logging.info(f"{refreshed} tabelas silver indexadas.")
+        return refreshed
+
+    def partitions(self, local=None, mercadoria=None, sentido=None, chegada_from=None, chegada_to=None,
+                   date_from=None, date_to=None, latest=False):
+        """
+            Seleciona as partições que podem conter linhas para os filtros, usando apenas o catálogo.
+
+            Os argumentos são os mesmos de query.
+
+            Returns:
+                list: Entradas do catálogo das partições selecionadas, em ordem de data e local.
+        """
+        locals_ = {local} if isinstance(local, str) else set(local or [])
+        mercadoria = mercadoria.upper() if mercadoria else None
+        chegada_from = pd.Timestamp(chegada_from) if chegada_from is not None else None
+        chegada_to = pd.Timestamp(chegada_to) if chegada_to is not None else None
+
+        candidates = []
+        for partition in self.catalog.values():
+            if locals_ and partition["local"] not in locals_:
+                continue
+            if date_from is not None and partition["date"] < str(date_from):
+                continue
+            if date_to is not None and partition["date"] > str(date_to):
+                continue
+            candidates.append(partition)
+
+        if latest:
+            # Mantém apenas a tabela mais recente de cada local, antes dos filtros de conteúdo: se ela não
+            # tiver linhas para os filtros, o resultado é vazio, e não uma tabela anterior
+            newest = {}
+            for partition in candidates:
+                if partition["date"] > newest.get(partition["local"], ""):
+                    newest[partition["local"]] = partition["date"]
+            candidates = [partition for partition in candidates if partition["date"] == newest[partition["local"]]]
+
+        selected = []
+        for partition in candidates:
+            if sentido is not None and sentido not in partition["sentidos"]:
+                continue
+            if mercadoria is not None and not any(mercadoria in value.upper() for value in partition["mercadorias"]):
+                continue
+            if chegada_from is not None or chegada_to is not None:
+                if partition["chegada_min"] is None:
+                    continue
+                if chegada_from is not None and pd.Timestamp(partition["chegada_max"]) < chegada_from:
+                    continue
+                if chegada_to is not None and pd.Timestamp(partition["chegada_min"]) > chegada_to:
+                    continue
+            selected.append(partition)
+
+        return sorted(selected, key=lambda partition: (partition["date"], partition["local"]))
+
+    def iter_query(self, local=None, mercadoria=None, sentido=None, chegada_from=None, chegada_to=None,
+                   date_from=None, date_to=None, latest=False, columns=None):
+        """
+            Executa uma consulta partição a partição, mantendo em memória apenas uma partição por vez.
+
+            Os argumentos são os mesmos de query.
+
+            Yields:
+                pd.DataFrame: Linhas de cada partição que atendem aos filtros.
+        """
+        for partition in self.partitions(local, mercadoria, sentido, chegada_from, chegada_to, date_from, date_to, latest):
+            df = read_table(self._partition_table(partition["date"], partition["local"]))
+            df['Chegada'] = parse_arrival(df['Chegada'])
+
+            mask = pd.Series(True, index=df.index)
+            if mercadoria is not None:
+                mask &= df['Mercadoria'].astype(str).str.upper().str.contains(mercadoria.upper(), regex=False)
+            if sentido is not None:
+                mask &= df['Sentido'] == sentido
+            if chegada_from is not None:
+                mask &= df['Chegada'] >= pd.Timestamp(chegada_from)
+            if chegada_to is not None:
+                mask &= df['Chegada'] <= pd.Timestamp(chegada_to)
+
+            df = df[mask]
+            if df.empty:
+                continue
+            df.insert(0, 'Data', partition["date"])
+            yield df if columns is None else df[columns]
+
+    def query(self, local=None, mercadoria=None, sentido=None, chegada_from=None, chegada_to=None,
+              date_from=None, date_to=None, latest=False, columns=None):
+        """
+            Consulta o histórico da camada silver.
+
+            Args:
+                local (str | list): Local (santos, paranagua) ou lista de locais.
+                mercadoria (str): Trecho do nome da mercadoria, sem diferenciar maiúsculas e minúsculas (ex.: "SOJA").
+                sentido (str): Imp, Exp ou Imp/Exp.
+                chegada_from (str | pd.Timestamp): Menor data de chegada.
+                chegada_to (str | pd.Timestamp): Maior data de chegada.
+                date_from (str): Primeira data das tabelas silver consultadas (AAAA-MM-DD).
+                date_to (str): Última data das tabelas silver consultadas (AAAA-MM-DD).
+                latest (bool): Se deve consultar apenas a tabela mais recente de cada local (entre as datas de date_from
+                    a date_to), mesmo que ela não tenha linhas para os demais filtros.
+                columns (list): Colunas do resultado. Se não informado, retorna a data da tabela ('Data') e as colunas silver.
+
+            Returns:
+                pd.DataFrame: Linhas que atendem aos filtros.
+        """
+        frames = list(self.iter_query(local, mercadoria, sentido, chegada_from, chegada_to, date_from, date_to, latest, columns))
+        if not frames:
+            return pd.DataFrame(columns=columns or ['Data'] + INDEX_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+
+def query_silver(**filters):
+    """
+        Atualiza o índice da camada silver e executa uma consulta com os filtros informados.
+
+        Args:
+            **filters: Filtros aceitos por SilverIndex.query.
+
+        Returns:
+            pd.DataFrame: Linhas que atendem aos filtros.
+    """
+    index = SilverIndex()
+    index.refresh()
+    return index.query(**filters)
@@ -0,0 +1,180 @@
+import logging
+import multiprocessing
+import sys
+import threading
+import time
+import pandas as pd
+from etl.archive import PageArchive
+from etl.extract import DataExtractor
+from etl.instrumentation import RunInstrumentation, stage
+from etl.load import DataLoader
+from etl.lock import LockBusyError, RunLock
+from etl.transform import DataTransform
+from etl.vessel_store import VesselCallStore
+
+# Intervalo padrão, em segundos, entre as atualizações de cada fonte
+DEFAULT_INTERVALS = {"santos": 30 * 60, "paranagua": 30 * 60}
+
+# Códigos de saída do processo de cada atualização
+EXIT_OK, EXIT_ERROR, EXIT_BUSY = 0, 1, 2
+
+
+def run_refresh(cities=None, lock_path="../../data/state/etl.lock"):
+    """
+        Executa uma atualização do ETL para as cidades informadas.
+
+        As camadas silver e gold só são geradas novamente se alguma cidade salvou páginas novas na
+        pasta bronze. Como a camada silver é incremental, apenas os arquivos bronze dessas cidades
+        são transformados de novo; os das demais vêm do cache.
+
+        Args:
+            cities (list): Cidades extraídas. Se não informado, extrai todas.
+            lock_path (str): Arquivo de bloqueio compartilhado pelas execuções do ETL.
+
+        Returns:
+            list: Cidades com páginas novas.
+
+        Raises:
+            LockBusyError: Se outra execução do ETL estiver em andamento.
+    """
+    with RunLock(lock_path), RunInstrumentation(name="refresh"):
+        extractor = DataExtractor(vessel_store=VesselCallStore(), archive=PageArchive())
+        with stage("extract"):
+            results = extractor.execute_bronze_process(cities=cities)
+
+        changed = sorted(city for city, result in results.items() if result.ok and result.changed)
+        if not changed:
+            logging.info("Nenhuma página foi alterada, transformação e carregamento não serão executados.")
+            return changed
+
+        logging.info(f"Páginas novas de {', '.join(changed)}: gerando as camadas silver e gold.")
+        current_date = pd.to_datetime("today").strftime("%Y-%m-%d")
+        with stage("transform"):
+            DataTransform(current_date).execute_silver_process()
+        with stage("load"):
+            DataLoader(current_date).execute_gold_process()
+        # Só depois das camadas silver e gold as páginas extraídas passam a ser consideradas processadas
+        extractor.commit_state()
+        return changed
+
+
+def _refresh_process(job, cities, lock_path):
+    """
+        Executa uma atualização no processo filho, informando o resultado pelo código de saída.
+    """
+    try:
+        job(cities, lock_path=lock_path)
+    except LockBusyError as e:
+        logging.warning(f"Atualização de {', '.join(cities)} ignorada: {e}")
+        sys.exit(EXIT_BUSY)
+    except Exception as e:
+        logging.error(f"Erro na atualização de {', '.join(cities)}: {e}")
+        sys.exit(EXIT_ERROR)
+    sys.exit(EXIT_OK)
+
+
+class RefreshScheduler:
+    def __init__(self, intervals=None, deadline=20 * 60, lock_path="../../data/state/etl.lock", job=None):
+        """
+        Inicializa o agendador de atualizações ao longo do dia, com um intervalo para cada fonte.
+
+        O agendador dorme até o horário da próxima atualização (sem verificar a agenda a cada minuto)
+        e executa juntas as fontes que vencem ao mesmo tempo. Cada atualização roda em um processo
+        separado, encerrado se passar do prazo, para que uma requisição travada não bloqueie as
+        próximas. As atualizações atrasadas não são acumuladas: a fonte volta ao próximo horário do seu intervalo.
+
+        Args:
+            intervals (dict): Intervalo, em segundos, entre as atualizações de cada fonte.
+            deadline (float): Tempo máximo, em segundos, de cada atualização.
+            lock_path (str): Arquivo de bloqueio compartilhado com as demais execuções do ETL.
+            job (callable): Função executada em cada atualização, chamada como job(cidades, lock_path=...). Padrão: run_refresh.
+        """
+        self.intervals = dict(intervals or DEFAULT_INTERVALS)
+        self.deadline = deadline
+        self.lock_path = lock_path
+        self.job = job or run_refresh
+        self.next_runs = {}
+        self.history = []
+        self._stop = threading.Event()
+
+    def due_sources(self, now):
+        """
+            Retorna as fontes cuja atualização já venceu, em ordem alfabética.
+        """
+        return sorted(source for source, next_run in self.next_runs.items() if next_run <= now)
+
+    def _reschedule(self, sources):
+        now = time.monotonic()
+        for source in sources:
+            next_run = self.next_runs[source] + self.intervals[source]
+            if next_run <= now:
+                # Horários perdidos durante uma atualização demorada são descartados
+                missed = int((now - next_run) // self.intervals[source]) + 1
+                next_run += missed * self.intervals[source]
+            self.next_runs[source] = next_run
+
+    def run_once(self, sources):
+        """
+            Executa uma atualização das fontes em um processo separado, respeitando o prazo.
+
+            Args:
+                sources (list): Fontes atualizadas.
+
+            Returns:
+                str: Resultado da atualização ('ok', 'error', 'busy' ou 'timeout').
+        """
+        start = time.monotonic()
+        process = multiprocessing.Process(
+            target=_refresh_process, args=(self.job, list(sources), self.lock_path), daemon=True
+        )
+        process.start()
+        process.join(self.deadline)
+
+        if process.is_alive():
+            logging.error(f"Atualização de {', '.join(sources)} excedeu o prazo de {self.deadline:.0f}s e foi encerrada.")
+            process.terminate()
+            process.join(5)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            status = "timeout"
+        else:
+            status = {EXIT_OK: "ok", EXIT_BUSY: "busy"}.get(process.exitcode, "error")
+
+        elapsed = time.monotonic() - start
+        self.history.append({"sources": list(sources), "status": status, "elapsed": elapsed})
+        logging.info(f"Atualização de {', '.join(sources)}: {status} em {elapsed:.1f}s.")
+        return status
+
+    def run(self, max_runs=None):
+        """
+            Executa as atualizações até stop() ser chamado (ou até max_runs atualizações).
+
+            Todas as fontes são atualizadas ao iniciar.
+
+            Args:
+                max_runs (int): Quantidade máxima de atualizações. Se não informado, executa indefinidamente.
+        """
+        self._stop.clear()
+        start = time.monotonic()
+        self.next_runs = {source: start for source in self.intervals}
+        runs = 0
+
+        while not self._stop.is_set() and (max_runs is None or runs < max_runs):
+            now = time.monotonic()
+            next_run = min(self.next_runs.values())
+            if next_run > now:
+                # Dorme até a próxima atualização; stop() interrompe a espera
+                self._stop.wait(next_run - now)
+                continue
+
+            sources = self.due_sources(now)
+            self.run_once(sources)
+            self._reschedule(sources)
+            runs += 1
+
+    def stop(self):
+        """
+            Interrompe o agendador depois da atualização em andamento.
+        """
+        self._stop.set()
@@ -0,0 +1,133 @@
+import hashlib
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    """
+        Colunas de uma tabela bronze usadas pela camada silver.
+
+        Apenas as colunas registradas são lidas. Além das colunas que dão origem às colunas silver,
+        são lidas as colunas que identificam a escala, usadas para remover as linhas duplicadas.
+
+        Args:
+            columns (dict): Tipo de cada coluna lida ('category', 'object' ou None para manter o tipo salvo).
+            silver (dict): Coluna silver correspondente a cada coluna bronze.
+    """
+    columns: dict
+    silver: dict = field(default_factory=dict)
+
+    @property
+    def usecols(self):
+        return list(self.columns)
+
+    @property
+    def dtypes(self):
+        return {column: dtype for column, dtype in self.columns.items() if dtype is not None}
+
+
+# Todas as tabelas de Santos têm as mesmas colunas
+SANTOS_LINEUP = TableSchema(
+    columns={
+        'Navio Ship': None,
+        'IMO': None,
+        'DUV': None,
+        'Viagem Voyage': None,
+        'Cheg/Arrival d/m/y': 'object',
+        'Operaç Operat': 'category',
+        'Mercadoria Goods': 'category',
+        'Peso Weight': None,
+    },
+    silver={
+        'Cheg/Arrival d/m/y': 'Chegada',
+        'Operaç Operat': 'Sentido',
+        'Mercadoria Goods': 'Mercadoria',
+        'Peso Weight': 'Previsto',
+    },
+)
+
+# Colunas comuns às tabelas de Paranaguá; nas tabelas de navios esperados, a data de chegada é a prevista (ETA)
+PARANAGUA_IDENTITY = {'Programação': None, 'Embarcação': None, 'IMO': None, 'DUV': None}
+PARANAGUA_VALUES = {'Sentido': 'category', 'Mercadoria': 'category', 'Previsto': None}
+PARANAGUA_SILVER = {'Chegada': 'Chegada', 'Sentido': 'Sentido', 'Mercadoria': 'Mercadoria', 'Previsto': 'Previsto'}
+
+PARANAGUA_LINEUP = TableSchema(
+    columns={**PARANAGUA_IDENTITY, 'Chegada': 'object', **PARANAGUA_VALUES},
+    silver=PARANAGUA_SILVER,
+)
+
+PARANAGUA_EXPECTED = TableSchema(
+    columns={**PARANAGUA_IDENTITY, 'ETA': 'object', **PARANAGUA_VALUES},
+    silver={'ETA': 'Chegada', **{column: target for column, target in PARANAGUA_SILVER.items() if column != 'Chegada'}},
+)
+
+# Esquema de cada tabela bronze, por local e nome da tabela
+SOURCE_SCHEMAS = {
+    "santos": {
+        "cabotagem": SANTOS_LINEUP,
+        "conteineres": SANTOS_LINEUP,
+        "graneis_de_origem_vegetal": SANTOS_LINEUP,
+        "graneis_solidos_-_exportacao": SANTOS_LINEUP,
+        "graneis_solidos_-_importacao": SANTOS_LINEUP,
+        "lash": SANTOS_LINEUP,
+        "liquido_a_granel": SANTOS_LINEUP,
+        "prioridade_c5": SANTOS_LINEUP,
+        "roll-in-roll-off": SANTOS_LINEUP,
+        "sem_prioridade": SANTOS_LINEUP,
+        "trigo": SANTOS_LINEUP,
+    },
+    "paranagua": {
+        "ao_largo": PARANAGUA_LINEUP,
+        "atracados": PARANAGUA_LINEUP,
+        "despachados": PARANAGUA_LINEUP,
+        "programados": PARANAGUA_LINEUP,
+        "esperados": PARANAGUA_EXPECTED,
+    },
+}
+
+
+def get_table_schema(local, name):
+    """
+        Retorna o esquema de uma tabela bronze.
+
+        Args:
+            local (str): Local de origem (santos ou paranagua).
+            name (str): Nome da tabela (nome do arquivo sem extensão).
+
+        Returns:
+            TableSchema: Esquema da tabela, ou None se a tabela não estiver registrada.
+    """
+    return SOURCE_SCHEMAS.get(local, {}).get(name)
+
+
+def silver_sources(target):
+    """
+        Colunas bronze que dão origem a uma coluna silver, segundo o registro de esquemas.
+
+        Args:
+            target (str): Nome da coluna silver.
+
+        Returns:
+            tuple: A própria coluna silver seguida das demais colunas bronze associadas a ela,
+                na ordem do registro.
+    """
+    sources = [target]
+    for tables in SOURCE_SCHEMAS.values():
+        for schema in tables.values():
+            for column, silver in schema.silver.items():
+                if silver == target and column not in sources:
+                    sources.append(column)
+    return tuple(sources)
+
+
+def registry_version():
+    """
+        Identificador do conteúdo do registro de esquemas, que muda sempre que uma tabela ou coluna
+        registrada muda. É usado para invalidar resultados em cache gerados com outro registro.
+    """
+    content = repr(sorted(
+        (local, name, sorted(schema.columns.items(), key=str), sorted(schema.silver.items()))
+        for local, tables in SOURCE_SCHEMAS.items()
+        for name, schema in tables.items()
+    ))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
@@ -0,0 +1,360 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import pandas as pd
+from etl.query import SilverIndex
+from etl.storage import list_tables, read_table
+
+# Parâmetros aceitos por cada consulta (nomes da linha de comando de src/query.py)
+GOLD_PARAMETERS = {"local", "sentido", "mercadoria", "data_de", "data_ate"}
+SILVER_PARAMETERS = GOLD_PARAMETERS | {"chegada_de", "chegada_ate", "mais_recente"}
+
+
+class QueryError(ValueError):
+    """
+        Parâmetro de consulta inválido, respondido com o status 400.
+    """
+
+
+class LRUCache:
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        """
+        Inicializa o cache das respostas, que descarta as menos usadas recentemente ao passar dos limites.
+
+        Args:
+            max_entries (int): Quantidade máxima de respostas guardadas.
+            max_bytes (int): Tamanho máximo, em bytes, da soma das respostas guardadas.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+            Guarda uma resposta. Respostas maiores que o limite do cache não são guardadas.
+
+            Args:
+                key (tuple): Chave da resposta; o primeiro item é o tipo da consulta ('gold' ou 'silver').
+                value (bytes): Corpo da resposta.
+        """
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key))
+            self.entries[key] = value
+            self.size += len(value)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, removed = self.entries.popitem(last=False)
+                self.size -= len(removed)
+
+    def invalidate(self, kind):
+        """
+            Remove as respostas de um tipo de consulta.
+
+            Returns:
+                int: Quantidade de respostas removidas.
+        """
+        with self._lock:
+            keys = [key for key in self.entries if key[0] == kind]
+            for key in keys:
+                self.size -= len(self.entries.pop(key))
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self.entries), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+
+def _directory_signature(path):
+    """
+        Retorna o nome, a data de modificação e o tamanho de cada item de uma pasta. A assinatura muda
+        quando uma tabela é criada, substituída ou removida.
+    """
+    if not os.path.exists(path):
+        return ()
+    with os.scandir(path) as entries:
+        return tuple(sorted((entry.name, entry.stat().st_mtime_ns, entry.stat().st_size) for entry in entries))
+
+
+def _parse_date(value, name):
+    try:
+        result = pd.Timestamp(value)
+    except ValueError:
+        raise QueryError(f"Data inválida em {name}: {value}.")
+    # Valores vazios ('?data=') são convertidos para NaT, sem erro
+    if pd.isna(result):
+        raise QueryError(f"Data inválida em {name}: {value}.")
+    return result
+
+
+class LineupService:
+    def __init__(self, gold_path="../../data/gold/", silver_path="../../data/silver/", index=None,
+                 cache_entries=256, cache_bytes=64 * 1024 * 1024, check_interval=1.0):
+        """
+        Inicializa o serviço de consultas às camadas gold e silver, com as respostas em cache.
+
+        As respostas (JSON) ficam em um cache LRU. A cada check_interval segundos, no máximo, o serviço
+        verifica se as pastas gold e silver mudaram; quando uma tabela nova é gravada, as respostas
+        daquela camada são descartadas (e, na silver, o índice de consultas é atualizado).
+
+        Args:
+            gold_path (str): Pasta da camada gold.
+            silver_path (str): Pasta da camada silver.
+            index (SilverIndex): Índice das consultas à camada silver. Se não informado, usa o índice padrão.
+            cache_entries (int): Quantidade máxima de respostas em cache. Com 0, o cache não é usado.
+            cache_bytes (int): Tamanho máximo, em bytes, das respostas em cache.
+            check_interval (float): Intervalo mínimo, em segundos, entre as verificações das pastas.
+        """
+        self.gold_path = gold_path
+        self.silver_path = silver_path
+        self.index = index or SilverIndex(silver_path=silver_path)
+        self.cache = LRUCache(cache_entries, cache_bytes) if cache_entries else None
+        self.check_interval = check_interval
+        self._signatures = {}
+        self._generations = {"gold": 0, "silver": 0}
+        self._checked_at = None
+        self._lock = threading.Lock()
+        # O índice da camada silver não pode ser consultado enquanto é atualizado
+        self._index_lock = threading.Lock()
+
+    def check_for_updates(self, force=False):
+        """
+            Descarta as respostas em cache das camadas cujas pastas mudaram desde a última verificação.
+
+            Args:
+                force (bool): Verifica mesmo antes de check_interval.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            paths = {"gold": self.gold_path, "silver": self.silver_path}
+            changed = []
+            for kind, path in paths.items():
+                signature = _directory_signature(path)
+                if self._signatures.get(kind) != signature:
+                    self._signatures[kind] = signature
+                    changed.append(kind)
+
+        for kind in changed:
+            if kind == "silver":
+                with self._index_lock:
+                    self.index.refresh()
+            # Respostas em cálculo desde antes da mudança não são guardadas (ver handle)
+            self._generations[kind] += 1
+            if self.cache is not None:
+                removed = self.cache.invalidate(kind)
+                if removed:
+                    logging.info(f"Camada {kind} alterada: {removed} respostas removidas do cache.")
+
+    def _read_gold(self, date):
+        return read_table(os.path.join(self.gold_path, date))
+
+    def gold(self, local=None, sentido=None, mercadoria=None, date_from=None, date_to=None):
+        """
+            Consulta as tabelas gold diárias.
+
+            Args:
+                local (list): Locais (santos, paranagua).
+                sentido (str): Imp, Exp ou Imp/Exp.
+                mercadoria (str): Trecho do nome da mercadoria, sem diferenciar maiúsculas e minúsculas.
+                date_from (str): Primeira data das tabelas gold (AAAA-MM-DD).
+                date_to (str): Última data das tabelas gold (AAAA-MM-DD).
+                    Sem date_from e date_to, consulta apenas a tabela mais recente.
+
+            Returns:
+                pd.DataFrame: Linhas das tabelas gold, com a data da tabela em 'Data'.
+        """
+        dates = sorted(os.path.basename(table) for table in list_tables(self.gold_path)) \
+            if os.path.exists(self.gold_path) else []
+        if date_from is None and date_to is None:
+            dates = dates[-1:]
+        dates = [date for date in dates
+                 if (date_from is None or date >= date_from) and (date_to is None or date <= date_to)]
+
+        frames = []
+        for date in dates:
+            df = self._read_gold(date)
+            mask = pd.Series(True, index=df.index)
+            if local:
+                mask &= df['local'].isin(local)
+            if sentido is not None:
+                mask &= df['Sentido'] == sentido
+            if mercadoria is not None:
+                mask &= df['Mercadoria'].astype(str).str.upper().str.contains(mercadoria.upper(), regex=False)
+            df = df[mask]
+            df.insert(0, 'Data', date)
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame(columns=['Data', 'local', 'Sentido', 'Mercadoria', 'Peso', 'Total'])
+        return pd.concat(frames, ignore_index=True)
+
+    def silver(self, local=None, sentido=None, mercadoria=None, chegada_from=None, chegada_to=None,
+               date_from=None, date_to=None, latest=False):
+        """
+            Consulta o histórico da camada silver pelo índice particionado (ver SilverIndex.query).
+        """
+        with self._index_lock:
+            return self.index.query(local=local, mercadoria=mercadoria, sentido=sentido, chegada_from=chegada_from,
+                                    chegada_to=chegada_to, date_from=date_from, date_to=date_to, latest=latest)
+
+    def _run_query(self, kind, params):
+        """
+            Converte os parâmetros da URL e executa a consulta.
+
+            Raises:
+                QueryError: Se algum parâmetro não existir ou for inválido.
+        """
+        allowed = GOLD_PARAMETERS if kind == "gold" else SILVER_PARAMETERS
+        unknown = sorted(set(params) - allowed)
+        if unknown:
+            raise QueryError(f"Parâmetros desconhecidos: {', '.join(unknown)}.")
+
+        filters = {
+            "local": [value for values in params.get("local", []) for value in values.split(",") if value] or None,
+            "sentido": params.get("sentido", [None])[-1],
+            "mercadoria": params.get("mercadoria", [None])[-1],
+        }
+        for name, key in (("data_de", "date_from"), ("data_ate", "date_to")):
+            if name in params:
+                filters[key] = _parse_date(params[name][-1], name).strftime("%Y-%m-%d")
+        if kind == "gold":
+            return self.gold(**filters)
+
+        for name, key in (("chegada_de", "chegada_from"), ("chegada_ate", "chegada_to")):
+            if name in params:
+                filters[key] = _parse_date(params[name][-1], name)
+        filters["latest"] = params.get("mais_recente", ["0"])[-1].lower() in ("1", "true", "sim")
+        return self.silver(**filters)
+
+    def handle(self, path, params):
+        """
+            Responde a uma consulta, usando o cache quando possível.
+
+            Args:
+                path (str): Caminho da URL ('/gold', '/silver' ou '/status').
+                params (dict): Parâmetros da URL, como retornados por urllib.parse.parse_qs.
+
+            Returns:
+                tuple: Status HTTP e corpo da resposta (JSON em bytes).
+        """
+        kind = path.strip("/")
+        if kind == "status":
+            content = {"cache": self.cache.stats() if self.cache is not None else None}
+            return 200, json.dumps(content).encode("utf-8")
+        if kind not in ("gold", "silver"):
+            return 404, json.dumps({"erro": f"Consulta {path} não encontrada."}, ensure_ascii=False).encode("utf-8")
+
+        self.check_for_updates()
+        key = (kind, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+        if self.cache is not None:
+            body = self.cache.get(key)
+            if body is not None:
+                return 200, body
+
+        generation = self._generations[kind]
+        try:
+            df = self._run_query(kind, params)
+        except QueryError as e:
+            return 400, json.dumps({"erro": str(e)}, ensure_ascii=False).encode("utf-8")
+        body = df.to_json(orient="records", date_format="iso", force_ascii=False).encode("utf-8")
+
+        # Uma resposta calculada enquanto a camada mudava não é guardada
+        if self.cache is not None and generation == self._generations[kind]:
+            self.cache.put(key, body)
+        return 200, body
+
+
+class QueryServer:
+    def __init__(self, service=None, host="127.0.0.1", port=8080):
+        """
+        Inicializa o servidor HTTP local das consultas, que responde em JSON:
+
+            GET /gold?local=santos&sentido=Exp&mercadoria=soja&data_de=2025-01-01&data_ate=2025-01-31
+            GET /silver?local=paranagua&chegada_de=2025-01-22&chegada_ate=2025-02-01&mais_recente=1
+            GET /status
+
+        Args:
+            service (LineupService): Serviço de consultas. Se não informado, usa as pastas padrão.
+            host (str): Endereço do servidor.
+            port (int): Porta HTTP (0 escolhe uma porta livre).
+        """
+        self.service = service or LineupService()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        service = self.service
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Cabeçalho e corpo são enviados separadamente; sem isso, cada resposta espera o ACK atrasado do cliente
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                try:
+                    status, body = service.handle(url.path, parse_qs(url.query))
+                except Exception as e:
+                    logging.error(f"Erro na consulta {self.path}: {e}")
+                    status, body = 500, json.dumps({"erro": str(e)}, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logging.debug(format % args)
+
+        return Handler
+
+    def start(self):
+        """
+            Inicia o servidor em uma thread em segundo plano.
+        """
+        self.service.check_for_updates(force=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        self.service.check_for_updates(force=True)
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,518 @@
+import io
+import json
+import os
+import queue
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Variável de ambiente que define o formato padrão das camadas (parquet, numpy ou csv)
+STORAGE_FORMAT_VARIABLE = "ETL_STORAGE_FORMAT"
+
+
+class TableStorage:
+    """
+        Formato de armazenamento de uma tabela das camadas bronze, silver e gold.
+
+        As tabelas são identificadas pelo caminho sem extensão (ex.: data/silver/2025-01-22),
+        e cada formato acrescenta a sua própria extensão.
+    """
+    name = None
+    extension = None
+
+    def path(self, stem):
+        """
+            Retorna o caminho completo da tabela neste formato.
+
+            Args:
+                stem (str): Caminho da tabela sem extensão.
+        """
+        return f"{stem}{self.extension}"
+
+    def exists(self, stem):
+        return os.path.exists(self.path(stem))
+
+    def encode(self, df):
+        """
+            Gera o conteúdo dos arquivos da tabela em memória, sem gravá-los.
+
+            Args:
+                df (pd.DataFrame): DataFrame a ser salvo.
+
+            Returns:
+                dict: Conteúdo (bytes) de cada arquivo, pelo caminho relativo à tabela ('.' nos formatos de um único arquivo).
+        """
+        raise NotImplementedError
+
+    def write_encoded(self, files, stem):
+        """
+            Grava os arquivos gerados por encode, substituindo a tabela existente.
+
+            Args:
+                files (dict): Conteúdo de cada arquivo, como retornado por encode.
+                stem (str): Caminho da tabela sem extensão.
+
+            Returns:
+                str: Caminho do arquivo salvo.
+        """
+        path = self.path(stem)
+        with open(path, "wb") as file:
+            file.write(files["."])
+        return path
+
+    def write(self, df, stem):
+        """
+            Salva o DataFrame, substituindo a tabela existente.
+
+            Args:
+                df (pd.DataFrame): DataFrame a ser salvo.
+                stem (str): Caminho da tabela sem extensão.
+
+            Returns:
+                str: Caminho do arquivo salvo.
+        """
+        return self.write_encoded(self.encode(df), stem)
+
+    def read(self, stem, columns=None, dtype=None):
+        """
+            Lê a tabela, opcionalmente apenas com as colunas informadas.
+
+            Args:
+                stem (str): Caminho da tabela sem extensão.
+                columns (list): Colunas a serem lidas. Se não informado, lê todas.
+                dtype (dict): Tipo de algumas colunas (ex.: 'category'). Colunas inexistentes são ignoradas.
+
+            Returns:
+                pd.DataFrame: Dados da tabela.
+        """
+        raise NotImplementedError
+
+    def decode(self, files, columns=None, dtype=None):
+        """
+            Lê a tabela a partir do conteúdo gerado por encode, com o mesmo resultado de read após a gravação.
+
+            Args:
+                files (dict): Conteúdo de cada arquivo, como retornado por encode.
+                columns (list): Colunas a serem lidas. Se não informado, lê todas.
+                dtype (dict): Tipo de algumas colunas (ex.: 'category'). Colunas inexistentes são ignoradas.
+
+            Returns:
+                pd.DataFrame: Dados da tabela.
+        """
+        raise NotImplementedError
+
+    def _apply_dtype(self, df, dtype):
+        """
+            Converte as colunas lidas para os tipos informados, nos formatos que não aceitam o tipo na leitura.
+        """
+        if not dtype:
+            return df
+        dtype = {column: value for column, value in dtype.items() if column in df.columns and df[column].dtype != value}
+        return df.astype(dtype) if dtype else df
+
+
+class CsvStorage(TableStorage):
+    """
+        Formato CSV, usado pelas versões anteriores do projeto e como opção de exportação.
+        Os tipos são inferidos novamente a cada leitura.
+    """
+    name = "csv"
+    extension = ".csv"
+
+    def encode(self, df):
+        return {".": df.to_csv(index=False, header=True).encode("utf-8")}
+
+    def _read_csv(self, source, columns, dtype):
+        usecols = None if columns is None else (lambda column: column in set(columns))
+        return pd.read_csv(source, usecols=usecols, dtype=dtype)
+
+    def read(self, stem, columns=None, dtype=None):
+        return self._read_csv(self.path(stem), columns, dtype)
+
+    def decode(self, files, columns=None, dtype=None):
+        return self._read_csv(io.BytesIO(files["."]), columns, dtype)
+
+
+class ParquetStorage(TableStorage):
+    """
+        Formato Parquet (colunar e tipado), disponível quando o pyarrow está instalado.
+    """
+    name = "parquet"
+    extension = ".parquet"
+
+    def encode(self, df):
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return {".": buffer.getvalue()}
+
+    def _select(self, names, columns):
+        # Assim como nos demais formatos, colunas inexistentes são ignoradas
+        return None if columns is None else [column for column in names if column in set(columns)]
+
+    def read(self, stem, columns=None, dtype=None):
+        path = self.path(stem)
+        columns = self._select(pyarrow.parquet.read_schema(path).names, columns) if columns is not None else None
+        return self._apply_dtype(pd.read_parquet(path, columns=columns, memory_map=True), dtype)
+
+    def decode(self, files, columns=None, dtype=None):
+        source = pyarrow.BufferReader(files["."])
+        columns = self._select(pyarrow.parquet.read_schema(source).names, columns) if columns is not None else None
+        return self._apply_dtype(pd.read_parquet(io.BytesIO(files["."]), columns=columns), dtype)
+
+
+class NumpyStorage(TableStorage):
+    """
+        Formato colunar próprio, usado quando o pyarrow não está instalado.
+
+        Cada tabela é uma pasta com um arquivo schema.json e um arquivo .npy por coluna.
+        Colunas numéricas, booleanas e de data são salvas com o tipo original e lidas com
+        memory-map; colunas de texto são codificadas em dicionário (códigos inteiros e
+        valores distintos), com o código -1 representando valores nulos.
+    """
+    name = "numpy"
+    extension = ".npcol"
+
+    def _column_kind(self, values):
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return "category"
+        if pd.api.types.is_extension_array_dtype(values.dtype):
+            return "dictionary"
+        if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+            return "array"
+        if pd.api.types.is_datetime64_dtype(values) or pd.api.types.is_timedelta64_dtype(values):
+            return "array"
+        return "dictionary"
+
+    def _encode_array(self, array):
+        buffer = io.BytesIO()
+        np.save(buffer, array, allow_pickle=False)
+        return buffer.getvalue()
+
+    def _encode_dictionary(self, values):
+        """
+            Codifica uma coluna de texto em códigos inteiros e valores distintos (em texto).
+        """
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, uniques = pd.factorize(values)
+        return codes.astype(np.int32), np.array([str(value) for value in uniques], dtype=str)
+
+    def encode(self, df):
+        files = {}
+        schema = {"columns": [], "length": len(df)}
+        for position, (name, values) in enumerate(df.items()):
+            kind = self._column_kind(values)
+            if kind == "array":
+                files[f"{position}.npy"] = self._encode_array(values.to_numpy())
+            else:
+                codes, uniques = self._encode_dictionary(values)
+                files[f"{position}.npy"] = self._encode_array(codes)
+                files[f"{position}.dictionary.npy"] = self._encode_array(uniques)
+            schema["columns"].append({"name": str(name), "kind": kind})
+        files["schema.json"] = json.dumps(schema, ensure_ascii=False).encode("utf-8")
+        return files
+
+    def write_encoded(self, files, stem):
+        path = self.path(stem)
+        # Escreve em uma pasta temporária e substitui a tabela ao final
+        temporary_path = f"{path}.tmp"
+        if os.path.exists(temporary_path):
+            shutil.rmtree(temporary_path)
+        os.makedirs(temporary_path)
+
+        for name, content in files.items():
+            with open(os.path.join(temporary_path, name), "wb") as file:
+                file.write(content)
+
+        # A tabela anterior é renomeada antes da substituição e removida depois, para que a tabela
+        # fique ausente apenas entre as duas renomeações, e não durante a remoção dos arquivos
+        previous_path = f"{path}.old"
+        if os.path.exists(previous_path):
+            shutil.rmtree(previous_path)
+        if os.path.exists(path):
+            os.replace(path, previous_path)
+        os.replace(temporary_path, path)
+        if os.path.exists(previous_path):
+            shutil.rmtree(previous_path)
+        return path
+
+    def _build_frame(self, schema, load, columns, dtype):
+        """
+            Monta o DataFrame a partir do esquema, carregando apenas os arquivos das colunas selecionadas.
+
+            Args:
+                schema (dict): Conteúdo do schema.json.
+                load (callable): Carrega um arquivo .npy da tabela pelo nome.
+        """
+        dtype = dtype or {}
+        names = [column["name"] for column in schema["columns"]]
+        selected = names if columns is None else [name for name in names if name in set(columns)]
+
+        data = {}
+        for position, column in enumerate(schema["columns"]):
+            if column["name"] not in selected:
+                continue
+            if column["kind"] == "array":
+                data[column["name"]] = load(f"{position}.npy")
+            else:
+                # Colunas de texto pedidas como categoria são lidas diretamente dos códigos do dicionário
+                kind = "category" if dtype.get(column["name"]) == "category" else column["kind"]
+                codes = load(f"{position}.npy")
+                uniques = load(f"{position}.dictionary.npy")
+                categorical = pd.Categorical.from_codes(codes, categories=pd.Index(uniques.astype(object)))
+                data[column["name"]] = categorical if kind == "category" else np.asarray(categorical, dtype=object)
+
+        df = pd.DataFrame(data, columns=selected, index=pd.RangeIndex(schema["length"]))
+        return self._apply_dtype(df, dtype)
+
+    def read(self, stem, columns=None, dtype=None):
+        path = self.path(stem)
+        with open(os.path.join(path, "schema.json"), encoding="utf-8") as file:
+            schema = json.load(file)
+
+        def load(name):
+            # Os dicionários não são lidos com memory-map, pois são convertidos para object
+            mmap_mode = None if name.endswith(".dictionary.npy") else "r"
+            return np.load(os.path.join(path, name), mmap_mode=mmap_mode, allow_pickle=False)
+        return self._build_frame(schema, load, columns, dtype)
+
+    def decode(self, files, columns=None, dtype=None):
+        schema = json.loads(files["schema.json"].decode("utf-8"))
+        return self._build_frame(schema, lambda name: np.load(io.BytesIO(files[name]), allow_pickle=False), columns, dtype)
+
+
+STORAGE_FORMATS = {storage.name: storage for storage in (ParquetStorage, NumpyStorage, CsvStorage)}
+
+
+def get_storage(format=None):
+    """
+        Retorna o formato de armazenamento das camadas.
+
+        Args:
+            format (str): parquet, numpy ou csv. Se não informado, usa a variável de ambiente
+                ETL_STORAGE_FORMAT, ou Parquet quando o pyarrow está instalado e o formato NumPy caso contrário.
+
+        Returns:
+            TableStorage: Formato de armazenamento.
+
+        Raises:
+            ValueError: Se o formato não existir ou o pyarrow não estiver instalado para o formato Parquet.
+    """
+    format = format or os.environ.get(STORAGE_FORMAT_VARIABLE) or ("parquet" if pyarrow is not None else "numpy")
+    if format not in STORAGE_FORMATS:
+        raise ValueError(f"Formato de armazenamento {format} não suportado.")
+    if format == "parquet" and pyarrow is None:
+        raise ValueError("O formato parquet exige o pacote pyarrow.")
+    return STORAGE_FORMATS[format]()
+
+
+def find_storage(stem):
+    """
+        Encontra o formato em que uma tabela foi salva. Se ela existir em mais de um formato
+        (ex.: após trocar o formato padrão), usa a cópia mais recente.
+
+        Args:
+            stem (str): Caminho da tabela sem extensão.
+
+        Returns:
+            TableStorage: Formato da tabela, ou None se ela não existir.
+    """
+    candidates = []
+    for priority, storage in enumerate(STORAGE_FORMATS.values()):
+        if storage.name == "parquet" and pyarrow is None:
+            continue
+        storage = storage()
+        if storage.exists(stem):
+            # Em caso de empate, os formatos binários têm prioridade sobre o CSV
+            candidates.append((os.path.getmtime(storage.path(stem)), -priority, storage))
+
+    if not candidates:
+        return None
+    return max(candidates, key=lambda candidate: candidate[:2])[2]
+
+
+def read_table(stem, columns=None, dtype=None):
+    """
+        Lê uma tabela em qualquer um dos formatos suportados (inclusive CSVs de execuções anteriores).
+
+        Args:
+            stem (str): Caminho da tabela sem extensão.
+            columns (list): Colunas a serem lidas. Se não informado, lê todas.
+            dtype (dict): Tipo de algumas colunas (ex.: 'category'). Colunas inexistentes são ignoradas.
+
+        Raises:
+            FileNotFoundError: Se a tabela não existir em nenhum formato.
+    """
+    storage = find_storage(stem)
+    if storage is None:
+        raise FileNotFoundError(f"Table {stem} not found.")
+    return storage.read(stem, columns=columns, dtype=dtype)
+
+
+def remove_table(stem):
+    """
+        Remove uma tabela em todos os formatos em que ela foi salva.
+
+        Args:
+            stem (str): Caminho da tabela sem extensão.
+
+        Returns:
+            bool: Se alguma cópia da tabela foi removida.
+    """
+    removed = False
+    for storage in STORAGE_FORMATS.values():
+        path = storage().path(stem)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+        else:
+            continue
+        removed = True
+    return removed
+
+
+class TableHandoff:
+    def __init__(self, max_pending=64):
+        """
+        Inicializa a passagem de tabelas em memória entre as etapas do ETL, com gravação em segundo plano.
+
+        As tabelas salvas por uma etapa ficam em memória para as etapas seguintes, que as recebem
+        exatamente como seriam lidas do arquivo: cada tabela é codificada uma única vez (TableStorage.encode),
+        e o mesmo conteúdo é gravado, na ordem de entrega, por uma thread em segundo plano e lido em memória
+        pelas etapas seguintes (TableStorage.decode).
+
+        Args:
+            max_pending (int): Quantidade máxima de gravações na fila; acima dela, quem grava espera.
+        """
+        self.tables = {}
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._errors = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="table-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                function, args = task
+                function(*args)
+            except Exception as e:
+                self._errors.append(e)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, function, *args):
+        """
+            Agenda uma gravação qualquer (ex.: exportação em CSV) na thread em segundo plano.
+        """
+        self._queue.put((function, args))
+
+    def write(self, storage, df, stem, keep=True):
+        """
+            Agenda a gravação de uma tabela e, opcionalmente, a mantém em memória para as próximas etapas.
+
+            Args:
+                storage (TableStorage): Formato da tabela.
+                df (pd.DataFrame): Dados da tabela.
+                stem (str): Caminho da tabela sem extensão.
+                keep (bool): Se a tabela será lida pelas próximas etapas.
+        """
+        files = storage.encode(df)
+        if keep:
+            self.tables[os.path.normpath(stem)] = (storage, files)
+        self.submit(storage.write_encoded, files, stem)
+
+    def __contains__(self, stem):
+        return os.path.normpath(stem) in self.tables
+
+    def storage(self, stem):
+        return self.tables[os.path.normpath(stem)][0]
+
+    def files(self, stem):
+        """
+            Retorna o conteúdo dos arquivos da tabela, exatamente como será gravado.
+        """
+        return self.tables[os.path.normpath(stem)][1]
+
+    def read(self, stem, columns=None, dtype=None):
+        """
+            Lê uma tabela mantida em memória, com o mesmo resultado de read_table após a gravação.
+        """
+        storage, files = self.tables[os.path.normpath(stem)]
+        return storage.decode(files, columns=columns, dtype=dtype)
+
+    def list_tables(self, directory):
+        """
+            Lista as tabelas mantidas em memória de uma pasta (sem subpastas), como list_tables.
+        """
+        directory = os.path.normpath(directory)
+        return sorted(stem for stem in self.tables if os.path.dirname(stem) == directory)
+
+    def flush(self):
+        """
+            Espera as gravações agendadas terminarem.
+
+            Raises:
+                Exception: O primeiro erro ocorrido em uma gravação.
+        """
+        self._queue.join()
+        if self._errors:
+            raise self._errors[0]
+
+    def close(self):
+        """
+            Espera as gravações agendadas, encerra a thread e libera as tabelas em memória.
+        """
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+            self.tables.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is None:
+            self.close()
+        else:
+            # Os arquivos já agendados são gravados, mas um erro de gravação não substitui o erro original
+            try:
+                self.close()
+            except Exception:
+                pass
+        return False
+
+
+def list_tables(directory):
+    """
+        Lista as tabelas salvas em uma pasta, em qualquer formato suportado.
+
+        Args:
+            directory (str): Pasta a ser listada.
+
+        Returns:
+            list: Caminhos das tabelas sem extensão, em ordem alfabética.
+    """
+    extensions = tuple(storage.extension for storage in STORAGE_FORMATS.values())
+    stems = set()
+    for entry in os.listdir(directory):
+        if entry.endswith(extensions):
+            stems.add(os.path.join(directory, os.path.splitext(entry)[0]))
+    return sorted(stems)
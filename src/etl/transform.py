@@ -1,36 +1,386 @@
+import numpy as np
 import pandas as pd
 import os
+import logging
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from etl.coalesce import CoalesceRule, ColumnCoalescer
+from etl.commodities import CommodityCanonicalizer
+from etl.instrumentation import measure, stage
+from etl.parsers import arrival_formats, parse_arrival, parse_tonnage
+from etl.manifest import BronzeManifest
+from etl.schema import SOURCE_SCHEMAS, get_table_schema, registry_version, silver_sources
+from etl.storage import find_storage, get_storage, list_tables, read_table, remove_table
+
+# Colunas mantidas no cache de cada arquivo bronze (a chave identifica linhas bronze duplicadas)
+CACHED_COLUMNS = ['Chegada', 'Sentido', 'local', 'Mercadoria', 'Previsto', '_row_key']
+
+
+def row_keys(df):
+    """
+        Calcula uma chave para cada linha, igual para linhas com os mesmos valores nas mesmas
+        colunas, mesmo que venham de tabelas com colunas diferentes.
+
+        Args:
+            df (pd.DataFrame): Dados de uma tabela.
+
+        Returns:
+            np.ndarray: Chave (uint64) de cada linha.
+    """
+    keys = np.zeros(len(df), dtype=np.uint64)
+    for column in df.columns:
+        values = df[column]
+        column_hash = pd.util.hash_array(np.array([column], dtype=object))[0]
+        hashed = pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+        # Colunas nulas não contribuem, como colunas inexistentes após o pd.concat
+        hashed = np.where(values.isna().to_numpy(), np.uint64(0), hashed ^ column_hash)
+        keys += hashed
+    return keys
+
+
+def _clean_in_process(transform_class, current_date, df):
+    """
+        Transforma uma tabela bronze já lida em um processo separado (ver DataTransform.clean_bronze_table).
+
+        Returns:
+            tuple: Linhas transformadas e quantidade de pesos e de datas de chegada não convertidos.
+    """
+    transform = transform_class(current_date)
+    df = transform.clean_bronze_table(df)
+    return df, transform.unparsed_weights, transform.unparsed_arrivals
+
 
 class DataTransform:
-    def __init__(self, current_date):
+    def __init__(self, current_date, storage=None, incremental=True, handoff=None, read_workers=None, clean_workers=0,
+                 canonical_names=True):
         self.root_path = "../../data/bronze/"
         self.output_path = "../../data/silver/"
         self.current_date = current_date
+        # Modo incremental: só os arquivos bronze novos ou alterados são processados novamente
+        self.incremental = incremental
+        self.manifest_path = "../../data/state/bronze_manifest.json"
+        self.cache_path = "../../data/state/silver_cache/"
+        # Tabela persistente dos nomes canônicos das mercadorias
+        self.aliases_path = "../../data/state/commodity_aliases.json"
+        self.commodities = None
+        # Se os nomes das mercadorias são substituídos pelos canônicos (o backfill paralelo os substitui depois, em um único processo)
+        self.canonical_names = canonical_names
+        # Nomes distintos das mercadorias, na ordem em que aparecem, quando não são substituídos pelos canônicos
+        self.commodity_names = []
+        # Formato usado para salvar a camada silver (a leitura da bronze aceita qualquer formato)
+        self.storage = storage or get_storage()
+        # Tabelas recebidas em memória da extração e gravação em segundo plano (TableHandoff)
+        self.handoff = handoff
+        # Tabelas bronze lidas ao mesmo tempo, em threads (se não informado, uma por CPU)
+        self.read_workers = read_workers
+        # Processos que transformam as tabelas bronze alteradas no modo incremental (0: na própria execução)
+        self.clean_workers = clean_workers
+        # Separador decimal usado por cada porto nas colunas de peso
+        self.decimal_separators = {"santos": ".", "paranagua": ","}
+        self.unparsed_weights = 0
+        self.unparsed_arrivals = 0
+
+        # Regras de unificação das colunas de Santos e Paranaguá nas colunas da camada silver; as colunas
+        # de origem de cada regra vêm do registro de esquemas (etl.schema)
+        sentido, mercadoria, chegada, previsto = (
+            silver_sources(target) for target in ('Sentido', 'Mercadoria', 'Chegada', 'Previsto')
+        )
+        self.coalescer = ColumnCoalescer([
+            CoalesceRule(
+                target='Sentido',
+                sources=sentido,
+                mappings={'Operaç Operat': {'EMB': 'Imp', 'DESC': 'Exp'}},
+                default='Imp/Exp',
+                drop=sentido[1:]
+            ),
+            CoalesceRule(
+                target='Mercadoria',
+                sources=mercadoria,
+                drop=mercadoria[1:]
+            ),
+            CoalesceRule(
+                target='Chegada',
+                sources=chegada,
+                converter=self.convert_arrival_values,
+                drop=chegada[1:]
+            ),
+            CoalesceRule(
+                target='Previsto',
+                sources=previsto,
+                converter=self.convert_weight_values,
+                drop=previsto[1:]
+            ),
+        ])
+
+    def _bronze_tables(self):
+        """
+            Lista as tabelas bronze da data atual.
+
+            Returns:
+                list: Tuplas (local de origem, caminho da tabela sem extensão).
+        """
+        tables = []
+        for file in os.listdir(self.root_path):
+            bronze_files = os.listdir(os.path.join(self.root_path, file))
+
+            if self.current_date in bronze_files:
+                daily_files_path = os.path.join(self.root_path, file, self.current_date)
+                table_paths = set(list_tables(daily_files_path))
+                if self.handoff is not None:
+                    # Tabelas extraídas nesta execução que ainda podem estar sendo gravadas
+                    table_paths.update(
+                        os.path.join(daily_files_path, os.path.basename(table_path))
+                        for table_path in self.handoff.list_tables(daily_files_path)
+                    )
+                tables.extend((file, table_path) for table_path in sorted(table_paths))
+        return tables
+
+    def _in_handoff(self, table_path):
+        return self.handoff is not None and table_path in self.handoff
+
+    def _write_table(self, df, table_path, keep=True):
+        """
+            Salva uma tabela no formato configurado, em segundo plano quando há um TableHandoff.
+        """
+        if self.handoff is not None:
+            self.handoff.write(self.storage, df, table_path, keep=keep)
+        else:
+            self.storage.write(df, table_path)
+
+    def _read_bronze_table(self, table_path, local):
+        """
+            Lê uma tabela bronze e adiciona o local de origem.
+
+            Tabelas registradas no registro de esquemas são lidas apenas com as colunas usadas pela camada
+            silver, já com os tipos registrados; as demais são lidas por completo, descartando as colunas sem nome.
+
+            Args:
+                table_path (str): Caminho da tabela sem extensão.
+                local (str): Local de origem (santos ou paranagua).
+        """
+        schema = get_table_schema(local, os.path.basename(table_path))
+        read = self.handoff.read if self._in_handoff(table_path) else read_table
+        if schema is not None:
+            df = read(table_path, columns=schema.usecols, dtype=schema.dtypes)
+        else:
+            df = read(table_path)
+            df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+        # Mesmas categorias em todas as tabelas, para que a coluna continue categórica após o pd.concat
+        df["local"] = pd.Categorical([local] * len(df), categories=sorted(set(SOURCE_SCHEMAS) | {local}))
+        return df
+
+    def _map_tables(self, function, tables):
+        """
+            Aplica uma função a cada tabela bronze, com até read_workers tabelas ao mesmo tempo.
+
+            A leitura dos arquivos e o pd.read_csv liberam o GIL na maior parte do tempo, por isso as
+            tabelas são lidas em threads.
+
+            Args:
+                function (callable): Função executada como function(local, table_path).
+                tables (list): Tuplas (local de origem, caminho da tabela sem extensão).
+
+            Returns:
+                list: Resultados, na ordem das tabelas.
+        """
+        workers = min(self.read_workers or os.cpu_count() or 1, len(tables))
+        if workers <= 1:
+            return [function(local, table_path) for local, table_path in tables]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bronze-reader") as executor:
+            return list(executor.map(lambda table: function(*table), tables))
 
     def join_data(self):
         """
             Combina os dados da pasta bronze em um único DataFrame e adiciona o local de origem.
+
+            As tabelas são lidas em paralelo (ver _map_tables) e combinadas por um único pd.concat.
         """
-        files = os.listdir(self.root_path)
-        processed_data = []
+        with stage("join") as step:
+            processed_data = self._map_tables(
+                lambda local, table_path: self._read_bronze_table(table_path, local), self._bronze_tables()
+            )
+            df = pd.concat(processed_data, ignore_index=True)
+            step.rows_out = len(df)
+        return df
 
-        for file in files:
-            bronze_files = os.listdir(os.path.join(self.root_path, file))
+    def row_keys(self, df):
+        """
+            Calcula uma chave para cada linha bronze (ver row_keys).
 
-            if self.current_date in bronze_files:
-                daily_files_path = os.path.join(self.root_path, file, self.current_date)
-                bronze_files = os.listdir(daily_files_path)
+            Args:
+                df (pd.DataFrame): Dados de uma tabela bronze.
+
+            Returns:
+                np.ndarray: Chave (uint64) de cada linha.
+        """
+        return row_keys(df)
+
+    def transform_bronze_table(self, table_path, local):
+        """
+            Aplica as transformações da camada silver a uma única tabela bronze.
 
-                for bronze_file in bronze_files:
-                    file_path = os.path.join(daily_files_path, bronze_file)
+            Args:
+                table_path (str): Caminho da tabela sem extensão.
+                local (str): Local de origem (santos ou paranagua).
+
+            Returns:
+                pd.DataFrame: Linhas transformadas, com a chave da linha bronze em '_row_key'.
+        """
+        return self.clean_bronze_table(self._read_bronze_table(table_path, local))
 
-                    if os.path.isfile(file_path):
-                        df = pd.read_csv(file_path)
-                        df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-                        df["local"] = file
-                        processed_data.append(df)
+    def clean_bronze_table(self, df):
+        """
+            Aplica as transformações da camada silver a uma tabela bronze já lida.
 
-        return pd.concat(processed_data, ignore_index=True)
+            Args:
+                df (pd.DataFrame): Tabela bronze, como retornada por _read_bronze_table.
+
+            Returns:
+                pd.DataFrame: Linhas transformadas, com a chave da linha bronze em '_row_key'.
+        """
+        keys = self.row_keys(df)
+        # Mesmas etapas do modo completo, aplicadas mesmo que a tabela não tenha as colunas de origem
+        df = measure("process_operat_column", self.process_operat_column, df, force=True)
+        df = measure("process_mercadoria_column", self.process_mercadoria_column, df, force=True)
+        df = measure("process_chegada_column", self.process_chegada_column, df, force=True)
+        df = measure("process_saldo_column", self.process_saldo_column, df, force=True)
+        df['_row_key'] = keys
+        return df[CACHED_COLUMNS]
+
+    def clean_bronze_tables(self, frames):
+        """
+            Transforma várias tabelas bronze já lidas, em até clean_workers processos.
+
+            Args:
+                frames (list): Tabelas bronze, como retornadas por _read_bronze_table.
+
+            Returns:
+                list: Linhas transformadas de cada tabela, na mesma ordem.
+        """
+        if self.clean_workers <= 0 or len(frames) <= 1:
+            return [self.clean_bronze_table(df) for df in frames]
+        workers = min(self.clean_workers, len(frames))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_clean_in_process, [type(self)] * len(frames),
+                                        [self.current_date] * len(frames), frames))
+        # Os valores não convertidos foram contados nos outros processos
+        self.unparsed_weights += sum(unparsed_weights for _, unparsed_weights, _ in results)
+        self.unparsed_arrivals += sum(unparsed_arrivals for _, _, unparsed_arrivals in results)
+        return [df for df, _, _ in results]
+
+    def join_transformed_data(self):
+        """
+            Monta a camada silver reaproveitando o resultado em cache dos arquivos bronze que não mudaram.
+
+            Cada arquivo novo ou alterado (segundo o manifesto de tamanho, data de modificação e hash)
+            é transformado isoladamente e salvo em cache; o resultado final combina o cache de todos os
+            arquivos da data e remove as linhas bronze duplicadas. Os arquivos são lidos em threads
+            (read_workers) e os alterados podem ser transformados em processos separados (clean_workers).
+
+            As tabelas recebidas em memória da extração são comparadas pelo hash do conteúdo codificado, pois o
+            arquivo ainda pode estar sendo gravado; elas são registradas no manifesto depois que a gravação termina.
+
+            Returns:
+                pd.DataFrame: Dados transformados da data atual.
+        """
+        manifest = BronzeManifest(self.manifest_path)
+        tables = self._bronze_tables()
+
+        def read(local, table_path):
+            """
+                Lê o resultado em cache da tabela, se ela não mudou, ou a tabela bronze, para ser transformada.
+            """
+            in_handoff = self._in_handoff(table_path)
+            storage = self.handoff.storage(table_path) if in_handoff else find_storage(table_path)
+            bronze_file = storage.path(table_path)
+            # O cache fica em uma pasta por versão do registro de esquemas, pois as colunas lidas mudam a chave das linhas
+            cache_table = os.path.join(
+                self.cache_path, registry_version(), local, self.current_date, os.path.basename(table_path)
+            )
+            with stage(f"table {local}/{os.path.basename(table_path)}") as step:
+                if in_handoff:
+                    unchanged = manifest.is_unchanged_encoded(bronze_file, self.handoff.files(table_path))
+                else:
+                    unchanged = manifest.is_unchanged(bronze_file)
+                if unchanged and find_storage(cache_table) is not None:
+                    df = read_table(cache_table)
+                    # O cache em CSV não guarda o tipo das datas
+                    df['Chegada'] = parse_arrival(df['Chegada'])
+                    cached = True
+                else:
+                    df = self._read_bronze_table(table_path, local)
+                    cached = False
+                step.rows_out = len(df)
+            return bronze_file, cache_table, cached, in_handoff or not unchanged, df
+
+        processed_data = []
+        seen = set()
+        cache_tables = set()
+        pending = []
+        changed = []
+        for position, (bronze_file, cache_table, cached, register, df) in enumerate(self._map_tables(read, tables)):
+            seen.add(bronze_file)
+            cache_tables.add(os.path.normpath(cache_table))
+            if register:
+                pending.append(bronze_file)
+            if not cached:
+                changed.append((position, cache_table))
+            processed_data.append(df)
+
+        # As tabelas novas ou alteradas são transformadas e salvas em cache
+        with stage("clean", rows_in=sum(len(processed_data[position]) for position, _ in changed)) as step:
+            cleaned = self.clean_bronze_tables([processed_data[position] for position, _ in changed])
+            for (position, cache_table), df in zip(changed, cleaned):
+                os.makedirs(os.path.dirname(cache_table), exist_ok=True)
+                self._write_table(df, cache_table, keep=False)
+                processed_data[position] = df
+            step.rows_out = sum(len(df) for df in cleaned)
+        reprocessed = len(changed)
+
+        if self.handoff is not None:
+            # O manifesto guarda o tamanho e o hash dos arquivos, que precisam estar gravados
+            self.handoff.flush()
+        for bronze_file in pending:
+            manifest.register(bronze_file)
+        # Apenas os registros da data atual: os arquivos das outras datas não foram listados nesta execução
+        for local in os.listdir(self.root_path):
+            manifest.forget_missing(os.path.join(self.root_path, local, self.current_date, ""), seen)
+        manifest.save()
+        self._prune_cache(cache_tables)
+        logging.info(f"{reprocessed} de {len(seen)} arquivos bronze processados novamente.")
+
+        df = pd.concat(processed_data, ignore_index=True)
+        df = measure("remove_duplicates", pd.DataFrame.drop_duplicates, df, subset='_row_key')
+        return df.drop(columns=['_row_key'])
+
+    def _prune_cache(self, cache_tables):
+        """
+            Remove do cache da camada silver os resultados gerados com outra versão do registro de esquemas
+            e, na data atual, os resultados de arquivos bronze que não existem mais.
+
+            Args:
+                cache_tables (set): Tabelas em cache dos arquivos bronze da data atual.
+        """
+        if not os.path.isdir(self.cache_path):
+            return
+        version = registry_version()
+        for entry in os.listdir(self.cache_path):
+            if entry != version:
+                # Outra versão do registro de esquemas: nenhuma execução lê mais essa pasta
+                shutil.rmtree(os.path.join(self.cache_path, entry), ignore_errors=True)
+                logging.info(f"Cache da camada silver da versão {entry} do registro de esquemas removido.")
+
+        version_path = os.path.join(self.cache_path, version)
+        if not os.path.isdir(version_path):
+            return
+        for local in os.listdir(version_path):
+            date_path = os.path.join(version_path, local, self.current_date)
+            if not os.path.isdir(date_path):
+                continue
+            for cache_table in list_tables(date_path):
+                if os.path.normpath(cache_table) not in cache_tables:
+                    remove_table(cache_table)
+                    logging.info(f"Cache de {local}/{os.path.basename(cache_table)} removido: o arquivo bronze não existe mais.")
 
     def remove_duplicates(self, df):
         """
@@ -41,97 +391,110 @@ class DataTransform:
         """
         return df.drop_duplicates()
 
-    def process_operat_column(self, df):
+    def process_operat_column(self, df, force=False):
         """
             Processa a coluna 'Operaç Operat', criando ou ajustando a coluna 'Sentido'.
 
             Args:
                 df (pd.DataFrame): DataFrame com a coluna 'Operaç Operat'.
+                force (bool): Aplica a regra mesmo sem as colunas de Santos (ver ColumnCoalescer.apply_rule).
 
             Returns:
                 pd.DataFrame: DataFrame com a coluna 'Sentido' ajustada.
         """
-        if 'Operaç Operat' in df.columns:
-            if 'Sentido' not in df.columns:
-                df['Sentido'] = None
-
-            df['Sentido'] = df.apply(
-                lambda row: (
-                    'Imp' if row['Operaç Operat'] == 'EMB' else 
-                    'Exp' if row['Operaç Operat'] == 'DESC' else 
-                    'Imp/Exp' if pd.isna(row['Sentido']) else row['Sentido']
-                ), axis=1
-            )
-            df = df.drop(columns=['Operaç Operat'])
-        return df
+        return self.coalescer.apply_rule(df, 'Sentido', force=force)
 
-    def process_mercadoria_column(self, df):
+    def process_mercadoria_column(self, df, force=False):
         """
             Transfere os dados de 'Mercadoria Goods' para a coluna 'Mercadoria'.
 
             Args:
                 df (pd.DataFrame): DataFrame com os dados de 'Mercadoria Goods'.
+                force (bool): Aplica a regra mesmo sem as colunas de Santos (ver ColumnCoalescer.apply_rule).
         """
-        if 'Mercadoria Goods' in df.columns:
-            df['Mercadoria'] = df.apply(
-                lambda row: row['Mercadoria Goods'] if pd.isna(row['Mercadoria']) else row['Mercadoria'], axis=1
-            )
-            df = df.drop(columns=['Mercadoria Goods'])
-        return df
+        return self.coalescer.apply_rule(df, 'Mercadoria', force=force)
 
-    
+    def canonicalize_mercadoria(self, df):
+        """
+            Substitui os nomes da coluna 'Mercadoria' pelos nomes canônicos (ver CommodityCanonicalizer),
+            normalizando apenas os nomes distintos ainda não registrados na tabela de nomes.
+
+            Args:
+                df (pd.DataFrame): DataFrame com a coluna 'Mercadoria'.
+
+            Returns:
+                pd.DataFrame: DataFrame com os nomes canônicos.
+        """
+        if self.commodities is None:
+            self.commodities = CommodityCanonicalizer(self.aliases_path)
+        df['Mercadoria'] = self.commodities.canonicalize(df['Mercadoria'])
+        return df
 
-    def process_chegada_column(self, df):
+    def process_chegada_column(self, df, force=False):
         """
-            Transfere os dados de 'Cheg/Arrival d/m/y' para a coluna 'Chegada'.
+            Transfere os dados de 'Cheg/Arrival d/m/y' e 'ETA' para a coluna 'Chegada', convertendo-os para datetime.
 
             Args:
                 df (pd.DataFrame): DataFrame a ser processado.
+                force (bool): Aplica a regra mesmo sem as colunas de origem (ver ColumnCoalescer.apply_rule).
         """
-        if 'Cheg/Arrival d/m/y' in df.columns:
-            df['Chegada'] = df.apply(
-                lambda row: row['Cheg/Arrival d/m/y'] if pd.isna(row['Chegada']) else row['Chegada'], axis=1
-            )
-            df = df.drop(columns=['Cheg/Arrival d/m/y'])
-        return df
+        return self.coalescer.apply_rule(df, 'Chegada', force=force)
 
-    def clean_and_covert_weight_column(self, value):
+    def convert_weight_values(self, values, df):
         """
-            Limpa e converte o valor da coluna 'Peso Weight' para float.
-        
+            Converte uma coluna inteira de pesos para float, respeitando o separador decimal de cada porto.
+
             Args:
-                value (str): Valor da coluna 'Peso Weight'.
+                values (pd.Series): Valores de peso ainda em texto.
+                df (pd.DataFrame): DataFrame de origem, usado para identificar o porto de cada linha.
 
             Returns:
-                float: Valor da coluna 'Peso Weight' convertido para float.
+                pd.Series: Valores convertidos para float.
         """
-        if isinstance(value, str):
-            value = value.replace(' Tons.', '').replace(',', '')
-            try:
-                if len(value.split()) > 1:
-                    return float(sum(map(float, value.split())))/len(value.split())
-                return float(value)
-            except ValueError:
-                return None
-        
+        decimal = df['local'].map(self.decimal_separators) if 'local' in df.columns else None
+        result = parse_tonnage(values, decimal=decimal)
+
+        # Acumula as células não convertidas de todos os arquivos processados na execução
+        self.unparsed_weights += result.unparsed
+        return result.values
 
+    def convert_arrival_values(self, values, df):
+        """
+            Converte uma coluna inteira de datas de chegada para datetime, testando primeiro os formatos
+            de data de cada porto.
 
+            Args:
+                values (pd.Series): Datas de chegada ainda em texto.
+                df (pd.DataFrame): DataFrame de origem, usado para identificar o porto de cada linha.
 
-    def process_saldo_column(self, df):
+            Returns:
+                pd.Series: Datas convertidas, com NaT nas que não puderam ser convertidas.
+        """
+        if 'local' not in df.columns:
+            result = parse_arrival(values)
+        else:
+            result = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+            locals_ = df['local'].astype(object)
+            for local in locals_.dropna().unique():
+                mask = (locals_ == local).to_numpy()
+                result[mask] = parse_arrival(values[mask], arrival_formats(local)).to_numpy()
+
+        # Acumula as datas não convertidas de todos os arquivos processados na execução
+        self.unparsed_arrivals += int((values.notna() & result.isna()).sum())
+        return result
+
+    def process_saldo_column(self, df, force=False):
         """
-            Transfere os dados de 'Peso Weight' para a coluna 'Saldo Total'.
+            Transfere os dados de 'Peso Weight' para a coluna 'Previsto', convertendo-os para float.
 
             Args:
                 df (pd.DataFrame): DataFrame a ser processado.
+                force (bool): Aplica a regra mesmo sem as colunas de origem (ver ColumnCoalescer.apply_rule).
 
             Returns:
                 pd.DataFrame: DataFrame processado.
         """
-        if 'Peso Weight' in df.columns:
-            df['Previsto'] = df.apply(
-                lambda row: self.clean_and_covert_weight_column(row['Peso Weight']) if pd.isna(row['Previsto']) else self.clean_and_covert_weight_column(row['Previsto']), axis=1
-            )
-        return df
+        return self.coalescer.apply_rule(df, 'Previsto', force=force)
 
     def reorder_columns(self, df):
         """
@@ -141,6 +504,8 @@ class DataTransform:
                 df (pd.DataFrame): DataFrame a ser reordenado.
         """
         df = df[['Chegada', 'Sentido', 'local', 'Mercadoria', 'Previsto']]
+        # Colunas com poucos valores distintos são mantidas como categorias
+        df = df.astype({'Sentido': 'category', 'local': 'category', 'Mercadoria': 'category'})
 
         df = df.rename(columns={'Previsto': 'Peso'})
         return df
@@ -151,13 +516,16 @@ class DataTransform:
 
             Args:
                 df (pd.DataFrame): DataFrame transformado.
+
+            Returns:
+                pd.DataFrame: Dados salvos.
         """
-        if not os.path.exists(self.output_path):
-            os.makedirs(self.output_path)
+        os.makedirs(self.output_path, exist_ok=True)
 
         # Remove os Previsto para salvar apenas os com valores dentro
         df = df[df['Peso'].notna()]
-        df.to_csv(os.path.join(self.output_path, f"{self.current_date}.csv"), index=False, header=True)
+        self._write_table(df, os.path.join(self.output_path, self.current_date))
+        return df
 
     def remove_duplicates(self, df):
         """
@@ -173,15 +541,44 @@ class DataTransform:
 
             1. Combina os dados da pasta bronze em um único DataFrame e adiciona o local de origem.
             2. Remove itens duplicados no DataFrame.
-            3. Transforma as colunas 'Mercadoria' e 'Chegada'
-            4. Reordena as colunas do DataFrame para manter somente as desejadas.
-            5. Salva o DataFrame transformado na pasta silver.
-        """
-        df_final = self.join_data()
-        df_final = self.remove_duplicates(df_final)
-        df_final = self.process_operat_column(df_final)
-        df_final = self.process_mercadoria_column(df_final)
-        df_final = self.process_chegada_column(df_final)
-        df_final = self.process_saldo_column(df_final)
-        df_final = self.reorder_columns(df_final)
-        self.save_transformed_data(df_final)
+            3. Transforma as colunas 'Sentido', 'Mercadoria', 'Chegada' e 'Previsto'.
+            4. Substitui os nomes das mercadorias pelos nomes canônicos, se canonical_names for verdadeiro.
+            5. Reordena as colunas do DataFrame para manter somente as desejadas.
+            6. Salva o DataFrame transformado na pasta silver.
+
+            No modo incremental, os passos 1 a 3 reaproveitam o resultado dos arquivos bronze que não mudaram.
+
+            Returns:
+                pd.DataFrame: Dados salvos na camada silver.
+        """
+        self.unparsed_weights = 0
+        self.unparsed_arrivals = 0
+        if self.incremental:
+            # Os passos 1 a 3 são feitos por arquivo, apenas para os arquivos bronze novos ou alterados
+            with stage("join_transformed_data") as step:
+                df_final = self.join_transformed_data()
+                step.rows_out = len(df_final)
+        else:
+            df_final = self.join_data()
+            df_final = measure("remove_duplicates", self.remove_duplicates, df_final)
+            df_final = measure("process_operat_column", self.process_operat_column, df_final)
+            df_final = measure("process_mercadoria_column", self.process_mercadoria_column, df_final)
+            df_final = measure("process_chegada_column", self.process_chegada_column, df_final)
+            df_final = measure("process_saldo_column", self.process_saldo_column, df_final)
+        # Depois do cache da camada silver incremental, para que alterações na tabela de nomes valham para todos os arquivos
+        if self.canonical_names:
+            df_final = measure("canonicalize_mercadoria", self.canonicalize_mercadoria, df_final)
+        else:
+            # Inclui os nomes das linhas sem peso, que não são salvas, mas também entram na tabela de nomes
+            self.commodity_names = [str(value) for value in pd.factorize(df_final['Mercadoria'])[1]]
+        df_final = measure("reorder_columns", self.reorder_columns, df_final)
+        with stage("save", rows_in=len(df_final)):
+            df_final = self.save_transformed_data(df_final)
+            if self.commodities is not None:
+                self.commodities.save()
+
+        if self.unparsed_weights:
+            logging.info(f"{self.unparsed_weights} valores de peso não puderam ser convertidos.")
+        if self.unparsed_arrivals:
+            logging.info(f"{self.unparsed_arrivals} datas de chegada não puderam ser convertidas.")
+        return df_final
@@ -0,0 +1,369 @@
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+from etl.storage import find_storage, get_storage, list_tables, read_table, remove_table
+from etl.transform import row_keys
+
+# Colunas que identificam uma escala (atracação de um navio) em cada porto
+CALL_KEYS = {
+    "santos": ("IMO", "DUV", "Viagem Voyage"),
+    "paranagua": ("Programação",),
+}
+
+# Colunas de controle das versões; as demais colunas são os valores das tabelas bronze, em texto
+VERSION_COLUMNS = ['_key', '_item', '_table', '_hash', 'valid_from', 'valid_to']
+
+# Colunas que identificam uma versão (uma escala tem no máximo uma versão criada por data)
+VERSION_KEYS = ['valid_from', '_key', '_item']
+
+# Colunas de texto das tabelas de controle, lidas sempre como texto (no CSV, chaves numéricas viram números)
+TEXT_COLUMNS = {'_key': object, 'valid_from': object, 'valid_to': object}
+
+
+def _as_text(values):
+    """
+        Converte uma coluna para texto, mantendo os valores nulos.
+    """
+    # Colunas que já são de texto (a maioria) só têm os nulos padronizados
+    if pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty"):
+        return values.where(values.notna(), None).astype(object)
+    return values.astype(str).where(values.notna(), None).astype(object)
+
+
+def _restore_types(values):
+    """
+        Converte novamente para número as colunas em que todos os valores preenchidos são numéricos,
+        como na extração das páginas.
+    """
+    try:
+        return pd.to_numeric(values)
+    except (ValueError, TypeError):
+        return values
+
+
+class VesselCallStore:
+    def __init__(self, path="../../data/vessel_calls/", storage=None):
+        """
+        Inicializa o armazenamento de escalas por captura de mudanças (CDC).
+
+        Em vez de uma cópia completa das tabelas a cada dia, cada linha das tabelas de line-up é
+        guardada como uma versão com validade (valid_from/valid_to). Uma nova versão só é criada
+        quando a linha aparece pela primeira vez ou algum valor muda (ETA, berço, tabela em que
+        a escala aparece etc.); linhas que somem das páginas têm a versão atual encerrada.
+
+        Cada registro apenas acrescenta arquivos, sem regravar o histórico: as versões criadas em uma
+        data ficam em <porto>/versions/<data>, as versões encerradas na data em <porto>/closed/<data>,
+        e as versões em vigor (chave e hash) em <porto>/current, usada para comparar a próxima data.
+        Ao mudar o mês, as tabelas diárias dos meses anteriores são juntadas em uma tabela por mês.
+
+        Args:
+            path (str): Pasta onde as versões de cada porto e o estado são salvos.
+            storage (TableStorage): Formato usado para salvar as versões. Se não informado, usa o formato padrão.
+        """
+        self.path = path
+        self.state_path = os.path.join(path, "state.json")
+        self.storage = storage or get_storage()
+        self.state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as file:
+                self.state = json.load(file)
+
+    def _versions_table(self, local, date):
+        return os.path.join(self.path, local, "versions", date)
+
+    def _closed_table(self, local, date):
+        return os.path.join(self.path, local, "closed", date)
+
+    def _current_table(self, local):
+        return os.path.join(self.path, local, "current")
+
+    def _save_state(self):
+        """
+            Salva as datas registradas e as colunas das tabelas, substituindo o arquivo de forma atômica.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        temporary_path = f"{self.state_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self.state, file, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temporary_path, self.state_path)
+
+    def dates(self, local):
+        """
+            Retorna as datas já registradas de um porto, em ordem crescente.
+        """
+        return self.state.get(local, {}).get("dates", [])
+
+    def _empty_versions(self, columns):
+        return pd.DataFrame({
+            column: pd.Series(dtype=np.int64 if column in ('_item', '_hash') else object) for column in columns
+        })
+
+    def _read_daily_tables(self, local, folder, until=None):
+        """
+            Lê as tabelas diárias e mensais de um porto (versões criadas ou encerradas em cada data ou mês),
+            até a data informada. As tabelas mensais são lidas por completo, mesmo que o mês termine depois da data.
+
+            Returns:
+                list: DataFrames das datas, em ordem de data.
+        """
+        directory = os.path.join(self.path, local, folder)
+        if not os.path.isdir(directory):
+            return []
+        tables = list_tables(directory)
+        months = {os.path.basename(table) for table in tables if len(os.path.basename(table)) == 7}
+        # As tabelas de um mês já compactado (ver _compact) são ignoradas, caso a remoção tenha sido interrompida
+        return [
+            read_table(table, dtype=TEXT_COLUMNS) for table in tables
+            if (until is None or os.path.basename(table) <= until)
+            and not (len(os.path.basename(table)) == 10 and os.path.basename(table)[:7] in months)
+        ]
+
+    def _write_daily_table(self, df, table_path):
+        """
+            Salva a tabela de uma data, ou remove a tabela anterior da data se não houver linhas.
+        """
+        if df.empty:
+            remove_table(table_path)
+            return
+        os.makedirs(os.path.dirname(table_path), exist_ok=True)
+        self.storage.write(df, table_path)
+
+    def _compact(self, local, date):
+        """
+            Junta as tabelas diárias dos meses anteriores ao da data em uma tabela por mês (AAAA-MM),
+            para que a leitura do histórico não precise abrir uma tabela por dia.
+        """
+        for folder in ("versions", "closed"):
+            directory = os.path.join(self.path, local, folder)
+            if not os.path.isdir(directory):
+                continue
+            months = {}
+            for table in list_tables(directory):
+                name = os.path.basename(table)
+                if len(name) == 10 and name[:7] < date[:7]:
+                    months.setdefault(name[:7], []).append(table)
+            for month, tables in months.items():
+                month_table = os.path.join(directory, month)
+                if find_storage(month_table) is None:
+                    frames = [read_table(table, dtype=TEXT_COLUMNS) for table in tables]
+                    self.storage.write(pd.concat(frames, ignore_index=True), month_table)
+                for table in tables:
+                    remove_table(table)
+
+    def _load_current(self, local):
+        current_table = self._current_table(local)
+        if find_storage(current_table) is None:
+            return self._empty_versions(['_key', '_item', '_hash', 'valid_from'])
+        return read_table(current_table, dtype=TEXT_COLUMNS)
+
+    def load_versions(self, local, until=None):
+        """
+            Lê as versões de um porto, com a data de fim de validade das versões encerradas.
+
+            Args:
+                local (str): Porto das versões.
+                until (str): Se informado, deixa de ler as tabelas diárias posteriores a essa data (AAAA-MM-DD);
+                    as versões do mês da data podem incluir as criadas e encerradas depois dela.
+
+            Returns:
+                pd.DataFrame: Versões, ou um DataFrame vazio se o porto ainda não foi registrado.
+        """
+        segments = self._read_daily_tables(local, "versions", until)
+        if not segments:
+            return self._empty_versions(VERSION_COLUMNS)
+        versions = pd.concat(segments, ignore_index=True)
+        versions = versions.astype({column: object for column in versions.columns if column not in ('_item', '_hash')})
+
+        closed = self._read_daily_tables(local, "closed", until)
+        closed = pd.concat(closed, ignore_index=True)[VERSION_KEYS + ['valid_to']] if closed \
+            else self._empty_versions(VERSION_KEYS + ['valid_to'])
+        versions = versions.merge(closed.astype({'_item': np.int64}), on=VERSION_KEYS, how='left')
+        versions['valid_to'] = versions['valid_to'].astype(object).where(versions['valid_to'].notna(), None)
+        return versions
+
+    def _prepare_snapshot(self, local, tables):
+        """
+            Converte as tabelas extraídas em um único DataFrame com a chave, o item e o hash de cada linha.
+
+            Linhas da mesma escala (ex.: uma linha por mercadoria) são diferenciadas pela ordem em que
+            aparecem ('_item'). Linhas sem chave são identificadas pelo próprio conteúdo.
+
+            Args:
+                local (str): Porto das tabelas.
+                tables (dict): DataFrames indexados pelo nome da tabela bronze.
+        """
+        # As tabelas são convertidas para object antes de juntá-las, para que o tipo de uma coluna
+        # (ex.: inteiros virando float com os nulos de outra tabela) não dependa das demais tabelas
+        frames = [tables[name].astype(object).assign(_table=name) for name in sorted(tables)]
+        snapshot = pd.concat(frames, ignore_index=True)
+        values = [column for column in snapshot.columns if column != '_table']
+        for column in values:
+            snapshot[column] = _as_text(snapshot[column])
+
+        key_columns = [column for column in CALL_KEYS.get(local, ()) if column in snapshot.columns]
+        if key_columns:
+            keys = snapshot[key_columns].fillna("")
+            key = keys[key_columns[0]]
+            for column in key_columns[1:]:
+                key = key + "|" + keys[column]
+            missing = snapshot[key_columns].isna().all(axis=1)
+        else:
+            key = pd.Series("", index=snapshot.index)
+            missing = pd.Series(True, index=snapshot.index)
+        content = row_keys(snapshot[values])
+        snapshot['_key'] = key.where(~missing, "linha:" + pd.Series(content, index=snapshot.index).astype(str))
+
+        snapshot['_item'] = snapshot.groupby('_key').cumcount()
+        # O hash inclui a tabela, para que a mudança de tabela (ex.: esperados -> atracados) gere uma nova versão
+        snapshot['_hash'] = (content + row_keys(snapshot[['_table']])).view(np.int64)
+        return snapshot
+
+    def _record_columns(self, local, date, tables):
+        """
+            Registra as colunas de cada tabela quando elas mudam, para reconstruir as tabelas com as mesmas colunas.
+        """
+        columns = self.state.setdefault(local, {}).setdefault("columns", {})
+        for name, df in tables.items():
+            history = columns.setdefault(name, {})
+            latest = history[max(history)] if history else None
+            if latest != list(df.columns):
+                history[date] = list(df.columns)
+
+    def upsert(self, local, date, tables):
+        """
+            Registra as tabelas de um porto em uma data, criando versões apenas para as linhas novas ou alteradas.
+
+            Registrar novamente a última data substitui o registro anterior dessa data.
+
+            Args:
+                local (str): Porto das tabelas.
+                date (str): Data das tabelas (AAAA-MM-DD).
+                tables (dict): DataFrames indexados pelo nome da tabela bronze (ex.: "esperados").
+
+            Returns:
+                dict: Quantidade de versões criadas ('inserted') e encerradas ('closed').
+
+            Raises:
+                ValueError: Se a data for anterior à última data registrada do porto.
+        """
+        date = str(date)
+        dates = self.dates(local)
+        if dates and date < dates[-1]:
+            raise ValueError(f"A data {date} é anterior à última data registrada de {local} ({dates[-1]}).")
+
+        current = self._load_current(local)
+        if dates and date == dates[-1]:
+            # Desfaz o registro anterior da mesma data: as versões criadas na data são descartadas e as encerradas, reabertas
+            current = current[current['valid_from'] != date]
+            closed_table = self._closed_table(local, date)
+            if find_storage(closed_table) is not None:
+                reopened = read_table(closed_table, dtype=TEXT_COLUMNS)[list(current.columns)]
+                current = pd.concat([current, reopened], ignore_index=True)
+            current = current.reset_index(drop=True)
+            dates = dates[:-1]
+
+        snapshot = self._prepare_snapshot(local, tables) if tables else self._empty_versions(['_key', '_item', '_hash'])
+        merged = snapshot[['_key', '_item', '_hash']].reset_index().merge(
+            current.reset_index(), on=['_key', '_item'], how='outer', suffixes=('', '_current'), indicator=True
+        )
+        changed = (merged['_merge'] == 'both') & (merged['_hash'] != merged['_hash_current'])
+        inserted = merged.loc[(merged['_merge'] == 'left_only') | changed, 'index'].astype(int)
+        closed = merged.loc[(merged['_merge'] == 'right_only') | changed, 'index_current'].astype(int)
+
+        # Apenas as versões criadas e encerradas na data são gravadas; as versões em vigor são substituídas
+        new_versions = snapshot.loc[inserted.to_numpy()].assign(valid_from=date).reset_index(drop=True)
+        # As colunas vazias (ex.: as colunas das outras tabelas do porto) não são gravadas
+        new_versions = new_versions.dropna(axis=1, how='all')
+        closed_versions = current.loc[closed.to_numpy()].assign(valid_to=date).reset_index(drop=True)
+        current = pd.concat(
+            [current.drop(index=closed.to_numpy()), new_versions[['_key', '_item', '_hash', 'valid_from']]],
+            ignore_index=True
+        )
+        for df in (new_versions, closed_versions, current):
+            df['_item'] = df['_item'].astype(np.int64)
+            df['_hash'] = df['_hash'].astype(np.int64)
+
+        self._write_daily_table(new_versions, self._versions_table(local, date))
+        self._write_daily_table(closed_versions, self._closed_table(local, date))
+        os.makedirs(os.path.join(self.path, local), exist_ok=True)
+        self.storage.write(current, self._current_table(local))
+        self._compact(local, date)
+        self.state.setdefault(local, {})["dates"] = dates + [date]
+        self._record_columns(local, date, tables)
+        self._save_state()
+
+        logging.info(f"{local} em {date}: {len(inserted)} versões criadas e {len(closed)} encerradas.")
+        return {"inserted": len(inserted), "closed": len(closed)}
+
+    def upsert_bronze(self, local, date, bronze_path="../../data/bronze/"):
+        """
+            Registra as tabelas bronze já salvas de um porto em uma data (ex.: para importar o histórico).
+
+            Args:
+                local (str): Porto das tabelas.
+                date (str): Data das tabelas (AAAA-MM-DD).
+                bronze_path (str): Pasta da camada bronze.
+        """
+        daily_path = os.path.join(bronze_path, local, date)
+        tables = {}
+        for directory, _, _ in os.walk(daily_path):
+            for table in list_tables(directory):
+                tables[os.path.relpath(table, daily_path)] = read_table(table)
+        return self.upsert(local, date, tables)
+
+    def _columns_at(self, local, name, date):
+        history = self.state.get(local, {}).get("columns", {}).get(name, {})
+        valid = [column_date for column_date in history if column_date <= date]
+        return history[max(valid)] if valid else None
+
+    def snapshot(self, local, date):
+        """
+            Reconstrói as tabelas de um porto como estavam em uma data.
+
+            Args:
+                local (str): Porto das tabelas.
+                date (str): Data desejada (AAAA-MM-DD).
+
+            Returns:
+                dict: DataFrames indexados pelo nome da tabela bronze (vazio se a data for anterior ao primeiro registro).
+        """
+        date = str(date)
+        dates = self.dates(local)
+        if not dates or date < dates[0]:
+            return {}
+
+        versions = self.load_versions(local, until=date)
+        valid = (versions['valid_from'] <= date) & (versions['valid_to'].isna() | (versions['valid_to'] > date))
+        versions = versions[valid].sort_values(['_table', '_key', '_item'], kind='stable')
+
+        tables = {}
+        for name, rows in versions.groupby('_table', sort=True):
+            columns = self._columns_at(local, name, date) or [
+                column for column in rows.columns if column not in VERSION_COLUMNS and rows[column].notna().any()
+            ]
+            # As colunas vazias em todas as versões não são gravadas (ver upsert)
+            values = rows.reindex(columns=columns).reset_index(drop=True)
+            tables[name] = pd.DataFrame({column: _restore_types(values[column]) for column in columns}, columns=columns)
+        return tables
+
+    def materialize(self, local, date, bronze_path="../../data/bronze/"):
+        """
+            Reconstrói e salva as tabelas bronze de um porto em uma data, no formato configurado,
+            para que as camadas silver e gold possam ser geradas sem a cópia diária original.
+
+            Args:
+                local (str): Porto das tabelas.
+                date (str): Data desejada (AAAA-MM-DD).
+                bronze_path (str): Pasta da camada bronze.
+
+            Returns:
+                list: Caminhos das tabelas salvas.
+        """
+        paths = []
+        for name, df in self.snapshot(local, date).items():
+            table_path = os.path.join(bronze_path, local, str(date), name)
+            os.makedirs(os.path.dirname(table_path), exist_ok=True)
+            paths.append(self.storage.write(df, table_path))
+        return paths
@@ -16,8 +16,16 @@
     Este arquivo realiza o processo manual, dentro da pasta scheduler existe um exemplo de como automatizar esse processo utilizando a biblioteca schedule.
 """
 from etl.extract import DataExtractor
+from etl.archive import PageArchive
 from etl.transform import DataTransform
 from etl.load import DataLoader
+from etl.database import SqliteSink
+from etl.vessel_store import VesselCallStore
+from etl.instrumentation import RunInstrumentation, stage
+from etl.lock import RunLock
+from etl.storage import TableHandoff
+from contextlib import nullcontext
+import argparse
 import pandas as pd
 import logging
 
@@ -27,32 +35,73 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
     )
 
-def main():
+def main(profile=False, track_memory=True, pipeline=False, sqlite=False, read_workers=None, clean_workers=0):
+    """
+        Executa o ETL completo, salvando o relatório da execução (tempo, CPU, linhas e memória de cada etapa)
+        em data/state/runs. A execução não é feita se outra execução do ETL estiver em andamento.
+
+        Args:
+            profile (bool): Se deve salvar o perfil (cProfile) da etapa mais lenta junto ao relatório.
+            track_memory (bool): Se deve medir o pico de memória de cada etapa (tracemalloc), o que deixa a execução mais lenta.
+            pipeline (bool): Se as tabelas devem passar de uma etapa para a seguinte em memória, com os arquivos
+                bronze, silver e gold salvos em segundo plano (mesmo conteúdo do modo padrão).
+            sqlite (bool): Se as camadas silver e gold do dia também devem ser gravadas no banco SQLite (data/lineup.db).
+            read_workers (int): Tabelas bronze lidas ao mesmo tempo pela transformação. Se não informado, uma por CPU.
+            clean_workers (int): Processos que transformam as tabelas bronze alteradas (0 transforma no próprio processo).
+    """
     try:
-        data_extractor = DataExtractor()
-
-        logging.info("Iniciando processo de extração.")
-        # Executa o processo de extração
-        data_extractor.execute_bronze_process()
-        logging.info("Extração de dados concluída.")
-
-        current_date = pd.to_datetime("today").strftime("%Y-%m-%d")
-        data_transform = DataTransform(current_date)
-        logging.info("Iniciando processo de transformação.")
-        # Executa o processo de transformação
-        data_transform.execute_silver_process()
-
-        loader = DataLoader(current_date)
-        logging.info("Iniciando processo de carregamento.")
-        # Executa o processo de carregamento
-        loader.execute_gold_process()
-        logging.info("Carregamento de dados concluído.")
-        logging.info("Processo de ETL concluído com sucesso.")
+        with RunLock(), RunInstrumentation(track_memory=track_memory, profile=profile), \
+                (TableHandoff() if pipeline else nullcontext()) as handoff, \
+                (SqliteSink() if sqlite else nullcontext()) as database:
+            data_extractor = DataExtractor(vessel_store=VesselCallStore(), handoff=handoff, archive=PageArchive())
+
+            logging.info("Iniciando processo de extração.")
+            # Executa o processo de extração
+            with stage("extract"):
+                results = data_extractor.execute_bronze_process()
+            logging.info("Extração de dados concluída.")
+
+            # Sem páginas novas, silver e gold do dia já estão atualizadas
+            if not any(result.ok and result.changed for result in results.values()):
+                logging.info("Nenhuma página foi alterada, transformação e carregamento não serão executados.")
+                return
+
+            current_date = pd.to_datetime("today").strftime("%Y-%m-%d")
+            data_transform = DataTransform(current_date, handoff=handoff, read_workers=read_workers,
+                                           clean_workers=clean_workers)
+            logging.info("Iniciando processo de transformação.")
+            # Executa o processo de transformação
+            with stage("transform"):
+                data_transform.execute_silver_process()
+
+            loader = DataLoader(current_date, handoff=handoff, database=database)
+            logging.info("Iniciando processo de carregamento.")
+            # Executa o processo de carregamento
+            with stage("load"):
+                loader.execute_gold_process()
+            if handoff is not None:
+                # Espera os arquivos gravados em segundo plano
+                with stage("flush"):
+                    handoff.close()
+            # Só depois das camadas silver e gold as páginas extraídas passam a ser consideradas processadas
+            data_extractor.commit_state()
+            logging.info("Carregamento de dados concluído.")
+            logging.info("Processo de ETL concluído com sucesso.")
     except Exception as e:
         logging.error(f"Erro durante o processo de ETL: {e}")
 
 if __name__ == "__main__":
-    main()
-
-    
-
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", action="store_true", help="Salva o perfil (cProfile) da etapa mais lenta.")
+    parser.add_argument("--no-memory", action="store_true", help="Não mede o pico de memória das etapas.")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Passa as tabelas entre as etapas em memória e salva os arquivos em segundo plano.")
+    parser.add_argument("--sqlite", action="store_true",
+                        help="Grava também as camadas silver e gold do dia no banco SQLite (data/lineup.db).")
+    parser.add_argument("--read-workers", type=int, default=None,
+                        help="Tabelas bronze lidas ao mesmo tempo (padrão: uma por CPU).")
+    parser.add_argument("--clean-workers", type=int, default=0,
+                        help="Processos que transformam as tabelas bronze alteradas (padrão: nenhum).")
+    args = parser.parse_args()
+    main(profile=args.profile, track_memory=not args.no_memory, pipeline=args.pipeline, sqlite=args.sqlite,
+         read_workers=args.read_workers, clean_workers=args.clean_workers)
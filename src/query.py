@@ -0,0 +1,68 @@
+"""
+    Este arquivo consulta o histórico da camada silver pelo índice particionado por data e local.
+
+    Exemplos:
+        # Exportações de soja em Santos com chegada nos próximos 10 dias (tabela mais recente)
+        python src/query.py --local santos --mercadoria soja --sentido Exp --proximos-dias 10
+
+        # Importações de fertilizantes em Paranaguá nas tabelas dos últimos 90 dias
+        python src/query.py --local paranagua --mercadoria fertiliz --sentido Imp --ultimos-dias 90
+"""
+import argparse
+import logging
+import pandas as pd
+from etl.query import SilverIndex
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+def end_of_day(value):
+    """
+        Último instante do dia informado, para que o filtro de chegada inclua as chegadas ao longo desse dia.
+
+        Args:
+            value (str | pd.Timestamp): Data (AAAA-MM-DD). Valores com horário são mantidos.
+    """
+    value = pd.Timestamp(value)
+    if value != value.normalize():
+        return value
+    return value + pd.Timedelta(days=1) - pd.Timedelta(1, unit="ns")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--local", nargs="+", help="Locais consultados (santos, paranagua).")
+    parser.add_argument("--mercadoria", help="Trecho do nome da mercadoria.")
+    parser.add_argument("--sentido", choices=["Imp", "Exp", "Imp/Exp"])
+    parser.add_argument("--chegada-de", help="Menor data de chegada (AAAA-MM-DD).")
+    parser.add_argument("--chegada-ate", help="Maior data de chegada (AAAA-MM-DD).")
+    parser.add_argument("--proximos-dias", type=int,
+                        help="Chegadas entre hoje e os próximos N dias, na tabela mais recente de cada local.")
+    parser.add_argument("--ultimos-dias", type=int, help="Consulta as tabelas silver dos últimos N dias.")
+    parser.add_argument("--saida", help="Arquivo CSV onde o resultado é salvo. Se não informado, exibe o resultado.")
+    args = parser.parse_args()
+
+    today = pd.Timestamp("today").normalize()
+    filters = {"local": args.local, "mercadoria": args.mercadoria, "sentido": args.sentido,
+               "chegada_from": args.chegada_de,
+               "chegada_to": end_of_day(args.chegada_ate) if args.chegada_ate else None}
+    if args.proximos_dias is not None:
+        filters.update(chegada_from=today, chegada_to=end_of_day(today + pd.Timedelta(days=args.proximos_dias)),
+                       latest=True)
+    if args.ultimos_dias is not None:
+        filters["date_from"] = (today - pd.Timedelta(days=args.ultimos_dias)).strftime("%Y-%m-%d")
+
+    index = SilverIndex()
+    index.refresh()
+    df = index.query(**filters)
+
+    if args.saida:
+        df.to_csv(args.saida, index=False)
+        logging.info(f"{len(df)} linhas salvas em {args.saida}.")
+    else:
+        print(df.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+    Este arquivo converte novamente em tabelas bronze as páginas guardadas no arquivo de páginas (data/raw),
+    sem acessar a internet, por exemplo depois de uma correção na extração das tabelas.
+
+    Para cada cidade e data, a última página capturada na data é convertida e salva na pasta bronze da data,
+    com várias páginas convertidas ao mesmo tempo em processos separados. Em seguida, as camadas silver e gold
+    podem ser geradas novamente com src/backfill.py.
+
+    Uso: python src/replay.py [--start 2025-01-01] [--end 2025-12-31] [--city santos] [--workers 4]
+"""
+import argparse
+import logging
+import sys
+from etl.archive import PageArchive
+from etl.extract import DataExtractor
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", default=None, help="Primeira data (AAAA-MM-DD). Padrão: a primeira data guardada.")
+    parser.add_argument("--end", default=None, help="Última data (AAAA-MM-DD). Padrão: a última data guardada.")
+    parser.add_argument("--city", action="append", default=None, help="Cidade convertida (pode ser repetida). Padrão: todas.")
+    parser.add_argument("--workers", type=int, default=None, help="Quantidade máxima de processos simultâneos.")
+    args = parser.parse_args()
+
+    logging.info("Iniciando a conversão das páginas guardadas.")
+    failures = DataExtractor().replay_archive(PageArchive(), start_date=args.start, end_date=args.end,
+                                              cities=args.city, max_workers=args.workers)
+    logging.info("Conversão das páginas concluída.")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
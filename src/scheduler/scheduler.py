@@ -2,17 +2,27 @@
     Este script apresenta a ideia para a execução de um processo de ETL (Extração, Transformação e Carregamento) \
         de dados de forma automatizada, utilizando a biblioteca schedule.
 
+    Com --daemon, as páginas são atualizadas ao longo do dia, com um intervalo para cada fonte (em minutos):
+
+        python src/scheduler/scheduler.py --daemon --interval santos=30 --interval paranagua=60 --deadline 20
 """
 
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src')))
+import argparse
 import schedule
+import signal
 import logging
 import pandas as pd
+from etl.archive import PageArchive
 from etl.extract import DataExtractor
 from etl.transform import DataTransform
 from etl.load import DataLoader
+from etl.vessel_store import VesselCallStore
+from etl.instrumentation import RunInstrumentation, stage
+from etl.lock import RunLock
+from etl.refresh import DEFAULT_INTERVALS, RefreshScheduler
 import time
 
 # Configuração do logging para armazenar logs em arquivo e mostrar no console
@@ -32,23 +42,35 @@ def job():
     try:
         current_date = pd.to_datetime("today").strftime("%Y-%m-%d")
         print("Executando ETL...")
-        # Executa o processo de extração
-        extractor = DataExtractor()
-        logging.info("Iniciando processo de extração.")
-        extractor.execute_bronze_process()
-        logging.info("Processo de extração concluído.")
-
-        # Executa o processo de transformação
-        data_transform = DataTransform(current_date)
-        logging.info("Iniciando processo de transformação.")
-        data_transform.execute_silver_process()
-        logging.info("Processo de transformação concluído.")
-
-        # Executa o processo de carga
-        loader = DataLoader(current_date)
-        logging.info("Iniciando processo de carga.")
-        loader.execute_gold_process()
-        logging.info("Processo de ETL finalizado com sucesso.")
+        # O relatório de cada execução (tempo, CPU, linhas e memória por etapa) é salvo em data/state/runs
+        with RunLock(), RunInstrumentation(name="scheduler"):
+            # Executa o processo de extração
+            extractor = DataExtractor(vessel_store=VesselCallStore(), archive=PageArchive())
+            logging.info("Iniciando processo de extração.")
+            with stage("extract"):
+                results = extractor.execute_bronze_process()
+            logging.info("Processo de extração concluído.")
+
+            # Sem páginas novas, silver e gold do dia já estão atualizadas
+            if not any(result.ok and result.changed for result in results.values()):
+                logging.info("Nenhuma página foi alterada, transformação e carregamento não serão executados.")
+                return
+
+            # Executa o processo de transformação
+            data_transform = DataTransform(current_date)
+            logging.info("Iniciando processo de transformação.")
+            with stage("transform"):
+                data_transform.execute_silver_process()
+            logging.info("Processo de transformação concluído.")
+
+            # Executa o processo de carga
+            loader = DataLoader(current_date)
+            logging.info("Iniciando processo de carga.")
+            with stage("load"):
+                loader.execute_gold_process()
+            # Só depois das camadas silver e gold as páginas extraídas passam a ser consideradas processadas
+            extractor.commit_state()
+            logging.info("Processo de ETL finalizado com sucesso.")
 
     except Exception as e:
         logging.error(f"Error: {e}")
@@ -67,5 +89,46 @@ def schedule_etl():
         schedule.run_pending()
         time.sleep(60)
 
+def refresh_daemon(intervals, deadline):
+    """
+        Executa as atualizações ao longo do dia até o processo receber SIGINT ou SIGTERM.
+
+        Args:
+            intervals (dict): Intervalo, em segundos, entre as atualizações de cada fonte.
+            deadline (float): Tempo máximo, em segundos, de cada atualização.
+    """
+    scheduler = RefreshScheduler(intervals=intervals, deadline=deadline)
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signal_number, lambda *_: scheduler.stop())
+
+    logging.info(f"Agendador iniciado: {', '.join(f'{source} a cada {interval / 60:g} min' for source, interval in intervals.items())}.")
+    scheduler.run()
+    logging.info("Agendador encerrado.")
+
+def parse_intervals(values):
+    """
+        Converte os argumentos --interval (ex.: "santos=30", em minutos) em segundos por fonte.
+    """
+    intervals = dict(DEFAULT_INTERVALS)
+    for value in values or []:
+        source, _, minutes = value.partition("=")
+        if source not in intervals or not minutes:
+            raise ValueError(f"Intervalo inválido: {value} (use fonte=minutos, ex.: santos=30).")
+        intervals[source] = float(minutes) * 60
+    return intervals
+
 if __name__ == "__main__":
-    schedule_etl()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--daemon", action="store_true", help="Atualiza as páginas ao longo do dia, em vez de uma vez por dia.")
+    parser.add_argument("--interval", action="append", help="Intervalo de uma fonte em minutos (ex.: santos=30).")
+    parser.add_argument("--deadline", type=float, default=20, help="Tempo máximo de cada atualização, em minutos.")
+    args = parser.parse_args()
+
+    if args.daemon:
+        try:
+            intervals = parse_intervals(args.interval)
+        except ValueError as e:
+            parser.error(str(e))
+        refresh_daemon(intervals, args.deadline * 60)
+    else:
+        schedule_etl()
@@ -0,0 +1,45 @@
+"""
+    Este arquivo sobe um servidor HTTP local que responde consultas às camadas gold e silver em JSON,
+    com as respostas mais usadas em cache. O cache é descartado quando uma tabela nova é gravada.
+
+    Exemplos:
+        python src/serve.py --port 8080
+
+        curl "http://127.0.0.1:8080/gold?local=santos&sentido=Exp&mercadoria=soja"
+        curl "http://127.0.0.1:8080/gold?data_de=2025-01-01&data_ate=2025-01-31"
+        curl "http://127.0.0.1:8080/silver?local=paranagua&chegada_de=2025-01-22&chegada_ate=2025-02-01&mais_recente=1"
+        curl "http://127.0.0.1:8080/status"
+"""
+import argparse
+import logging
+from etl.service import LineupService, QueryServer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--cache-entries", type=int, default=256, help="Quantidade máxima de respostas em cache (0 desativa o cache).")
+    parser.add_argument("--cache-mb", type=float, default=64, help="Tamanho máximo do cache, em MB.")
+    parser.add_argument("--check-interval", type=float, default=1.0,
+                        help="Intervalo mínimo, em segundos, entre as verificações de tabelas novas.")
+    args = parser.parse_args()
+
+    service = LineupService(cache_entries=args.cache_entries, cache_bytes=int(args.cache_mb * 1024 * 1024),
+                            check_interval=args.check_interval)
+    server = QueryServer(service, host=args.host, port=args.port)
+    logging.info(f"Servidor de consultas em {server.url}.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Servidor encerrado.")
+    finally:
+        server.server.server_close()
+
+if __name__ == "__main__":
+    main()